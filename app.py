@@ -2,13 +2,16 @@
 
 # Import modules from Python's standard library
 import os               # To interact with the operating system (like folders, files)
+import json             # To encode streamed (Server-Sent Event) messages
+import logging          # To show informational logs (like AI token usage)
 import time             # For time-related functions
 from datetime import datetime, timedelta  # To work with dates and times
 
 # Import parts of Flask (a web framework) to help build the website
 from flask import (
     Flask, render_template, request, jsonify,
-    redirect, url_for, flash, after_this_request
+    redirect, url_for, flash, session,
+    Response, stream_with_context, g
 )
 # Import database tools from Flask
 from flask_sqlalchemy import SQLAlchemy
@@ -17,8 +20,6 @@ from flask_login import (
     LoginManager, login_user, logout_user,
     login_required, current_user
 )
-# Import tools for safe file uploads
-from werkzeug.utils import secure_filename
 # Import tools for password security
 from werkzeug.security import generate_password_hash, check_password_hash
 # Import tool to load secret environment variables
@@ -29,6 +30,9 @@ from dotenv import load_dotenv
 # Load secret environment variables from a .env file (like SECRET_KEY)
 load_dotenv()
 
+# Show log messages (set LOG_LEVEL=WARNING in .env for a quieter console)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
 # Create a Flask application
 app = Flask(__name__)
 # Set a secret key to keep sessions safe (pulled from the .env file)
@@ -39,8 +43,15 @@ app.secret_key = os.getenv("SECRET_KEY")
 # Find the folder where this script lives
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-# Make sure an 'instance' folder exists (used for database files)
-os.makedirs(os.path.join(basedir, "instance"), exist_ok=True)
+# Load shared settings (this also makes sure the 'instance' folder exists)
+import config
+
+# When started with `python app.py`, the resume-parsing processes import this
+# file again under the name "__mp_main__" (see services/resume_parser.py).
+# They only need the parser, so the startup work below is skipped for them.
+# The services themselves do no work on import (OpenAI clients, cache files
+# and the audio folder are set up on first use or by the startup code here).
+PARSER_PROCESS = __name__ == "__mp_main__"
 
 # ------------------- CONFIGURATION -------------------
 
@@ -49,18 +60,25 @@ app.config["UPLOAD_FOLDER"] = os.path.join(basedir, "uploads")
 # Make sure the uploads folder exists
 os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
-# Tell the app where the database will be stored (inside the instance folder)
-app.config["SQLALCHEMY_DATABASE_URI"] = (
-    f"sqlite:///{os.path.join(basedir, 'instance', 'users.db')}"
-)
+# Tell the app where the database will be stored (inside the instance folder by default)
+app.config["SQLALCHEMY_DATABASE_URI"] = config.DATABASE_URI
+# Connection pool and SQLite settings (WAL, lock waiting)
+from services.db_profile import engine_options, begin_write
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(config.DATABASE_URI)
 
 # ------------------- DATABASE SETUP -------------------
 
-# Import the database models (User, InterviewHistory)
-from models.user import db, User, InterviewHistory
+# Import the database models (User, InterviewHistory, UserStats)
+from models.user import db, User, InterviewHistory, UserStats
 # Connect the database to the Flask app
 db.init_app(app)
 
+# Create or update the database tables (see models/migrations.py)
+from models.migrations import run_migrations
+if config.DB_MIGRATE_ON_START and not PARSER_PROCESS:
+    with app.app_context():
+        run_migrations()
+
 # ------------------- LOGIN MANAGER SETUP -------------------
 
 # Set up the login manager (to handle logins and logouts)
@@ -73,10 +91,27 @@ login_manager.login_view = "index"  # If not logged in, send user to "index" pag
 def ajax_unauthorized():
     return jsonify({"error": "Authentication required"}), 401
 
-# Tell Flask how to find a user in the database by ID
+# Tell Flask how to find a user by ID (from the in-memory cache when possible)
+from services.user_cache import user_cache
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.load(int(user_id))
+
+# ------------------- QUERY COUNTING -------------------
+
+from services.query_stats import query_stats, request_query_count
+
+# Tell the browser how many database queries this request ran
+# (streamed responses are still running here, so theirs is a partial count)
+@app.after_request
+def add_query_count_header(response):
+    response.headers["X-DB-Queries"] = str(request_query_count())
+    return response
+
+# Add the request's final query count to its route's totals
+@app.teardown_request
+def record_query_count(exc):
+    query_stats.record(request.endpoint, request_query_count())
 
 # ------------------- AI & SERVICES SETUP -------------------
 
@@ -85,10 +120,99 @@ from services.resume_parser import load_resume
 from services.ai_interview import (
     guess_job_title,
     start_interview,
-    process_interview_message
+    process_interview_message,
+    stream_start_interview,
+    stream_interview_message
+)
+from services.session_store import new_interview_id
+from services.resume_compactor import compact_resume
+from services.user_stats import (
+    get_or_create_stats,
+    apply_score,
+    rebuild_stats,
+    build_badges
 )
+from services.history import history_page, chart_series, history_version
+from services.analytics import user_analytics, job_title_stats
+from services.leaderboard import leaderboards, usernames, METRICS, TITLE_METRICS
 # Import the text-to-speech service
-from services.tts_service import generate_tts_audio
+from services.tts_service import (
+    generate_tts_audio,
+    synthesize_to_cache,
+    send_cached_audio,
+    stream_tts_audio
+)
+from services.openai_client import UpstreamUnavailable
+from services.janitor import janitor
+
+# OpenAI keeps failing and the circuit breaker is open: answer right away with
+# "try again shortly" instead of a generic server error
+@app.errorhandler(UpstreamUnavailable)
+def upstream_unavailable(e):
+    response = jsonify(error="The AI service is not responding right now. Please try again shortly.")
+    response.headers["Retry-After"] = str(int(config.OPENAI_BREAKER_RESET_SECONDS))
+    return response, 503
+
+# ------------------- MONITORING -------------------
+
+from services import metrics, job_titles
+from services.metrics import timed
+from services.session_store import session_store
+from services.prefetch import prefetcher
+from services.ai_interview import job_title_cache, first_question_cache, question_pool
+from services.tts_service import tts_cache, tts_stream_stats
+from services.openai_client import upstream
+from services.profiling import SlowRequestProfiler
+
+# Show every cache's and store's numbers on the /metrics page too
+metrics.add_stats_source("sessions", session_store.stats)
+metrics.add_stats_source("prefetch", prefetcher.stats)
+metrics.add_stats_source("job_title_cache", job_title_cache.stats)
+metrics.add_stats_source("job_title_classifier", job_titles.stats)
+metrics.add_stats_source("first_question_cache", first_question_cache.stats)
+metrics.add_stats_source("question_pool", question_pool.stats)
+metrics.add_stats_source("tts_cache", tts_cache.stats)
+metrics.add_stats_source("tts_stream", tts_stream_stats.stats)
+metrics.add_stats_source("user_cache", user_cache.stats)
+metrics.add_stats_source("leaderboard", leaderboards.stats)
+metrics.add_stats_source("db_queries", query_stats.stats)
+metrics.add_stats_source("openai", upstream.stats)
+metrics.add_stats_source("janitor", janitor.stats)
+
+# Remember when each request started...
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+# ...and add how long it took to its route's latency histogram
+@app.after_request
+def record_request_time(response):
+    start = g.get("request_start")
+    if start is not None:
+        metrics.request_seconds.observe(
+            time.perf_counter() - start,
+            request.endpoint or "unknown",
+            request.method,
+            str(response.status_code)
+        )
+    return response
+
+# Prometheus scrapes this page (protected by METRICS_TOKEN when it is set)
+@app.route("/metrics")
+def metrics_page():
+    if config.METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {config.METRICS_TOKEN}":
+        return jsonify(error="Authentication required"), 401
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+# Profile a sample of requests and keep the profiles of the slow ones
+if config.PROFILE_SAMPLE_RATE > 0:
+    app.wsgi_app = SlowRequestProfiler(
+        app.wsgi_app,
+        sample_rate=config.PROFILE_SAMPLE_RATE,
+        slow_seconds=config.PROFILE_SLOW_SECONDS,
+        folder=config.PROFILE_DIR,
+        max_files=config.PROFILE_MAX_FILES
+    )
 
 # ------------------- STREAK SETTINGS -------------------
 
@@ -106,18 +230,35 @@ ALLOWED_EXTENSIONS = {"pdf", "docx", "txt"}
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# Delete old uploaded files (older than 10 minutes) to save space
-def delete_old_files(folder, max_age_seconds=600):
-    if not os.path.isdir(folder):
-        return
-    now = time.time()
-    for fname in os.listdir(folder):
-        path = os.path.join(folder, fname)
-        if os.path.isfile(path) and now - os.path.getmtime(path) > max_age_seconds:
-            try:
-                os.remove(path)
-            except:
-                pass
+# Old uploaded files are deleted by the background janitor: files already
+# in the folder now (from before a restart) are swept once at startup, and
+# anything saved there later should be passed to janitor.track()
+if not PARSER_PROCESS:
+    janitor.sweep(app.config["UPLOAD_FOLDER"], config.UPLOAD_MAX_AGE_SECONDS)
+
+# Expired cached AI results are deleted now and then on the same thread
+if not PARSER_PROCESS:
+    for cache in (job_title_cache, first_question_cache):
+        janitor.every(config.RESULT_CACHE_PURGE_SECONDS, cache.purge_expired)
+    # Index the audio cache, clean up unfinished speech files from before this
+    # worker started, and (the folder is shared) count the other workers' files too
+    tts_cache.load()
+    janitor.sweep(config.TTS_CACHE_DIR, config.TTS_TEMP_MAX_AGE_SECONDS, suffix=".part")
+    janitor.every(config.TTS_CACHE_RESCAN_SECONDS, tts_cache.rescan)
+
+# Fill the question pools of the most common job titles in the background,
+# so even their first candidates skip the AI call for the first question
+if config.QUESTION_POOL_ENABLED and not PARSER_PROCESS:
+    question_pool.warm(config.QUESTION_POOL_WARM_TITLES)
+
+# Compute everyone's per-job-title analytics in the background, so the first
+# /api/analytics request doesn't wait for a scan of the whole history
+if not PARSER_PROCESS:
+    job_title_stats.warm(app)
+
+# Load the leaderboards in the background (saves and reads don't wait for it)
+if not PARSER_PROCESS:
+    leaderboards.start(app)
 
 # ------------------- ROUTES -------------------
 
@@ -174,158 +315,293 @@ def logout():
 @app.route("/career_home")
 @login_required
 def career_home():
-    # Get all past interviews sorted by newest first
-    history_desc = current_user.interviews.order_by(
-        InterviewHistory.created_at.desc()
-    ).all()
-    # Make a list sorted oldest first
-    history_asc = list(reversed(history_desc))
-    # Prepare labels and scores for graph display
-    labels = [h.created_at.strftime("%Y-%m-%d %H:%M") for h in history_asc]
-    scores = [h.score for h in history_asc]
-
-    # Gather user stats
-    total_interviews = len(history_desc)
+    # The table and chart are loaded by the page itself from the history API
+    # below, so this page costs the same no matter how long the history is.
+
+    # Gather user stats (kept up to date by record_interview_result; users
+    # from before the stats table existed get theirs calculated once here)
+    stats = db.session.get(UserStats, current_user.id)
+    if stats is None:
+        stats = rebuild_stats(current_user.id)
+        db.session.commit()
+    # Read the streak from the database, not the user cache (another worker
+    # may have updated it in the last few seconds)
+    db.session.refresh(current_user._get_current_object())
     current_streak   = current_user.streak_count or 0
     longest_streak   = current_user.longest_streak or 0
-    highest_score    = max((h.score for h in history_desc), default=0)
-
-    # Check for special "runs" (long streaks of good scores)
-    runs = {}
-    for min_score, run_len in [(5,5), (6,10), (7,20), (8,50)]:
-        max_run = cur = 0
-        for h in history_asc:
-            if h.score >= min_score:
-                cur += 1
-                max_run = max(max_run, cur)
-            else:
-                cur = 0
-        runs[(min_score, run_len)] = (max_run >= run_len)
-
-    # Define possible badges user can earn
-    badge_defs = [
-        (total_interviews >= 1,   "First Interview",   "🥇"),
-        (total_interviews >= 5,   "5 Interviews",      "🥈"),
-        (total_interviews >= 20,  "20 Interviews",     "🥉"),
-        (total_interviews >= 100, "100 Interviews",    "🏆"),
-        (current_streak >= 1,    "1‑Day Streak",   "🔥"),
-        (current_streak >= 5,    "5‑Day Streak",   "🔥🔥"),
-        (current_streak >= 20,   "20‑Day Streak",  "🔥🔥🔥"),
-        (current_streak >= 100,  "100‑Day Streak", "🔥🔥🔥🔥"),
-        (highest_score >= 5,  "First 5+ Score",  "⭐"),
-        (highest_score >= 7,  "First 7+ Score",  "🌟"),
-        (highest_score >= 9,  "First 9+ Score",  "✨"),
-        (highest_score >= 10, "Perfect Score",    "💯"),
-        (runs[(5,5)],   "Run of 5×≥5",   "🏁"),
-        (runs[(6,10)],  "Run of 10×≥6",  "🏅"),
-        (runs[(7,20)],  "Run of 20×≥7",  "🎖️"),
-        (runs[(8,50)],  "Run of 50×≥8",  "🏆"),
-    ]
-
-    # Prepare badge data for the template
-    potential_badges = [
-        {"name": n, "icon": i, "earned": c}
-        for c,n,i in badge_defs
-    ]
+
+    # Work out which badges the user has earned
+    potential_badges = build_badges(stats, current_streak)
 
     # Send everything to the career_home.html template
     return render_template(
         "career_home.html",
-        interviews=history_desc,
-        labels=labels,
-        scores=scores,
         streak=current_streak,
         longest=longest_streak,
         potential_badges=potential_badges
     )
 
+# One page of the user's interview history (newest first).
+# Pass the "next_cursor" from a response as ?cursor= to get the next page.
+@app.route("/api/history")
+@login_required
+def api_history():
+    limit = request.args.get("limit", type=int)
+    try:
+        page = history_page(current_user.id, limit, request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(page)
+
+# Progress chart data, shrunk to at most ?points= dates and scores
+@app.route("/api/history/chart")
+@login_required
+def api_history_chart():
+    points = request.args.get("points", type=int)
+    # The data only changes when an interview is saved, so let the browser
+    # reuse its copy (304 Not Modified) until then
+    etag = f"{current_user.id}-{points}-{history_version(current_user.id)}"
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    response = jsonify(chart_series(current_user.id, points))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+# Score analytics: averages, percentiles, trend and moving average of the
+# overall score and each rubric category, per job title and compared with
+# everyone who interviewed for the same job title
+@app.route("/api/analytics")
+@login_required
+def api_analytics():
+    window = request.args.get("window", type=int)
+    # Changes when this user saves an interview, and when the numbers of
+    # everyone else are recomputed
+    refreshed = int(time.time() // config.ANALYTICS_CACHE_SECONDS)
+    etag = f"{current_user.id}-{window}-{history_version(current_user.id)}-{refreshed}"
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    response = jsonify(user_analytics(current_user.id, window))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+# Leaderboard: the best users by highest score, interview count or longest
+# streak (overall, or among everyone who interviewed for one job title),
+# plus where the current user stands
+@app.route("/api/leaderboard")
+@login_required
+def api_leaderboard():
+    metric = request.args.get("metric", "highest_score")
+    job_title = request.args.get("job_title") or None
+    limit = request.args.get("limit", config.LEADERBOARD_TOP_K, type=int)
+    if metric not in (TITLE_METRICS if job_title else METRICS):
+        return jsonify(error="Unknown leaderboard"), 400
+    limit = max(1, min(limit, config.LEADERBOARD_TOP_K))
+
+    top = leaderboards.top(metric, job_title, limit)
+    names = usernames([user_id for _, user_id, _ in top])
+    rank, value, total = leaderboards.rank(current_user.id, metric, job_title)
+    return jsonify(
+        metric=metric,
+        job_title=job_title,
+        top=[{"rank": r, "username": names.get(user_id), "value": v} for r, user_id, v in top],
+        me={"rank": rank, "value": value, "of": total},
+        # The boards are still being loaded: ask again in a moment
+        loading=not leaderboards.ready,
+    )
+
 # Interview page
 @app.route("/interview")
 @login_required
 def interview():
     return render_template("interview.html")
 
-# Upload a resume
-@app.route("/upload", methods=["POST"])
-@login_required
-def upload():
-    # Clean up old files
-    delete_old_files(app.config["UPLOAD_FOLDER"])
+# Get the resume text from the request (uploaded file or pasted text).
+# Returns (resume_text, None) on success or (None, error_response) on failure.
+def read_resume_from_request():
     resume_text = ""
     # Check if a resume file was uploaded
     if "resume" in request.files:
         file = request.files["resume"]
         # Check file type
         if not allowed_file(file.filename):
-            return jsonify(error="Invalid file type"), 400
-        # Save the file securely
-        fn   = secure_filename(file.filename)
-        path = os.path.join(app.config["UPLOAD_FOLDER"], fn)
-        file.save(path)
-        # Delete file after request is done
-        @after_this_request
-        def rm(r):
-            try: os.remove(path)
-            except: pass
-            return r
-        # Try to load resume text
+            return None, (jsonify(error="Invalid file type"), 400)
+        # Read the resume straight from the upload (nothing is written to disk)
         try:
-            resume_text = load_resume(path)
+            resume_text = load_resume(file.stream, file.filename)
         except Exception as e:
-            return jsonify(error=f"Failed to parse resume: {e}"), 500
+            return None, (jsonify(error=f"Failed to parse resume: {e}"), 500)
     # Or if user directly pasted resume text
     elif "resume_text" in request.form:
         resume_text = request.form["resume_text"]
 
     # If no resume found
     if not resume_text:
-        return jsonify(error="No resume text found"), 400
+        return None, (jsonify(error="No resume text found"), 400)
+    return resume_text, None
+
+# Save a finished interview's score and update the user's streak
+@timed("save_result")
+def record_interview_result(job_title, score, categories=None):
+    # Take the write lock first: the streak and stats below are read and
+    # updated inside it, so two finishing interviews can't overwrite each other
+    begin_write()
+    user_id = current_user.id
+
+    hist = InterviewHistory(
+        user_id   = user_id,
+        job_title = job_title,
+        score     = score
+    )
+    # The score of each rubric category (clarity, professionalism, ...)
+    hist.set_category_scores(categories or {})
+    db.session.add(hist)
+
+    # Update the running totals used by Career Home (same transaction)
+    apply_score(get_or_create_stats(user_id), score)
+
+    # Update user's streak info
+    now  = datetime.utcnow()
+    last = current_user.last_interview_time
+    if last is None:
+        current_user.streak_count = 1
+    else:
+        delta = now - last
+        if delta > STREAK_BREAK_THRESHOLD:
+            current_user.streak_count = 1
+        elif delta >= STREAK_INCREMENT_THRESHOLD:
+            current_user.streak_count += 1
+    if current_user.streak_count > current_user.longest_streak:
+        current_user.longest_streak = current_user.streak_count
+    current_user.last_interview_time = now
+    db.session.commit()
+
+    # The cached copy of this user has an old streak now (use the saved id:
+    # reading current_user after the commit would reload it from the database)
+    user_cache.invalidate(user_id)
+
+    # Put the new score, count and streak on the leaderboards straight away
+    # (if this fails, or they are still loading, the next sync picks them up)
+    try:
+        leaderboards.catch_up()
+    except Exception:
+        db.session.rollback()
+        logging.exception("Leaderboard catch-up failed")
+
+# Format one Server-Sent Event (the format EventSource/stream readers expect)
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Wrap a generator of SSE strings in a streaming response
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Stop proxies (nginx) from buffering the stream
+        }
+    )
+
+# Upload a resume
+@app.route("/upload", methods=["POST"])
+@login_required
+def upload():
+    resume_text, error = read_resume_from_request()
+    if error:
+        return error
+
+    # Clean up and shorten the resume once; every prompt of this interview uses it
+    prompt_resume  = compact_resume(resume_text)
 
-    # Start an interview
-    job_title      = guess_job_title(resume_text)
-    first_question = start_interview(resume_text, job_title)
+    # Start an interview (each one gets its own id so sessions never collide)
+    interview_id   = new_interview_id()
+    job_title      = guess_job_title(prompt_resume)
+    first_question = start_interview(current_user.id, interview_id, prompt_resume, job_title)
     formatted      = f"<br><br><strong>Interview Question:</strong><br>{first_question}"
+    # Remember the active interview in the login session too
+    session["interview_id"] = interview_id
 
     return jsonify({
-        "job_title":   job_title,
-        "question":    formatted,
-        "resume_text": resume_text
+        "interview_id": interview_id,
+        "job_title":    job_title,
+        "question":     formatted,
+        "resume_text":  resume_text
     })
 
+# Upload a resume, streaming the first question as Server-Sent Events:
+#   "meta"  – interview id and job title (sent as soon as the title is known)
+#   "token" – the next piece of the first question
+#   "done"  – the same JSON the /upload route returns
+@app.route("/upload/stream", methods=["POST"])
+@login_required
+def upload_stream():
+    resume_text, error = read_resume_from_request()
+    if error:
+        return error
+
+    prompt_resume = compact_resume(resume_text)
+    interview_id  = new_interview_id()
+    session["interview_id"] = interview_id
+    user_id = current_user.id
+
+    def events():
+        try:
+            job_title = guess_job_title(prompt_resume)
+            yield sse_event("meta", {"interview_id": interview_id, "job_title": job_title})
+            parts = []
+            for text in stream_start_interview(user_id, interview_id, prompt_resume, job_title):
+                parts.append(text)
+                yield sse_event("token", {"section": "question", "text": text})
+            first_question = "".join(parts).strip()
+            yield sse_event("done", {
+                "interview_id": interview_id,
+                "job_title":    job_title,
+                "question":     f"<br><br><strong>Interview Question:</strong><br>{first_question}",
+                "resume_text":  resume_text
+            })
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+    return sse_response(events())
+
 # Chat route (answer interview questions)
 @app.route("/chat", methods=["POST"])
 @login_required
 def chat():
-    msg    = request.json.get("message", "")
-    result = process_interview_message(msg)
+    msg          = request.json.get("message", "")
+    # Use the interview the page is showing, or fall back to the latest one
+    interview_id = request.json.get("interview_id") or session.get("interview_id")
+    result       = process_interview_message(current_user.id, interview_id, msg)
 
     # If a score is returned, save the interview result
     if result.get("score") is not None:
-        hist = InterviewHistory(
-            user_id   = current_user.id,
-            job_title = result["job_title"],
-            score     = result["score"]
-        )
-        db.session.add(hist)
-
-        # Update user's streak info
-        now  = datetime.utcnow()
-        last = current_user.last_interview_time
-        if last is None:
-            current_user.streak_count = 1
-        else:
-            delta = now - last
-            if delta > STREAK_BREAK_THRESHOLD:
-                current_user.streak_count = 1
-            elif delta >= STREAK_INCREMENT_THRESHOLD:
-                current_user.streak_count += 1
-        if current_user.streak_count > current_user.longest_streak:
-            current_user.longest_streak = current_user.streak_count
-        current_user.last_interview_time = now
-        db.session.commit()
+        record_interview_result(result["job_title"], result["score"], result.get("categories"))
 
     return jsonify(result)
 
+# Chat route that streams the AI's reply as Server-Sent Events ("token" pieces,
+# then "done" with the same JSON /chat returns). The score is saved once the
+# stream has finished.
+@app.route("/chat/stream", methods=["POST"])
+@login_required
+def chat_stream():
+    msg          = request.json.get("message", "")
+    interview_id = request.json.get("interview_id") or session.get("interview_id")
+    user_id      = current_user.id
+
+    def events():
+        try:
+            for event, data in stream_interview_message(user_id, interview_id, msg):
+                if event == "done" and data.get("score") is not None:
+                    record_interview_result(data["job_title"], data["score"], data.get("categories"))
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+    return sse_response(events())
+
 # Text-to-speech route
 @app.route("/speak", methods=["POST"])
 @login_required
@@ -333,11 +609,34 @@ def speak():
     text = request.json.get("text")
     if not text:
         return jsonify(error="No text provided"), 400
+    # The page can ask for a link instead of the audio itself, so the browser
+    # can replay and seek it with cached, ranged GET requests
+    if request.json.get("as_url"):
+        key = synthesize_to_cache(text)
+        return jsonify(url=url_for("tts_audio", key=key))
     return generate_tts_audio(text)
 
+# Text-to-speech that starts playing after the first sentence: MP3 bytes are
+# streamed sentence by sentence instead of waiting for the whole recording
+@app.route("/speak/stream", methods=["POST"])
+@login_required
+def speak_stream():
+    text = request.json.get("text")
+    if not text:
+        return jsonify(error="No text provided"), 400
+    return Response(
+        stream_with_context(stream_tts_audio(text)),
+        mimetype="audio/mpeg",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Serve previously generated speech (supports ETag and Range requests)
+@app.route("/tts/<key>.mp3")
+@login_required
+def tts_audio(key):
+    return send_cached_audio(key)
+
 # ------------------- RUN THE APP -------------------
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()  # Create database tables if they don't exist
     app.run(debug=True, host="0.0.0.0", port=5000)  # Start the app!
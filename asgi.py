@@ -0,0 +1,143 @@
+# asgi.py
+
+# ASGI entry point: serves the app with an async server so a single process
+# can keep hundreds of interviews waiting on OpenAI at the same time.
+#
+# The routes that wait on the AI (/upload, /chat and /speak) are swapped for
+# Flask async views: their OpenAI calls run on the server's event loop, so
+# hundreds of them can be waiting at once without each needing its own
+# connection or worker. Every request goes through the normal Flask app
+# (asgiref's WsgiToAsgi), so routing, errors and sessions work as usual.
+#
+# Start it with:
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000
+#
+# The plain Flask app (python app.py, or any WSGI server) keeps working too.
+
+# Import built-in modules
+import asyncio   # To run blocking work (database, file parsing) in threads
+import contextvars  # To give every request a clean context
+
+# Import the adapter that runs a WSGI (Flask) app under an ASGI server
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+# Import Flask tools used by the async routes
+from flask import request, jsonify, session, url_for
+
+# Import the Flask app and the pieces its routes share
+from app import (
+    app,
+    login_manager,
+    read_resume_from_request,
+    record_interview_result,
+    compact_resume,
+    new_interview_id
+)
+from models.user import db
+from flask_login import current_user
+
+# Import the async versions of the AI and speech services
+from services.ai_interview import aguess_job_title, astart_interview, aprocess_interview_message
+from services.tts_service import asynthesize_to_cache, agenerate_tts_audio
+
+
+# ---------------------- Async Routes ----------------------
+
+# Id of the logged-in user, or None. Runs in a thread (it may query the
+# database) and ends the read transaction, so no database connection is
+# held while the request waits for OpenAI.
+def _logged_in_user_id():
+    user_id = current_user.id if current_user.is_authenticated else None
+    db.session.commit()
+    return user_id
+
+# Async /upload (same request and response as the Flask route)
+async def upload():
+    user_id = await asyncio.to_thread(_logged_in_user_id)
+    if user_id is None:
+        return login_manager.unauthorized()
+
+    # Reading the file and cleaning the text is CPU work: do it in a thread
+    resume_text, error = await asyncio.to_thread(read_resume_from_request)
+    if error:
+        return error
+    prompt_resume = await asyncio.to_thread(compact_resume, resume_text)
+
+    interview_id   = new_interview_id()
+    job_title      = await aguess_job_title(prompt_resume)
+    first_question = await astart_interview(user_id, interview_id, prompt_resume, job_title)
+    formatted      = f"<br><br><strong>Interview Question:</strong><br>{first_question}"
+    session["interview_id"] = interview_id
+
+    return jsonify({
+        "interview_id": interview_id,
+        "job_title":    job_title,
+        "question":     formatted,
+        "resume_text":  resume_text
+    })
+
+# Async /chat (same request and response as the Flask route)
+async def chat():
+    user_id = await asyncio.to_thread(_logged_in_user_id)
+    if user_id is None:
+        return login_manager.unauthorized()
+
+    msg          = request.json.get("message", "")
+    interview_id = request.json.get("interview_id") or session.get("interview_id")
+    result       = await aprocess_interview_message(user_id, interview_id, msg)
+
+    # If a score is returned, save the interview result
+    if result.get("score") is not None:
+        await asyncio.to_thread(
+            record_interview_result, result["job_title"], result["score"], result.get("categories")
+        )
+
+    return jsonify(result)
+
+# Async /speak (same request and response as the Flask route)
+async def speak():
+    user_id = await asyncio.to_thread(_logged_in_user_id)
+    if user_id is None:
+        return login_manager.unauthorized()
+
+    text = request.json.get("text")
+    if not text:
+        return jsonify(error="No text provided"), 400
+    if request.json.get("as_url"):
+        key = await asynthesize_to_cache(text)
+        return jsonify(url=url_for("tts_audio", key=key))
+    return await agenerate_tts_audio(text)
+
+
+# ---------------------- Serving ----------------------
+
+# Flask runs these in place of the normal views (same endpoints, so the same
+# URLs, error handlers and session cookie). Flask hands an async view to
+# asgiref, which runs it on the server's event loop, where it waits on OpenAI
+# with the other requests. Importing this module switches the views for the
+# whole process: it is meant to be imported by the ASGI server only.
+ASYNC_VIEWS = {
+    "upload": upload,
+    "chat":   chat,
+    "speak":  speak,
+}
+app.view_functions.update(ASYNC_VIEWS)
+
+# Every request (async views included) goes through the Flask app
+flask_app = WsgiToAsgi(app)
+
+# The ASGI application. Every request runs in a fresh context: on a
+# kept-alive connection the server can start the next request from inside
+# the previous one, and Flask would then reuse that request's app context
+# (its `g`, logged-in user and database session).
+async def application(scope, receive, send):
+    await asyncio.create_task(_serve(scope, receive, send), context=contextvars.Context())
+
+# asgiref runs WSGI code on one shared thread unless the request has its own
+# ThreadSensitiveContext, which would serve the whole process one request at
+# a time. With it, each request gets a thread of its own; an async view's
+# thread sleeps while the view waits on OpenAI on the event loop.
+async def _serve(scope, receive, send):
+    async with ThreadSensitiveContext():
+        await flask_app(scope, receive, send)
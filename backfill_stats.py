@@ -0,0 +1,27 @@
+# Import the Flask app instance and database object from your main app
+from app import app, db
+
+# Import the User model and the function that recalculates a user's stats
+from models.user import User
+from services.user_stats import rebuild_stats
+
+# This line ensures the following code runs within the Flask app context,
+# so we can talk to the database.
+with app.app_context():
+    # Recalculate the Career Home stats of every user from their history.
+    # Each user is saved on its own so a long run can be stopped safely.
+    count = 0
+    for (user_id,) in db.session.query(User.id).order_by(User.id).all():
+        stats = rebuild_stats(user_id)
+        db.session.commit()
+        count += 1
+        print(f"user {user_id}: {stats.total_interviews} interviews, best {stats.highest_score}")
+
+    print(f"Rebuilt stats for {count} users.")
+
+# Instructions for the developer:
+# Career Home keeps each user's totals in the user_stats table and updates
+# them whenever an interview is saved. Run this once after upgrading (or any
+# time the numbers look wrong) to recalculate them from the interview history:
+#
+# python backfill_stats.py
@@ -0,0 +1,121 @@
+# benchmarks/bench_analytics.py
+
+# Times the score analytics (services/analytics.py) on a large history:
+# the per-job-title statistics of all users, and /api/analytics for one user
+# with a long history. For comparison it also computes the same per-title
+# means and percentiles with plain Python loops over the rows.
+#
+# Run from the project root:
+#   python benchmarks/bench_analytics.py --rows 1000000 --user-rows 10000
+
+# Import built-in modules
+import argparse     # To read command-line options
+import os           # For environment variables and paths
+import random       # For fake scores
+import statistics   # For median
+import sys          # To make the project importable
+import tempfile     # For a throwaway database
+import time         # For timing
+from datetime import datetime, timedelta
+
+# Make the project root importable and use a throwaway database
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+from app import app, db
+from models.user import User, InterviewHistory
+from services.analytics import FIELDS, PERCENTILES, _COLUMNS, job_title_stats
+
+JOB_TITLES = [f"Job Title {i}" for i in range(40)]
+
+
+# Insert `count` interviews for `user_id` (random titles and scores; about
+# one in ten has no category scores, like interviews saved before they existed)
+def add_history(user_id: int, count: int, batch: int = 20000):
+    start = datetime.utcnow() - timedelta(minutes=count)
+    for offset in range(0, count, batch):
+        rows = []
+        for n in range(offset, min(offset + batch, count)):
+            row = {
+                "user_id": user_id,
+                "job_title": random.choice(JOB_TITLES),
+                "score": random.randint(1, 10),
+                "created_at": start + timedelta(minutes=n),
+            }
+            if random.random() > 0.1:
+                for key in InterviewHistory.CATEGORY_KEYS:
+                    row[f"score_{key}"] = random.randint(1, 10)
+            rows.append(row)
+        db.session.execute(db.insert(InterviewHistory), rows)
+    db.session.commit()
+
+# The per-title numbers the way a plain Python loop would compute them
+def python_job_title_stats() -> dict:
+    values = {}
+    for title, *scores in db.session.execute(db.select(InterviewHistory.job_title, *_COLUMNS)):
+        per_field = values.setdefault(title, [[] for _ in FIELDS])
+        for j, score in enumerate(scores):
+            if score is not None:
+                per_field[j].append(score)
+    result = {}
+    for title, per_field in values.items():
+        result[title] = {}
+        for field, column in zip(FIELDS, per_field):
+            column.sort()
+            entry = {"mean": statistics.fmean(column) if column else None}
+            for p in PERCENTILES:
+                entry[f"p{p}"] = column[int(p / 100 * (len(column) - 1))] if column else None
+            result[title][field] = entry
+    return result
+
+# Best of `runs` timings of fn(), in milliseconds
+def best_ms(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score analytics time on a large history")
+    parser.add_argument("--rows", type=int, default=1000000, help="interviews of other users")
+    parser.add_argument("--user-rows", type=int, default=10000, help="interviews of the measured user")
+    parser.add_argument("--runs", type=int, default=3, help="timings per case (best is shown)")
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+    client = app.test_client()
+    client.post("/register", data={"username": "bench-analytics", "password": "bench"})
+    with app.app_context():
+        user_id = User.query.filter_by(username="bench-analytics").first().id
+        print(f"Inserting {args.rows + args.user_rows} interviews...")
+        others = User(username="bench-others", password="-")
+        db.session.add(others)
+        db.session.commit()
+        add_history(others.id, args.rows)
+        add_history(user_id, args.user_rows)
+
+        def numpy_stats():
+            job_title_stats.clear()
+            job_title_stats.get()
+
+        print(f"{'case':<34}{'best (ms)':>10}")
+        print(f"{'job titles (Python loops)':<34}{best_ms(python_job_title_stats, args.runs):>10.1f}")
+        print(f"{'job titles (NumPy)':<34}{best_ms(numpy_stats, args.runs):>10.1f}")
+
+    # The endpoint, with the job-title numbers already cached
+    print(f"{'/api/analytics':<34}{best_ms(lambda: client.get('/api/analytics'), args.runs):>10.1f}")
+    res = client.get("/api/analytics")
+    assert res.status_code == 200, res.status_code
+    print(f"{'/api/analytics (bytes)':<34}{len(res.data):>10}")
+
+
+if __name__ == "__main__":
+    main()
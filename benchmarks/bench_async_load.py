@@ -0,0 +1,174 @@
+# benchmarks/bench_async_load.py
+
+# Compares how many interviews one process can run at the same time with the
+# sync deployment (a fixed number of worker threads, each blocked for the
+# whole upstream call) and with the async ASGI entry point (asgi.py), where
+# the OpenAI calls of all waiting requests share one event loop.
+#
+# Every simulated user runs one whole interview (/upload, then /chat twice).
+# Upstream calls are replaced with fake clients that wait a fixed latency.
+# The async side is driven in-process through the ASGI interface, so no
+# server or network is involved on either side.
+#
+# Run from the project root:
+#   python benchmarks/bench_async_load.py --users 300 --sync-threads 16 --latency 0.5
+
+# Import built-in modules
+import argparse     # To read command-line options
+import asyncio      # To drive the ASGI app
+import os           # For environment variables and paths
+import statistics   # For median
+import sys          # To make the project importable
+import tempfile     # For a throwaway database
+import threading    # For the simulated sync users
+import time         # For timing
+from urllib.parse import urlencode  # To build form bodies
+import json         # To build and read JSON bodies
+
+# Make the project root importable and use a throwaway database
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+import services.ai_interview as ai_interview
+from app import app
+from benchmarks.fake_openai import FakeOpenAI, FakeAsyncOpenAI
+
+
+# A resume that is different for every interview (so no cached answers)
+def resume_for(n: int) -> str:
+    return f"Candidate {n}: Python developer, 5 years of Flask and SQL."
+
+
+# ---------------------- Sync Deployment ----------------------
+
+# `users` threads each run one interview through the Flask app, but only
+# `workers` requests can be inside the app at once (like a WSGI server
+# with that many worker threads)
+def run_sync(users: int, workers: int, cookies: list) -> list:
+    slots = threading.BoundedSemaphore(workers)
+    times = []
+
+    def user(n):
+        client = app.test_client()
+        client.set_cookie("session", cookies[n % len(cookies)])
+        start = time.perf_counter()
+        with slots:
+            res = client.post("/upload", data={"resume_text": resume_for(n)})
+        interview_id = res.get_json()["interview_id"]
+        for answer in ("First answer.", "Follow-up answer."):
+            with slots:
+                res = client.post("/chat", json={"message": answer, "interview_id": interview_id})
+        assert res.get_json().get("score") is not None, res.get_json()
+        times.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return times
+
+
+# ---------------------- Async Deployment ----------------------
+
+# Send one request to the ASGI app and return (status, body)
+async def asgi_request(application, path: str, body: bytes, content_type: str, cookie: str):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+            (b"cookie", f"session={cookie}".encode()),
+        ],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {"body": b""}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] += message.get("body", b"")
+
+    await application(scope, receive, send)
+    return response["status"], response["body"]
+
+# All users run their interview at once on one event loop
+async def run_async(application, users: int, cookies: list) -> list:
+    times = []
+
+    async def user(n):
+        cookie = cookies[n % len(cookies)]
+        start = time.perf_counter()
+        _, body = await asgi_request(
+            application, "/upload", urlencode({"resume_text": resume_for(n)}).encode(),
+            "application/x-www-form-urlencoded", cookie
+        )
+        interview_id = json.loads(body)["interview_id"]
+        for answer in ("First answer.", "Follow-up answer."):
+            _, body = await asgi_request(
+                application, "/chat", json.dumps({"message": answer, "interview_id": interview_id}).encode(),
+                "application/json", cookie
+            )
+        assert json.loads(body).get("score") is not None, body
+        times.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(user(n) for n in range(users)))
+    return times
+
+
+# ---------------------- Main ----------------------
+
+def report(name: str, times: list, wall: float):
+    times = sorted(times)
+    print(f"{name:<24}{len(times):>7}{wall:>9.2f}{len(times) / wall:>14.1f}"
+          f"{statistics.median(times):>12.2f}{times[int(len(times) * 0.95) - 1]:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async interview load")
+    parser.add_argument("--users", type=int, default=300, help="interviews running at once")
+    parser.add_argument("--sync-threads", type=int, default=16, help="worker threads of the sync deployment")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake upstream latency per call (s)")
+    parser.add_argument("--accounts", type=int, default=20, help="user accounts the interviews are spread over")
+    args = parser.parse_args()
+
+    # Swap the real OpenAI clients for fake ones
+    ai_interview.client = FakeOpenAI(latency=args.latency)
+    ai_interview.async_client = FakeAsyncOpenAI(latency=args.latency)
+
+    # Log in a few accounts and keep their session cookies
+    cookies = []
+    for n in range(args.accounts):
+        client = app.test_client()
+        client.post("/register", data={"username": f"bench-{os.getpid()}-{n}", "password": "bench"})
+        cookies.append(client.get_cookie("session").value)
+
+    print(f"{args.users} users, upstream latency {args.latency:g}s per call")
+    print(f"{'deployment':<24}{'done':>7}{'wall (s)':>9}{'interviews/s':>14}"
+          f"{'median (s)':>12}{'p95 (s)':>10}")
+
+    start = time.perf_counter()
+    times = run_sync(args.users, args.sync_threads, cookies)
+    report(f"sync ({args.sync_threads} threads)", times, time.perf_counter() - start)
+
+    # Importing asgi.py swaps /upload and /chat for their async views in this
+    # process, so it only happens once the sync run is over
+    from asgi import application
+    start = time.perf_counter()
+    times = asyncio.run(run_async(application, args.users, cookies))
+    report("async (1 event loop)", times, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_dashboard.py
+
+# Measures Career Home response time and size for users with 100, 1k, 10k
+# and 100k past interviews: the page itself (/career_home), the first and a
+# deep page of the history table (/api/history) and the progress chart
+# (/api/history/chart, first load and a 304 revalidation). Page, table and
+# chart sizes should stay flat as history grows.
+# For comparison it also times a full rebuild of the stats from history,
+# which is roughly what the page used to do on every visit.
+#
+# Run from the project root:
+#   python benchmarks/bench_dashboard.py --sizes 100,1000,10000,100000
+
+# Import built-in modules
+import argparse     # To read command-line options
+import os           # For environment variables and paths
+import random       # For fake scores
+import statistics   # For median
+import sys          # To make the project importable
+import tempfile     # For a throwaway database
+import time         # For timing requests
+from datetime import datetime, timedelta
+
+# Make the project root importable and use a throwaway database
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+from app import app, db
+from models.user import User, InterviewHistory
+from services.user_stats import rebuild_stats
+
+
+# Insert `count` interviews for a user in one bulk statement per batch
+def add_history(user_id: int, count: int, batch: int = 10000):
+    start = datetime.utcnow() - timedelta(minutes=count)
+    for offset in range(0, count, batch):
+        rows = [
+            {
+                "user_id": user_id,
+                "job_title": "Software Engineer",
+                "score": random.randint(1, 10),
+                "created_at": start + timedelta(minutes=n),
+            }
+            for n in range(offset, min(offset + batch, count))
+        ]
+        db.session.execute(db.insert(InterviewHistory), rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Career Home time by history size")
+    parser.add_argument("--sizes", default="100,1000,10000,100000", help="interviews per user")
+    parser.add_argument("--runs", type=int, default=20, help="page loads per size")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    with app.app_context():
+        db.create_all()
+
+    print(f"{'interviews':>10}{'endpoint':>22}{'median (ms)':>13}{'max (ms)':>10}{'bytes':>9}")
+    for size in sizes:
+        # A fresh logged-in user with `size` past interviews
+        client = app.test_client()
+        username = f"bench-{os.getpid()}-{size}"
+        client.post("/register", data={"username": username, "password": "bench"})
+        with app.app_context():
+            user_id = User.query.filter_by(username=username).first().id
+            add_history(user_id, size)
+
+            # Time the old per-visit work: a full pass over the history
+            start = time.perf_counter()
+            rebuild_stats(user_id)
+            db.session.commit()
+            rebuild = time.perf_counter() - start
+        print(f"{size:>10}{'full rebuild':>22}{rebuild * 1000:>13.1f}")
+
+        # Follow the history cursor 50 pages deep
+        cursor = None
+        for _ in range(50):
+            page = client.get("/api/history", query_string={"cursor": cursor} if cursor else {}).get_json()
+            cursor = page["next_cursor"] or cursor
+        chart = client.get("/api/history/chart")
+
+        cases = [
+            ("/career_home", "/career_home", {}),
+            ("/api/history", "/api/history", {}),
+            ("/api/history (deep)", "/api/history", {"query_string": {"cursor": cursor}}),
+            ("/api/history/chart", "/api/history/chart", {}),
+            ("chart (304)", "/api/history/chart", {"headers": {"If-None-Match": chart.headers["ETag"]}}),
+        ]
+        for name, url, kwargs in cases:
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                res = client.get(url, **kwargs)
+                times.append(time.perf_counter() - start)
+                assert res.status_code in (200, 304), res.status_code
+            print(f"{size:>10}{name:>22}{statistics.median(times) * 1000:>13.1f}"
+                  f"{max(times) * 1000:>10.1f}{len(res.data):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_export.py
+
+# Throughput and peak memory of export.py on big interview histories,
+# against reading the whole table first (like list_users.py did).
+#
+# Fills a throwaway SQLite database with --rows synthetic interviews (and the
+# users they belong to), then runs `export.py history` in a fresh process for
+# each size and format, and reports rows per second and the process's peak
+# memory. Streaming keeps the peak flat as the table grows; reading it all
+# first grows with it.
+#
+# Run from the project root:
+#   python benchmarks/bench_export.py --rows 1000000 3000000
+
+# Import built-in modules
+import argparse     # To read command-line options
+import os           # For paths, environment and wait4()
+import random       # To make up interviews
+import sqlite3      # To fill the database quickly
+import subprocess   # To run each export in its own process
+import sys          # To make the project importable
+import tempfile     # For the throwaway database
+import time         # For timing
+from datetime import datetime, timedelta
+
+# Make the project root importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from models.user import db, InterviewHistory
+
+# Reads the whole table into a list before writing it (the old way)
+READ_ALL = """
+import csv, sys
+from sqlalchemy import create_engine, text
+import config
+with create_engine(config.DATABASE_URI).connect() as conn:
+    rows = conn.execute(text("SELECT * FROM interview_history ORDER BY id")).all()
+csv.writer(sys.stdout).writerows(rows)
+"""
+
+
+# Add interviews to the database until it holds `rows` of them
+def fill(path: str, rows: int, users: int):
+    conn = sqlite3.connect(path)
+    have = conn.execute("SELECT COUNT(*) FROM interview_history").fetchone()[0]
+    if not conn.execute("SELECT COUNT(*) FROM user").fetchone()[0]:
+        conn.executemany("INSERT INTO user (id, username, password, streak_count, longest_streak) VALUES (?, ?, 'x', 0, 0)",
+                         ((u, f"user{u}") for u in range(1, users + 1)))
+    start = datetime(2024, 1, 1)
+    columns = ", ".join(f"score_{key}" for key in InterviewHistory.CATEGORY_KEYS)
+    conn.executemany(
+        f"INSERT INTO interview_history (user_id, job_title, score, created_at, {columns}) "
+        f"VALUES (?, ?, ?, ?, {', '.join('?' * len(InterviewHistory.CATEGORY_KEYS))})",
+        ((random.randint(1, users), random.choice(["Data Analyst", "Software Engineer", "Teacher"]),
+          random.randint(0, 10), str(start + timedelta(minutes=n)),
+          *(random.randint(0, 10) for _ in InterviewHistory.CATEGORY_KEYS))
+         for n in range(have, rows))
+    )
+    conn.commit()
+    conn.close()
+
+# Run a command with DATABASE_URL set; return (seconds, peak memory in MB)
+def measure(command: list, database_url: str) -> tuple:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise SystemExit(process.stderr.read().decode())
+    process.stderr.close()
+    return elapsed, usage.ru_maxrss / 1024  # ru_maxrss is in KB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description="export.py throughput and memory on big histories")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 3000000], help="history sizes to try")
+    parser.add_argument("--users", type=int, default=100000, help="users the interviews belong to")
+    parser.add_argument("--no-baseline", action="store_true", help="skip the read-everything comparison")
+    args = parser.parse_args()
+
+    random.seed(1)
+    path = os.path.join(tempfile.mkdtemp(), "export.db")
+    url = f"sqlite:///{path}"
+    db.metadata.create_all(create_engine(url))
+
+    print(f"{'rows':>10}  {'how':<22}{'seconds':>9}{'rows/s':>11}{'peak MB':>9}")
+    for rows in sorted(args.rows):
+        fill(path, rows, args.users)
+        runs = [("export.py csv", [sys.executable, "export.py", "history", "--output", os.devnull]),
+                ("export.py jsonl", [sys.executable, "export.py", "history", "--format", "jsonl", "--output", os.devnull])]
+        if not args.no_baseline:
+            runs.append(("read all, then write", [sys.executable, "-c", READ_ALL]))
+        for name, command in runs:
+            seconds, peak = measure(command, url)
+            print(f"{rows:>10,}  {name:<22}{seconds:>9.1f}{rows / seconds:>11,.0f}{peak:>9.0f}")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
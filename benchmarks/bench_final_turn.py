@@ -0,0 +1,69 @@
+# benchmarks/bench_final_turn.py
+
+# Compares end-to-end /chat latency of the final (scoring) interview turn
+# across the three FINAL_TURN_MODE settings: sequential, parallel, combined.
+#
+# Upstream calls are replaced with a fake client that sleeps for a fixed
+# latency, so the numbers show how many upstream waits each mode stacks up.
+#
+# Run from the project root:
+#   python benchmarks/bench_final_turn.py --latency 0.5 --runs 20
+
+# Import built-in modules
+import argparse     # To read command-line options
+import os           # For environment variables and paths
+import statistics   # For median / mean
+import sys          # To make the project importable
+import tempfile     # For a throwaway database
+import time         # For timing requests
+
+# Make the project root importable and use a throwaway database
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+import config
+import services.ai_interview as ai_interview
+from app import app, db
+from benchmarks.fake_openai import FakeOpenAI
+
+
+# Run one full interview and return how long the final /chat call took
+def run_interview(client) -> float:
+    res = client.post("/upload", data={"resume_text": "Python developer, 5 years of Flask."})
+    interview_id = res.get_json()["interview_id"]
+    client.post("/chat", json={"message": "My first answer.", "interview_id": interview_id})
+    start = time.perf_counter()
+    res = client.post("/chat", json={"message": "My follow-up answer.", "interview_id": interview_id})
+    elapsed = time.perf_counter() - start
+    assert res.get_json().get("score") is not None, res.get_json()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Final-turn latency by FINAL_TURN_MODE")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake upstream latency per call (s)")
+    parser.add_argument("--runs", type=int, default=10, help="interviews per mode")
+    args = parser.parse_args()
+
+    # Swap the real OpenAI client for the fake one
+    ai_interview.client = FakeOpenAI(latency=args.latency)
+
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.post("/register", data={"username": f"bench-{os.getpid()}", "password": "bench"})
+
+    print(f"upstream latency per call: {args.latency:.3f}s, runs per mode: {args.runs}")
+    print(f"{'mode':<12}{'median (s)':>12}{'mean (s)':>12}{'max (s)':>12}")
+    for mode in ("sequential", "parallel", "combined"):
+        config.FINAL_TURN_MODE = mode
+        times = [run_interview(client) for _ in range(args.runs)]
+        print(f"{mode:<12}{statistics.median(times):>12.3f}"
+              f"{statistics.mean(times):>12.3f}{max(times):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
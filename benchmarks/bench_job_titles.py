@@ -0,0 +1,148 @@
+# benchmarks/bench_job_titles.py
+
+# Accuracy and latency of the job-title guess: the local classifier first
+# (services/job_titles.py, the AI only when it isn't sure) against asking the
+# AI every time.
+#
+# It uses a small set of labelled resumes written by hand (or your own with
+# --data, one {"resume": "...", "title": "..."} per line). A guess counts as
+# correct when its canonical title, without the seniority word, is the label.
+#
+# By default the AI is the fake client (fixed latency, always answers
+# "Software Engineer"), so only the latency and the share of AI calls saved
+# mean something. With --live the real OpenAI API is used (needs
+# OPENAI_API_KEY) and the AI's accuracy is real too.
+#
+# Run from the project root:
+#   python benchmarks/bench_job_titles.py --latency 0.6
+#   python benchmarks/bench_job_titles.py --live --data labelled_resumes.jsonl
+
+# Import built-in modules
+import argparse     # To read command-line options
+import json         # To read --data
+import os           # For environment variables and paths
+import statistics   # For median
+import sys          # To make the project importable
+import tempfile     # For a throwaway result cache
+import time         # For timing
+
+# Make the project root importable and keep the result cache out of instance/
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("RESULT_CACHE_DB_PATH", tempfile.mktemp(suffix=".db"))
+
+import config
+import services.ai_interview as ai_interview
+from services.job_titles import LEVELS, classify, normalize_title
+from benchmarks.fake_openai import FakeOpenAI
+
+# (label, resume) pairs: clear headlines, abbreviations, no headline at all,
+# and resumes that mix two fields
+SAMPLES = [
+    ("Backend Engineer", "Maria Gomez\nSr. Backend Dev\nPython, Flask, PostgreSQL, Redis, Kafka. Built REST APIs and microservices for payments."),
+    ("Frontend Engineer", "Tom Becker\nFront-End Developer\nReact, TypeScript, Redux, CSS; built an accessible design system used by 12 teams."),
+    ("Software Engineer", "Lena Novak\nSoftware Developer II\nJava, Spring, unit testing, code review, agile delivery of internal tools."),
+    ("Data Scientist", "Ravi Patel\nData Scientist\nRegression models, A/B testing, pandas, scikit-learn, Jupyter; churn prediction for a telecom."),
+    ("Data Engineer", "Ana Silva\nData Engineer\nAirflow, Spark and dbt pipelines into Snowflake; cut nightly ETL time by 40%."),
+    ("Data Analyst", "Chris Wong\nBI Analyst\nSQL, Tableau and Power BI dashboards for sales; monthly reporting for leadership."),
+    ("DevOps Engineer", "Sam Lee\nSRE\nKubernetes, Terraform, Prometheus, Grafana; on-call lead; CI/CD with Jenkins on AWS."),
+    ("Machine Learning Engineer", "Ines Moreau\nML Engineer\nPyTorch model training and deployment, transformers for NLP, MLOps on GCP."),
+    ("Mobile Engineer", "Kenji Sato\niOS Developer\nSwift, SwiftUI, Xcode; shipped a banking app with 1M downloads."),
+    ("QA Engineer", "Olga Ivanova\nSDET\nSelenium and Playwright test automation, regression testing, test plans in Jira."),
+    ("Security Engineer", "Omar Haddad\nSecurity Analyst\nSIEM (Splunk), incident response, vulnerability management, OWASP reviews."),
+    ("Product Manager", "Julia Weber\nProduct Owner\nRoadmap and backlog prioritization, user stories, user research with customers."),
+    ("Project Manager", "Peter Brown\nPMP-certified Project Manager\nBudgets, Gantt charts, risk management for construction IT rollouts."),
+    ("UX Designer", "Mia Chen\nUI/UX Designer\nFigma wireframes and prototyping, usability testing, design systems."),
+    ("Accountant", "David Kim\nStaff Accountant\nGAAP, month-end close, reconciliation, accounts payable, QuickBooks."),
+    ("Financial Analyst", "Sara Rossi\nFP&A Analyst\nFinancial modeling, forecasting, variance analysis, DCF valuation in Excel."),
+    ("Marketing Manager", "Lucas Martin\nDigital Marketing Manager\nSEO, PPC, HubSpot email marketing campaigns, Google Analytics."),
+    ("Sales Representative", "Emma Davis\nAccount Executive\nB2B SaaS, 120% of quota, Salesforce pipeline, prospecting and closing deals."),
+    ("Customer Support Specialist", "Noah Wilson\nCustomer Service Representative\nZendesk tickets, troubleshooting, CSAT 96%."),
+    ("Human Resources Specialist", "Olivia Taylor\nHR Generalist\nOnboarding, payroll, employee relations, Workday HRIS."),
+    ("Teacher", "Grace Hall\nHigh School Teacher\nLesson planning, curriculum design, classroom management for 150 students."),
+    ("Registered Nurse", "Henry Adams\nRN, BSN\nICU patient care, medication administration, Epic EMR, ACLS and BLS certified."),
+    ("Mechanical Engineer", "Ivy Clark\nMechanical Engineer\nSolidWorks, FEA in ANSYS, GD&T, prototyping for consumer products."),
+    ("Electrical Engineer", "Jack Lewis\nEmbedded Engineer\nEmbedded C on microcontrollers, PCB design in Altium, FPGA with Verilog."),
+    ("Civil Engineer", "Kate Young\nStructural Engineer\nReinforced concrete design, structural analysis, AutoCAD and Revit."),
+    ("Operations Manager", "Leo King\nLogistics Manager\nSupply chain, inventory, vendor management, Lean Six Sigma process improvement."),
+    ("Engineering Manager", "Nina Scott\nHead of Engineering\nManaged a team of 14 engineers, hiring, mentoring, roadmap with stakeholders."),
+    ("Graphic Designer", "Owen Green\nGraphic Designer\nBranding, typography, logo design in Illustrator and Photoshop."),
+    ("Business Analyst", "Paula Baker\nBusiness Analyst\nRequirements gathering, BPMN process mapping, gap analysis, UAT."),
+    ("Full Stack Engineer", "Quinn Harris\nFull-Stack Web Developer\nReact front end, Node.js and Express back end, MongoDB."),
+    # No title in the headline: only the skills say what the job is
+    ("Data Engineer", "Rosa Lopez\nBuilt Spark and Airflow pipelines feeding BigQuery and Redshift; owned the data warehouse and dbt models."),
+    ("Frontend Engineer", "Sven Berg\nI build fast web UIs with React, Vue and TypeScript; Webpack and Tailwind; care about accessibility."),
+    # Career changers: the headline wins over older jobs further down
+    ("Data Analyst", "Tara Singh\nData Analyst\nSQL, Tableau, Excel dashboards.\nPreviously: Teacher (lesson planning, grading)."),
+    ("Software Engineer", "Umar Ali\nSoftware Engineer\nJava, algorithms, design patterns.\nEarlier: Customer Service Representative at a call center."),
+]
+
+
+# "Senior Backend Engineer" -> "Backend Engineer"
+def base_title(title: str) -> str:
+    words = (title or "").split(" ")
+    if len(words) > 1 and words[0].lower() in LEVELS:
+        words = words[1:]
+    return " ".join(words)
+
+# Guess every resume's title with guess_job_title() and return
+# (correct guesses, AI calls made, seconds per guess)
+def run_path(samples: list, local: bool, completions) -> tuple:
+    config.JOB_TITLE_LOCAL_ENABLED = local
+    ai_interview.job_title_cache.invalidate()
+    calls_before = getattr(completions, "calls", 0)
+    correct, times = 0, []
+    for label, resume in samples:
+        start = time.perf_counter()
+        title = ai_interview.guess_job_title(resume)
+        times.append(time.perf_counter() - start)
+        correct += base_title(title) == normalize_title(label)
+    return correct, getattr(completions, "calls", 0) - calls_before, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job-title guess: local classifier vs AI only")
+    parser.add_argument("--data", help="JSONL file of {\"resume\", \"title\"} (default: built-in samples)")
+    parser.add_argument("--latency", type=float, default=0.6, help="fake AI latency per call (s)")
+    parser.add_argument("--live", action="store_true", help="use the real OpenAI API")
+    parser.add_argument("--repeat", type=int, default=2000, help="classify calls per resume for the timing")
+    args = parser.parse_args()
+
+    samples = SAMPLES
+    if args.data:
+        with open(args.data, encoding="utf-8") as f:
+            samples = [(r["title"], r["resume"]) for r in map(json.loads, f) if r.get("resume")]
+
+    if not args.live:
+        ai_interview.client = FakeOpenAI(latency=args.latency)
+    completions = ai_interview.client.chat.completions
+
+    # The local classifier alone
+    confident = correct = 0
+    classify_times = []
+    for label, resume in samples:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            result = classify(resume)
+        classify_times.append((time.perf_counter() - start) / args.repeat)
+        if result.confident:
+            confident += 1
+            correct += base_title(result.title) == normalize_title(label)
+    print(f"{len(samples)} resumes, AI: {'OpenAI' if args.live else f'fake, {args.latency:.2f}s per call'}")
+    print(f"local classifier: {confident}/{len(samples)} confident, "
+          f"{correct}/{confident or 1} of those correct, "
+          f"median {statistics.median(classify_times) * 1e6:.0f} us, max {max(classify_times) * 1e6:.0f} us")
+
+    # Both paths through guess_job_title()
+    print(f"{'path':<22}{'correct':>9}{'AI calls':>10}{'median (ms)':>13}{'total (s)':>11}")
+    for name, local in [("AI only", False), ("local + AI fallback", True)]:
+        correct, calls, times = run_path(samples, local, completions)
+        accuracy = f"{correct}/{len(samples)}" if args.live else "n/a"
+        print(f"{name:<22}{accuracy:>9}{calls:>10}{statistics.median(times) * 1000:>13.2f}{sum(times):>11.2f}")
+    if not args.live:
+        print("(the fake AI always answers 'Software Engineer': use --live for the AI's accuracy)")
+
+
+if __name__ == "__main__":
+    main()
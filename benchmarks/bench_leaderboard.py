@@ -0,0 +1,99 @@
+# benchmarks/bench_leaderboard.py
+
+# "Top 100" and "my rank" reads on the in-memory leaderboards
+# (services/leaderboard.py) against asking the database each time.
+#
+# Builds one board of --users synthetic users (highest scores 1..10, or
+# interview counts with a long tail), then times:
+#   - loading the board from (user_id, value) pairs
+#   - top-100 and my-rank reads for random users
+#   - updates (a user's value going up), like /chat saving a result
+# and the same two reads as SQL on an indexed SQLite table of the same users
+# (ORDER BY ... LIMIT 100, and COUNT(*) of the users ahead).
+#
+# Run from the project root:
+#   python benchmarks/bench_leaderboard.py --users 1000000
+#   python benchmarks/bench_leaderboard.py --users 1000000 --metric interviews
+
+# Import built-in modules
+import argparse     # To read command-line options
+import os           # For environment variables and paths
+import random       # To make up users and pick them
+import sqlite3      # For the database comparison
+import statistics   # For median
+import sys          # To make the project importable
+import time         # For timing
+
+# Make the project root importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import config
+from services.leaderboard import Leaderboard
+
+
+# Seconds per call of fn(arg) for each arg (median and p99)
+def time_calls(fn, args) -> tuple:
+    times = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leaderboard reads: in-memory boards vs SQL")
+    parser.add_argument("--users", type=int, default=1000000, help="users on the board")
+    parser.add_argument("--metric", choices=["highest_score", "interviews"], default="highest_score")
+    parser.add_argument("--reads", type=int, default=2000, help="reads timed per kind")
+    parser.add_argument("--sql-reads", type=int, default=200, help="reads timed per kind on SQLite")
+    args = parser.parse_args()
+
+    random.seed(1)
+    if args.metric == "highest_score":
+        values = [random.randint(1, 10) for _ in range(args.users)]
+    else:
+        # Most users do a handful of interviews, a few do hundreds
+        values = [int(random.paretovariate(1.2)) for _ in range(args.users)]
+    pairs = list(enumerate(values, start=1))
+    user_ids = [random.randint(1, args.users) for _ in range(args.reads)]
+    top_k = config.LEADERBOARD_TOP_K
+
+    print(f"{args.users:,} users, {args.metric}, top {top_k}")
+    print(f"{'':<24}{'median (us)':>13}{'p99 (us)':>11}")
+
+    # In memory
+    board = Leaderboard(top_k, dense=True)
+    start = time.perf_counter()
+    board.load(pairs)
+    print(f"{'load':<24}{(time.perf_counter() - start) * 1e6:>13,.0f}{'':>11}")
+    for name, fn in [("top 100", lambda _: board.top(top_k)), ("my rank", board.rank)]:
+        median, p99 = time_calls(fn, user_ids)
+        print(f"{name:<24}{median * 1e6:>13.1f}{p99 * 1e6:>11.1f}")
+    median, p99 = time_calls(lambda u: board.update(u, board.value(u) + 1), user_ids)
+    print(f"{'update':<24}{median * 1e6:>13.1f}{p99 * 1e6:>11.1f}")
+
+    # SQLite, with an index on the value
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE board (user_id INTEGER PRIMARY KEY, value INTEGER NOT NULL)")
+    conn.executemany("INSERT INTO board VALUES (?, ?)", ((u, board.value(u)) for u, _ in pairs))
+    conn.execute("CREATE INDEX ix_board_value ON board (value)")
+    sql_ids = user_ids[:args.sql_reads]
+    sql_top = lambda _: conn.execute(
+        "SELECT user_id, value FROM board ORDER BY value DESC, user_id LIMIT ?", (top_k,)).fetchall()
+    sql_rank = lambda u: conn.execute(
+        "SELECT 1 + COUNT(*) FROM board WHERE value > (SELECT value FROM board WHERE user_id = ?)", (u,)).fetchone()
+    for name, fn in [("SQL top 100", sql_top), ("SQL my rank", sql_rank)]:
+        median, p99 = time_calls(fn, sql_ids)
+        print(f"{name:<24}{median * 1e6:>13.1f}{p99 * 1e6:>11.1f}")
+
+    # Both must agree
+    for u in sql_ids[:20]:
+        assert board.rank(u)[0] == sql_rank(u)[0]
+
+
+if __name__ == "__main__":
+    main()
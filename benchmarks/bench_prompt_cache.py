@@ -0,0 +1,116 @@
+# benchmarks/bench_prompt_cache.py
+
+# How much of each interview prompt OpenAI can serve from its prompt cache.
+#
+# Builds the exact message lists one interview sends (job title, first
+# question, follow-up question, then feedback + score or the combined call)
+# and, for every call, counts the tokens at the start that an earlier call of
+# the same interview already sent. OpenAI caches such a shared beginning once
+# it is at least 1024 tokens long, in steps of 128 tokens; cached tokens are
+# billed at a discount and skip most of the prompt processing time.
+# (In the "parallel" final turn, feedback and score are sent at the same
+# moment, so the second one may not find the first in the cache yet.)
+#
+# No network needed. Run from the project root:
+#   python benchmarks/bench_prompt_cache.py
+#   python benchmarks/bench_prompt_cache.py --resume my_resume.txt --mode combined
+
+# Import built-in modules
+import argparse   # To read command-line options
+import json       # To compare messages exactly
+import os         # For environment variables and paths
+import sys        # To make the project importable
+
+# Make the project root importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from services import ai_interview as ai
+from services.resume_compactor import compact_resume, count_tokens
+
+# OpenAI's prompt caching rules
+CACHE_MIN_TOKENS = 1024
+CACHE_STEP_TOKENS = 128
+
+# A realistic resume (repeated projects make it about as long as a real one)
+SAMPLE_RESUME = "\n".join(
+    ["Jordan Lee", "Senior Backend Engineer", "", "EXPERIENCE"]
+    + [
+        f"- Project {i}: designed and ran a Python/Flask service handling {i * 120} requests per second; "
+        f"moved its reporting jobs from cron to a queue, cut p95 latency by {10 + i}% and on-call pages by half."
+        for i in range(1, 26)
+    ]
+    + ["", "SKILLS", "Python, Flask, SQLAlchemy, PostgreSQL, Redis, Docker, Kubernetes, AWS, CI/CD",
+       "", "EDUCATION", "BSc Computer Science"]
+)
+
+
+# Tokens of one message list (content only; the per-message overhead is the same either way)
+def prompt_tokens(messages: list[dict]) -> int:
+    return sum(count_tokens(m["content"]) for m in messages)
+
+# Tokens at the start of `messages` that an earlier call sent too (whole messages)
+def shared_prefix_tokens(messages: list[dict], earlier: list[list[dict]]) -> int:
+    best = 0
+    for other in earlier:
+        tokens = 0
+        for mine, theirs in zip(messages, other):
+            if json.dumps(mine, sort_keys=True) != json.dumps(theirs, sort_keys=True):
+                break
+            tokens += count_tokens(mine["content"])
+        best = max(best, tokens)
+    return best
+
+# What OpenAI would report as cached_tokens for that shared beginning
+def cached_tokens(shared: int) -> int:
+    if shared < CACHE_MIN_TOKENS:
+        return 0
+    return shared // CACHE_STEP_TOKENS * CACHE_STEP_TOKENS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt-cache reuse of one interview's AI calls")
+    parser.add_argument("--resume", help="resume text file (default: a built-in sample)")
+    parser.add_argument("--mode", choices=["parallel", "combined"], default="parallel",
+                        help="final turn: feedback + score calls, or one combined call")
+    args = parser.parse_args()
+
+    resume_text = SAMPLE_RESUME
+    if args.resume:
+        with open(args.resume, encoding="utf-8") as f:
+            resume_text = f.read()
+    resume = compact_resume(resume_text)
+    job_title = "Senior Backend Engineer"
+    questions = ["Tell me about the queue migration?", "How did you measure the latency drop?"]
+    answers = ["We moved the jobs one at a time behind a feature flag.", "We compared p95 before and after for two weeks."]
+
+    # Every call of one interview, in the order they are made
+    calls = [
+        ("guess_job_title", ai._job_title_messages(resume)),
+        ("first question", ai._question_messages(resume, job_title, [])),
+        ("follow-up question", ai._question_messages(resume, job_title, questions[:1])),
+    ]
+    if args.mode == "combined":
+        calls.append(("feedback + score", ai._combined_messages(questions, answers, resume, job_title)))
+    else:
+        calls.append(("feedback", ai._feedback_messages(questions, answers, resume, job_title)))
+        calls.append(("score", ai._score_messages(questions, answers, resume, job_title)))
+
+    print(f"resume: {count_tokens(resume)} tokens after compaction, final turn: {args.mode}")
+    print(f"{'call':<22}{'prompt':>9}{'shared':>9}{'cached':>9}")
+    earlier = []
+    total_prompt = total_cached = 0
+    for name, messages in calls:
+        tokens = prompt_tokens(messages)
+        shared = shared_prefix_tokens(messages, earlier)
+        cached = cached_tokens(shared)
+        print(f"{name:<22}{tokens:>9}{shared:>9}{cached:>9}")
+        earlier.append(messages)
+        total_prompt += tokens
+        total_cached += cached
+    print(f"{'total':<22}{total_prompt:>9}{'':>9}{total_cached:>9}  ({total_cached / total_prompt:.0%} of prompt tokens cached)")
+
+
+if __name__ == "__main__":
+    main()
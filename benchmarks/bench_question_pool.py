@@ -0,0 +1,90 @@
+# benchmarks/bench_question_pool.py
+
+# First-question latency and AI calls with and without the question pool
+# (services/question_pool.py).
+#
+# Simulates candidates arriving one after another, each for one of a few
+# canonical job titles (a few titles are much more common than the rest,
+# like real traffic), and times start_interview() for each. With the pool,
+# most first questions come ready-made, and the AI writes them in batches in
+# the background instead of once per candidate.
+#
+# Upstream calls are replaced with the fake client (fixed latency).
+#
+# Run from the project root:
+#   python benchmarks/bench_question_pool.py --candidates 300 --latency 0.5
+
+# Import built-in modules
+import argparse     # To read command-line options
+import os           # For environment variables and paths
+import random       # To pick job titles
+import statistics   # For median
+import sys          # To make the project importable
+import tempfile     # For a throwaway result cache
+import time         # For timing
+
+# Make the project root importable and keep the result cache out of instance/
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("RESULT_CACHE_DB_PATH", tempfile.mktemp(suffix=".db"))
+
+import config
+import services.ai_interview as ai_interview
+from services.job_titles import TITLES
+from benchmarks.fake_openai import FakeOpenAI
+
+
+# Start `count` interviews and return (seconds per first question, AI calls made)
+def run(count: int, titles: list, weights: list, arrival: float, completions) -> tuple:
+    calls_before = completions.calls
+    times = []
+    for n in range(count):
+        title = random.choices(titles, weights)[0]
+        resume = f"Candidate {n}\n{title}\nFive years of experience."
+        start = time.perf_counter()
+        ai_interview.start_interview(f"bench-{n}", f"interview-{n}", resume, title)
+        times.append(time.perf_counter() - start)
+        # The next candidate arrives a little later
+        time.sleep(arrival)
+    # Let background refills finish before counting their calls
+    ai_interview.llm_executor.submit(lambda: None).result()
+    time.sleep(completions.latency * 2)
+    return times, completions.calls - calls_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="First-question latency with and without the question pool")
+    parser.add_argument("--candidates", type=int, default=300, help="interviews started per run")
+    parser.add_argument("--titles", type=int, default=10, help="distinct job titles")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake AI latency per call (s)")
+    parser.add_argument("--arrival", type=float, default=0.05, help="seconds between candidates")
+    args = parser.parse_args()
+
+    random.seed(1)
+    titles = TITLES[:args.titles]
+    # Zipf-like: the first title is the most common
+    weights = [1 / (rank + 1) for rank in range(len(titles))]
+
+    ai_interview.client = FakeOpenAI(latency=args.latency)
+    completions = ai_interview.client.chat.completions
+    # Only the first question is measured
+    config.PREFETCH_ENABLED = False
+
+    print(f"{args.candidates} candidates, {len(titles)} job titles, AI latency {args.latency:.2f}s, "
+          f"batch {config.QUESTION_POOL_BATCH_SIZE}, low water {config.QUESTION_POOL_LOW_WATER}")
+    print(f"{'pool':<6}{'median (ms)':>13}{'p95 (ms)':>10}{'AI calls':>10}{'hit rate':>10}")
+    for enabled in (False, True):
+        config.QUESTION_POOL_ENABLED = enabled
+        ai_interview.first_question_cache.invalidate()
+        times, calls = run(args.candidates, titles, weights, args.arrival, completions)
+        times.sort()
+        p95 = times[int(len(times) * 0.95) - 1]
+        hit_rate = f"{ai_interview.question_pool.stats()['hit_rate']:.0%}" if enabled else "-"
+        print(f"{'on' if enabled else 'off':<6}{statistics.median(times) * 1000:>13.1f}{p95 * 1000:>10.1f}"
+              f"{calls:>10}{hit_rate:>10}")
+    print(ai_interview.question_pool.stats())
+
+
+if __name__ == "__main__":
+    main()
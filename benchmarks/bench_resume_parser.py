@@ -0,0 +1,124 @@
+# benchmarks/bench_resume_parser.py
+
+# Measures resume parsing throughput (pages per second) on a generated corpus
+# of PDF, DOCX and TXT resumes of different sizes, read from memory the same
+# way /upload does it. PDFs are read both in a single process and split
+# across the process pool, so the gain from parallel page extraction shows.
+#
+# Run from the project root:
+#   python benchmarks/bench_resume_parser.py --repeat 3
+
+# Import built-in modules
+import argparse   # To read command-line options
+import io         # In-memory files
+import os         # For paths
+import sys        # To make the project importable
+import time       # For timing
+
+# Make the project root importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import docx
+from services import resume_parser
+
+
+# A line of fake resume text
+LINE = "Led a team of five engineers to migrate billing services to Python 3.11 and Flask."
+
+
+# ---------------------- Corpus Generation ----------------------
+
+# Build a simple text-only PDF with the given number of pages (no extra libraries)
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages object, filled in below once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for p in range(pages):
+        text = "".join(
+            f"({LINE} [{p + 1}.{n + 1}]) Tj T* " for n in range(lines_per_page)
+        )
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td {text}ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /CropBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+              % (len(objects) + 1, xref))
+    return out.getvalue()
+
+# Build a DOCX with roughly the given number of "pages" worth of paragraphs
+def make_docx(pages: int, lines_per_page: int = 45) -> bytes:
+    document = docx.Document()
+    for n in range(pages * lines_per_page):
+        document.add_paragraph(f"{LINE} [{n + 1}]")
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+# Build a plain-text resume with roughly the given number of "pages"
+def make_txt(pages: int, lines_per_page: int = 45) -> bytes:
+    return "\n".join(
+        f"{LINE} [{n + 1}]" for n in range(pages * lines_per_page)
+    ).encode("utf-8")
+
+
+# ---------------------- Benchmark ----------------------
+
+# Parse one document `repeat` times and return pages per second
+def pages_per_second(parse, data: bytes, pages: int, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(data)
+    return pages * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume parsing throughput")
+    parser.add_argument("--sizes", default="1,2,5,10,30", help="page counts to test")
+    parser.add_argument("--repeat", type=int, default=3, help="parses per document")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    # Start the process pool up front so its start-up isn't counted
+    resume_parser._get_pdf_pool().submit(int).result()
+
+    print(f"{'format':<16}{'pages':>6}{'size (KB)':>11}{'pages/s':>12}")
+    for pages in sizes:
+        pdf = make_pdf(pages)
+        cases = [
+            ("pdf (1 worker)", pdf,
+             lambda d: resume_parser.load_pdf(io.BytesIO(d), max_pages=pages, parallel=False)),
+            ("pdf (pool)", pdf,
+             lambda d: resume_parser.load_pdf(io.BytesIO(d), max_pages=pages)),
+            ("docx", make_docx(pages),
+             lambda d: resume_parser.load_resume(io.BytesIO(d), "resume.docx")),
+            ("txt", make_txt(pages),
+             lambda d: resume_parser.load_resume(io.BytesIO(d), "resume.txt")),
+        ]
+        for name, data, parse in cases:
+            rate = pages_per_second(parse, data, pages, args.repeat)
+            print(f"{name:<16}{pages:>6}{len(data) / 1024:>11.1f}{rate:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_upstream.py
+
+# Shows what the call rules in services/openai_client.py do for users when
+# OpenAI is slow or down. No real API is called: a fake upstream answers
+# most calls quickly and a few very slowly (or fails every call).
+#
+#   1. Slow tail: short calls with and without hedging (p50 / p95 / p99 and
+#      how many extra requests hedging sent)
+#   2. Outage: how long each user waits for an error, with and without the
+#      circuit breaker
+#
+# Run from the project root:
+#   python benchmarks/bench_upstream.py --calls 400 --threads 16
+
+# Import built-in modules
+import argparse     # To read command-line options
+import os           # For environment variables and paths
+import random       # For the fake upstream's slow calls
+import statistics   # For median
+import sys          # To make the project importable
+import threading    # For concurrent callers
+import time         # For timing
+from concurrent.futures import ThreadPoolExecutor
+
+# Make the project root importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+import openai
+
+from services.openai_client import Upstream, CircuitBreaker, UpstreamUnavailable
+
+
+class FakeUpstream:
+    """
+    A create() function that is usually fast, sometimes slow, or always failing.
+    """
+
+    def __init__(self, fast: float, slow: float, slow_share: float, failing: bool = False):
+        self.fast = fast
+        self.slow = slow
+        self.slow_share = slow_share
+        self.failing = failing
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.requests += 1
+        if self.failing:
+            # Like a request that hangs until its timeout
+            time.sleep(self.slow)
+            raise openai.APITimeoutError(request=httpx.Request("POST", "https://fake"))
+        time.sleep(self.slow if random.random() < self.slow_share else self.fast)
+        return "ok"
+
+
+# Rules with the given hedging / breaker settings (short retry waits)
+def make_upstream(hedge_after: float, breaker_threshold: int) -> Upstream:
+    return Upstream(
+        breaker=CircuitBreaker(breaker_threshold, reset_seconds=30),
+        max_retries=2,
+        base_delay=0.05,
+        max_delay=0.5,
+        hedge_after=hedge_after,
+        hedge_max_in_flight=64
+    )
+
+# Make `calls` short calls from `threads` threads; return each call's time (s)
+# and error, if any
+def run(upstream: Upstream, fake: FakeUpstream, calls: int, threads: int) -> list:
+    def one(_):
+        start = time.perf_counter()
+        try:
+            upstream.call("short", fake.create)
+            error = None
+        except UpstreamUnavailable:
+            error = "fast-fail"
+        except openai.APIError:
+            error = "timeout"
+        return time.perf_counter() - start, error
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(one, range(calls)))
+
+
+def percentile(times: list, p: float) -> float:
+    times = sorted(times)
+    return times[min(len(times) - 1, int(len(times) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedging and circuit breaker")
+    parser.add_argument("--calls", type=int, default=400, help="calls per run")
+    parser.add_argument("--threads", type=int, default=16, help="callers at once")
+    parser.add_argument("--fast", type=float, default=0.1, help="usual latency (s)")
+    parser.add_argument("--slow", type=float, default=1.5, help="latency of slow calls (s)")
+    parser.add_argument("--slow-share", type=float, default=0.05, help="share of slow calls")
+    parser.add_argument("--hedge-after", type=float, default=0.25, help="hedge delay (s)")
+    args = parser.parse_args()
+
+    print(f"Slow tail: {args.slow_share:.0%} of calls take {args.slow}s, the rest {args.fast}s")
+    print(f"{'':<22}{'p50 (s)':>9}{'p95 (s)':>9}{'p99 (s)':>9}{'requests sent':>15}")
+    for name, hedge_after in [("no hedging", 0), (f"hedge after {args.hedge_after}s", args.hedge_after)]:
+        random.seed(1)
+        fake = FakeUpstream(args.fast, args.slow, args.slow_share)
+        times = [t for t, _ in run(make_upstream(hedge_after, 1000), fake, args.calls, args.threads)]
+        print(f"{name:<22}{statistics.median(times):>9.2f}{percentile(times, 0.95):>9.2f}"
+              f"{percentile(times, 0.99):>9.2f}{fake.requests:>15}")
+
+    print(f"\nOutage: every call times out after {args.slow}s")
+    print(f"{'':<22}{'median wait (s)':>16}{'timeouts':>10}{'fast-fails':>12}{'requests sent':>15}")
+    for name, threshold in [("no breaker", 10 ** 9), ("breaker (5 failures)", 5)]:
+        fake = FakeUpstream(args.fast, args.slow, 0, failing=True)
+        results = run(make_upstream(0, threshold), fake, args.calls // 4, args.threads)
+        times = [t for t, _ in results]
+        errors = [e for _, e in results]
+        print(f"{name:<22}{statistics.median(times):>16.2f}{errors.count('timeout'):>10}"
+              f"{errors.count('fast-fail'):>12}{fake.requests:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_user_loader.py
+
+# Shows how many database queries each route runs during a steady interview
+# session, with the user cache on and off, plus the cache's hit ratio.
+# A session is: upload a resume, answer twice, and play the speech for
+# each reply from the audio cache. Upstream calls use a fake client.
+#
+# Run from the project root:
+#   python benchmarks/bench_user_loader.py --interviews 20
+#   USER_CACHE_TTL_SECONDS=0 python benchmarks/bench_user_loader.py --interviews 20
+
+# Import built-in modules
+import argparse   # To read command-line options
+import os         # For environment variables and paths
+import sys        # To make the project importable
+import tempfile   # For a throwaway database
+import time       # For timing
+
+# Make the project root importable and use a throwaway database
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+import config
+import services.ai_interview as ai_interview
+from app import app
+from benchmarks.fake_openai import FakeOpenAI
+from services.query_stats import query_stats
+from services.user_cache import user_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database queries per request")
+    parser.add_argument("--interviews", type=int, default=20, help="interviews to run")
+    args = parser.parse_args()
+
+    # Swap the real OpenAI client for an instant fake one
+    ai_interview.client = FakeOpenAI(latency=0)
+
+    client = app.test_client()
+    client.post("/register", data={"username": f"bench-{os.getpid()}", "password": "bench"})
+
+    start = time.perf_counter()
+    for _ in range(args.interviews):
+        res = client.post("/upload", data={"resume_text": "Python developer, 5 years of Flask."})
+        interview_id = res.get_json()["interview_id"]
+        for answer in ("First answer.", "Follow-up answer."):
+            client.post("/chat", json={"message": answer, "interview_id": interview_id})
+            # Replaying audio that is already cached (no upstream call needed)
+            client.get(f"/tts/{'0' * 64}.mp3")
+    elapsed = time.perf_counter() - start
+
+    print(f"user cache TTL: {config.USER_CACHE_TTL_SECONDS:g}s, "
+          f"{args.interviews} interviews in {elapsed:.2f}s")
+    print(f"{'route':<16}{'requests':>10}{'queries':>10}{'per request':>13}")
+    for route, totals in sorted(query_stats.stats().items()):
+        print(f"{route:<16}{totals['requests']:>10}{totals['queries']:>10}"
+              f"{totals['queries_per_request']:>13.2f}")
+    cache = user_cache.stats()
+    print(f"user cache: {cache['hits']} hits, {cache['misses']} misses, "
+          f"{cache['invalidations']} invalidations, hit rate {cache['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/bench_write_contention.py
+
+# Drives many interview completions at the same time to measure how the app
+# database copes with concurrent writes (each finished interview saves a
+# history row and updates the user's streak and stats in one commit).
+#
+# Every thread logs in as its own user and runs whole interviews through
+# /upload and /chat; with --processes several app processes share the same
+# database file, like several server workers. Upstream AI calls are replaced
+# with a fake client, so the numbers are about the database. At the end the
+# stored per-user stats are checked against the history rows (no lost
+# updates). Run it twice to compare the storage profile with SQLite's defaults:
+#
+#   python benchmarks/bench_write_contention.py --processes 4 --threads 8
+#   python benchmarks/bench_write_contention.py --processes 4 --threads 8 --baseline
+
+# Import built-in modules
+import argparse     # To read command-line options
+import concurrent.futures  # To run several app processes
+import multiprocessing     # Fresh (spawned) processes, each importing the app
+import os           # For environment variables and paths
+import statistics   # For median
+import sys          # To make the project importable
+import tempfile     # For a throwaway database
+import threading    # To run interviews side by side
+import time         # For timing requests
+
+# Make the project root importable and use a throwaway database
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+parser = argparse.ArgumentParser(description="Concurrent interview completions")
+parser.add_argument("--processes", type=int, default=1, help="app processes sharing the database")
+parser.add_argument("--threads", type=int, default=32, help="interviews running at once per process")
+parser.add_argument("--interviews", type=int, default=20, help="interviews per thread")
+parser.add_argument("--baseline", action="store_true", help="use SQLite's default settings")
+args = parser.parse_args()
+
+# The storage profile is read when the app is imported
+if args.baseline:
+    os.environ["DB_SQLITE_PROFILE"] = "0"
+
+import services.ai_interview as ai_interview
+from app import app, db
+from benchmarks.fake_openai import FakeOpenAI
+
+
+# Run `count` interviews as one user; record final-turn times and failures
+def worker(name: str, count: int, times: list, errors: list):
+    client = app.test_client()
+    client.post("/register", data={"username": name, "password": "bench"})
+    for _ in range(count):
+        try:
+            res = client.post("/upload", data={"resume_text": "Python developer, 5 years of Flask."})
+            interview_id = res.get_json()["interview_id"]
+            client.post("/chat", json={"message": "First answer.", "interview_id": interview_id})
+            start = time.perf_counter()
+            res = client.post("/chat", json={"message": "Follow-up answer.", "interview_id": interview_id})
+            elapsed = time.perf_counter() - start
+            if res.status_code != 200 or res.get_json().get("score") is None:
+                errors.append(f"HTTP {res.status_code}")
+            else:
+                times.append(elapsed)
+        except Exception as e:
+            errors.append(type(e).__name__ + ": " + str(e).splitlines()[0])
+
+
+# Run one process's share of the interviews and return (times, errors)
+def run_process(index: int):
+    # Swap the real OpenAI client for an instant fake one
+    ai_interview.client = FakeOpenAI(latency=0)
+
+    times, errors = [], []
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(f"bench-{os.getppid()}-{index}-{n}", args.interviews, times, errors)
+        )
+        for n in range(args.threads)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return times, errors
+
+# Users whose stored interview count doesn't match their history rows
+def count_mismatches() -> int:
+    with app.app_context():
+        return db.session.execute(db.text(
+            "SELECT COUNT(*) FROM user u LEFT JOIN user_stats s ON s.user_id = u.id"
+            " WHERE COALESCE(s.total_interviews, 0) !="
+            " (SELECT COUNT(*) FROM interview_history h WHERE h.user_id = u.id)"
+        )).scalar()
+
+
+def main():
+    start = time.perf_counter()
+    if args.processes == 1:
+        results = [run_process(0)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            args.processes, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results = list(pool.map(run_process, range(args.processes)))
+    wall = time.perf_counter() - start
+
+    times = sorted(t for r in results for t in r[0])
+    errors = [e for r in results for e in r[1]]
+    profile = "SQLite defaults" if args.baseline else "storage profile"
+    print(f"{profile}: {args.processes} processes x {args.threads} threads x {args.interviews} interviews")
+    print(f"completed: {len(times)}  failed: {len(errors)}  "
+          f"rate: {len(times) / wall:.1f} interviews/s  "
+          f"stats mismatches: {count_mismatches()}")
+    if times:
+        print(f"final /chat  median: {statistics.median(times) * 1000:.1f} ms  "
+              f"p95: {times[int(len(times) * 0.95) - 1] * 1000:.1f} ms  "
+              f"max: {times[-1] * 1000:.1f} ms")
+    for message in sorted(set(errors))[:5]:
+        print(f"  error: {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/fake_openai.py
+
+# A tiny stand-in for the OpenAI client used by the benchmarks.
+# It answers instantly-but-slowly: every call sleeps for a configurable
+# "upstream latency" and then returns a canned answer shaped like the real
+# API response, so benchmarks measure our code and not OpenAI's servers.
+
+# Import built-in modules
+import asyncio  # To simulate latency without blocking (async client)
+import json   # To build JSON answers for structured calls
+import time   # To simulate network/model latency
+from types import SimpleNamespace  # Quick objects with attributes
+
+
+# Build an object that looks like a chat completion response
+def _completion(text: str, prompt_tokens: int = 0):
+    usage = SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=len(text.split()),
+        total_tokens=prompt_tokens + len(text.split()),
+        prompt_tokens_details=None
+    )
+    message = SimpleNamespace(role="assistant", content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+# Canned score breakdown: (category, score, reason)
+_BREAKDOWN = [
+    ("Clarity", 7, "easy to follow"),
+    ("Professionalism", 8, "polite and focused"),
+    ("Relevance", 7, "answers the question"),
+    ("Technical/Role-Specific Accuracy", 6, "a few details missing"),
+    ("Problem-Solving & Critical Thinking", 7, "clear reasoning"),
+    ("Experience & Resume Alignment", 8, "matches the resume"),
+]
+
+# Canned batch for the question pool (all on different topics)
+_POOL_QUESTIONS = [
+    "How do you decide what to test first in a new codebase?",
+    "Which metric would you watch after shipping a risky change, and why?",
+    "Walk me through debugging a memory leak in production.",
+    "How do you keep a pull request small and easy to review?",
+    "What trade-offs did you weigh when choosing your last database?",
+    "How would you explain a missed deadline to a stakeholder?",
+    "Describe a design decision you later reversed.",
+    "How do you onboard yourself onto an unfamiliar service?",
+]
+
+# Pick a canned answer that fits the task that was sent (the last message)
+def answer_for(prompt: str, wants_json: bool) -> str:
+    if wants_json:
+        return json.dumps({
+            "feedback": ["Clear structure.", "Add a concrete metric."],
+            "score": 7,
+            "breakdown": {name: f"{score} - {reason}" for name, score, reason in _BREAKDOWN}
+        })
+    if "Score: X" in prompt:
+        return "Score: 7\nBreakdown:\n" + "\n".join(
+            f"- {name}: {score} - {reason}" for name, score, reason in _BREAKDOWN
+        )
+    if "one per line" in prompt:
+        return "\n".join(f"{i + 1}. {question}" for i, question in enumerate(_POOL_QUESTIONS))
+    if "Return only the job title" in prompt:
+        return "Software Engineer"
+    if "interview coach" in prompt:
+        return "- Clear structure.\n- Add a concrete metric."
+    return "Tell me about a project where you improved performance?"
+
+
+class _FakeCompletions:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        prompt = "\n".join(m["content"] for m in messages)
+        wants_json = kwargs.get("response_format", {}).get("type") == "json_object"
+        # The last message is the task of this call (see services/ai_interview.py)
+        return _completion(answer_for(messages[-1]["content"], wants_json), len(prompt.split()))
+
+
+class FakeOpenAI:
+    """
+    Drop-in replacement for openai.OpenAI() with a fixed per-call latency.
+    """
+
+    def __init__(self, latency: float = 0.5):
+        self.chat = SimpleNamespace(completions=_FakeCompletions(latency))
+
+
+class _FakeAsyncCompletions(_FakeCompletions):
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        prompt = "\n".join(m["content"] for m in messages)
+        wants_json = kwargs.get("response_format", {}).get("type") == "json_object"
+        # The last message is the task of this call (see services/ai_interview.py)
+        return _completion(answer_for(messages[-1]["content"], wants_json), len(prompt.split()))
+
+
+class FakeAsyncOpenAI:
+    """
+    Drop-in replacement for openai.AsyncOpenAI() with a fixed per-call latency.
+    """
+
+    def __init__(self, latency: float = 0.5):
+        self.chat = SimpleNamespace(completions=_FakeAsyncCompletions(latency))
@@ -0,0 +1,300 @@
+# benchmarks/loadtest.py
+
+# Load test: many simulated users each run whole interviews against a
+# running app over real HTTP:
+#   register -> upload resume -> answer 1 (/chat) -> answer 2 (/chat, final
+#   feedback and score) -> speak the feedback (/speak)
+# It is run at one or more concurrency levels and reports p50 / p95 / p99 per
+# route and per step, plus how many calls of each kind reached the OpenAI
+# stand-in (benchmarks/openai_stub_server.py), so no API quota is used.
+#
+# Easiest: let it start the stand-in and the app itself (throwaway database
+# and caches), then run 10 and 50 users at once:
+#   python benchmarks/loadtest.py --launch wsgi --concurrency 10,50
+#   python benchmarks/loadtest.py --launch asgi --concurrency 10,50,200
+#
+# Or test an app you started yourself (with OPENAI_BASE_URL pointing at the stand-in):
+#   python benchmarks/loadtest.py --base-url http://127.0.0.1:5000 --stub-url http://127.0.0.1:8090
+#
+# --save results.json keeps the numbers; --compare results.json fails (exit
+# code 1) when a p95 got more than --tolerance slower than in that file.
+
+# Import built-in modules
+import argparse     # To read command-line options
+import itertools    # Unique user numbers
+import json         # To save and compare results
+import os           # For environment variables and paths
+import subprocess   # To start the app
+import sys          # To make the project importable
+import tempfile     # Throwaway database and caches for --launch
+import threading    # For the stand-in server and simulated users
+import time         # For timing
+import uuid         # Unique user names
+from concurrent.futures import ThreadPoolExecutor
+
+# Import the HTTP library used to talk to the app
+import requests
+
+# Make the project root importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.openai_stub_server import StubSettings, create_server
+
+
+# ---------------------- Measurements ----------------------
+
+class Timings:
+    """
+    Latencies (seconds) and error counts per name, from many threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}  # name -> [seconds, ...]
+        self.errors = {}   # name -> count
+
+    def add(self, name: str, seconds: float, ok: bool = True):
+        with self._lock:
+            if ok:
+                self.samples.setdefault(name, []).append(seconds)
+            else:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    # p50 / p95 / p99 (milliseconds), request and error counts per name
+    def summary(self) -> dict:
+        with self._lock:
+            names = list(self.samples) + [n for n in self.errors if n not in self.samples]
+            return {name: _summarize(self.samples.get(name, []), self.errors.get(name, 0)) for name in names}
+
+
+def _summarize(samples: list, errors: int) -> dict:
+    samples = sorted(samples)
+
+    def pct(p):
+        return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 1) if samples else None
+
+    return {"count": len(samples), "errors": errors, "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)}
+
+
+# ---------------------- One Interview ----------------------
+
+_user_numbers = itertools.count()
+
+# Resume text that's different for every interview (no cached AI answers)
+def resume_for(n: int) -> str:
+    return (
+        f"Candidate {n}\nSoftware engineer with 5 years of Python, Flask and SQL.\n"
+        "Built data pipelines and REST APIs; led a team of three.\n"
+        "Education: BSc Computer Science."
+    )
+
+# Run one whole interview as a new user; the time of every step is added to
+# `by_route` and `by_step`. Stops at the first failed request.
+def run_interview(base_url: str, by_route: Timings, by_step: Timings, speak: bool, timeout: float):
+    http = requests.Session()
+    n = next(_user_numbers)
+
+    def step(name: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            res = http.post(base_url + path, timeout=timeout, allow_redirects=False, **kwargs)
+            ok = res.status_code < 400
+        except requests.RequestException:
+            res, ok = None, False
+        seconds = time.perf_counter() - start
+        by_route.add(path, seconds, ok)
+        by_step.add(name, seconds, ok)
+        if not ok:
+            raise RuntimeError(f"{name} failed")
+        return res
+
+    start = time.perf_counter()
+    try:
+        step("register", "/register", data={"username": f"load-{uuid.uuid4().hex[:12]}", "password": "load"})
+        res = step("upload resume", "/upload", data={"resume_text": resume_for(n)})
+        interview_id = res.json()["interview_id"]
+        step("answer 1", "/chat", json={
+            "interview_id": interview_id,
+            "message": "I rewrote our nightly import job and cut it from 3 hours to 20 minutes.",
+        })
+        res = step("answer 2 (final)", "/chat", json={
+            "interview_id": interview_id,
+            "message": "I profiled it first, then batched the database writes.",
+        })
+        if speak:
+            # The stand-in gives everyone the same feedback: number it, so
+            # each user's speech is really synthesized (not an audio cache hit)
+            feedback = res.json().get("feedback") or "Well done."
+            step("speak feedback", "/speak", json={"text": f"{feedback} Interview {n}."})
+    except RuntimeError:
+        by_step.add("full interview", time.perf_counter() - start, ok=False)
+        return
+    by_step.add("full interview", time.perf_counter() - start)
+
+
+# Run `interviews` interviews with `concurrency` users at once
+def run_level(base_url: str, concurrency: int, interviews: int, speak: bool, timeout: float) -> dict:
+    by_route, by_step = Timings(), Timings()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(interviews):
+            pool.submit(run_interview, base_url, by_route, by_step, speak, timeout)
+    wall = time.perf_counter() - start
+    finished = by_step.summary().get("full interview", {}).get("count", 0)
+    return {
+        "concurrency": concurrency,
+        "interviews_per_second": round(finished / wall, 2),
+        "routes": by_route.summary(),
+        "steps": by_step.summary(),
+    }
+
+
+# ---------------------- Starting the Servers ----------------------
+
+# Start the OpenAI stand-in in this process; returns its base URL
+def start_stub(settings: StubSettings) -> str:
+    server = create_server("127.0.0.1", 0, settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+# Start the app (threaded Flask server or uvicorn) against the stand-in,
+# with a throwaway database and caches; returns the process and its URL
+def start_app(mode: str, stub_url: str, port: int):
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    env = dict(
+        os.environ,
+        OPENAI_BASE_URL=f"{stub_url}/v1",
+        OPENAI_API_KEY="loadtest",
+        SECRET_KEY="loadtest",
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'users.db')}",
+        SESSION_DB_PATH=os.path.join(workdir, "sessions.db"),
+        RESULT_CACHE_DB_PATH=os.path.join(workdir, "cache.db"),
+        TTS_CACHE_DIR=os.path.join(workdir, "tts"),
+    )
+    if mode == "asgi":
+        command = [sys.executable, "-m", "uvicorn", "asgi:application",
+                   "--port", str(port), "--log-level", "warning", "--backlog", "4096"]
+    else:
+        command = [sys.executable, "-c",
+                   f"from app import app; app.run(port={port}, threaded=True)"]
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    # Wait until it answers
+    for _ in range(100):
+        try:
+            requests.get(base_url + "/login", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f"The app did not start ({' '.join(command)})")
+
+
+# ---------------------- Report ----------------------
+
+def print_table(title: str, rows: dict):
+    print(f"  {title:<22}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in rows.items():
+        cells = "".join(f"{'-' if row[p] is None else row[p]:>10}" for p in ("p50", "p95", "p99"))
+        print(f"  {name:<22}{row['count']:>7}{row['errors']:>8}{cells}")
+
+# p95s that got slower than `tolerance` allows, compared with a saved run
+def regressions(results: list, baseline: list, tolerance: float) -> list:
+    old = {
+        (level["concurrency"], table, name): row["p95"]
+        for level in baseline for table in ("routes", "steps") for name, row in level[table].items()
+    }
+    found = []
+    for level in results:
+        for table in ("routes", "steps"):
+            for name, row in level[table].items():
+                before = old.get((level["concurrency"], table, name))
+                if before and row["p95"] and row["p95"] > before * (1 + tolerance):
+                    found.append(f"{name} at {level['concurrency']} users: p95 {before} -> {row['p95']} ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interview load test against a local OpenAI stand-in")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000", help="app to test (ignored with --launch)")
+    parser.add_argument("--stub-url", default=None, help="stand-in to read call counts from (ignored with --launch)")
+    parser.add_argument("--launch", choices=["wsgi", "asgi"], help="start the stand-in and the app here")
+    parser.add_argument("--port", type=int, default=5055, help="app port used with --launch")
+    parser.add_argument("--concurrency", default="10,50", help="users at once, comma separated")
+    parser.add_argument("--interviews", type=int, default=0, help="interviews per level (default: 4 per user)")
+    parser.add_argument("--no-speak", action="store_true", help="skip the /speak step")
+    parser.add_argument("--timeout", type=float, default=120, help="request timeout (s)")
+    parser.add_argument("--ttft-ms", type=float, default=400, help="stand-in: median wait before the first token")
+    parser.add_argument("--ttft-sigma", type=float, default=0.5, help="stand-in: spread of that wait")
+    parser.add_argument("--tokens-per-sec", type=float, default=80, help="stand-in: completion tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="stand-in: share of calls failing with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="stand-in: share of calls failing with a 429")
+    parser.add_argument("--cache-min-tokens", type=int, default=1024, help="stand-in: shortest prompt prefix that is cached")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare p95s with this saved JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown for --compare")
+    args = parser.parse_args()
+
+    process = None
+    stub_url = args.stub_url
+    base_url = args.base_url
+    if args.launch:
+        stub_url = start_stub(StubSettings(
+            ttft_ms=args.ttft_ms,
+            ttft_sigma=args.ttft_sigma,
+            tokens_per_second=args.tokens_per_sec,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            cache_min_tokens=args.cache_min_tokens
+        ))
+        process, base_url = start_app(args.launch, stub_url, args.port)
+
+    results = []
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            if stub_url:
+                requests.post(stub_url + "/stats/reset", timeout=5)
+            interviews = args.interviews or 4 * concurrency
+            level = run_level(base_url, concurrency, interviews, not args.no_speak, args.timeout)
+            if stub_url:
+                level["upstream"] = requests.get(stub_url + "/stats", timeout=5).json()
+            results.append(level)
+
+            print(f"\n{concurrency} users at once, {interviews} interviews: "
+                  f"{level['interviews_per_second']} interviews/s")
+            print_table("route", level["routes"])
+            print()
+            print_table("step", level["steps"])
+            if level.get("upstream"):
+                print("  upstream calls: " + ", ".join(
+                    f"{stage} {c['calls']}" + (f" ({c['errors'] + c['rate_limited']} failed)" if c['errors'] + c['rate_limited'] else "")
+                    for stage, c in level["upstream"].items()
+                ))
+                prompt_tokens = sum(c.get("prompt_tokens", 0) for c in level["upstream"].values())
+                cached_tokens = sum(c.get("cached_tokens", 0) for c in level["upstream"].values())
+                if prompt_tokens:
+                    print(f"  prompt tokens: {prompt_tokens}, cached: {cached_tokens} "
+                          f"({cached_tokens / prompt_tokens:.0%})")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        if found:
+            print("\nSlower than " + args.compare + ":")
+            for line in found:
+                print("  " + line)
+            sys.exit(1)
+        print(f"\nNo p95 more than {args.tolerance:.0%} slower than {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# benchmarks/openai_stub_server.py
+
+# A local stand-in for the OpenAI API, for load tests that shouldn't spend
+# real API quota. It answers the two endpoints the app uses:
+#   POST /v1/chat/completions  (plain, JSON mode and streamed)
+#   POST /v1/audio/speech      (returns fake MP3 bytes)
+# with realistic timing: a random wait before the first token (log-normal,
+# so a few calls are much slower than the median), then tokens or audio at a
+# fixed rate. Errors can be injected: 500s, 429s and calls that hang.
+#
+# Prompt caching works like OpenAI's: when a request starts with the same
+# messages as an earlier one (at least --cache-min-tokens of them), that part
+# is reported as usage.prompt_tokens_details.cached_tokens.
+#
+# GET /stats returns how many calls each stage received (job title,
+# question, feedback, score, combined, speech), how many were failed on
+# purpose, and their prompt and cached tokens; POST /stats/reset clears them.
+#
+# Start it, then point the app at it:
+#   python benchmarks/openai_stub_server.py --port 8090 --ttft-ms 400
+#   OPENAI_BASE_URL=http://127.0.0.1:8090/v1 python app.py
+
+# Import built-in modules
+import argparse     # To read command-line options
+import hashlib      # Fingerprints of prompt prefixes
+import json         # Request and response bodies
+import math         # For the log-normal latency
+import os           # For paths
+import random       # For latencies and injected errors
+import sys          # To make the project importable
+import threading    # Lock protecting the counters
+import time         # To wait like the real API
+import uuid         # Response ids
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Make the project root importable (for the canned answers)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_openai import answer_for
+
+
+class StubSettings:
+    """
+    Timing and error settings of the stand-in (see the command-line options).
+    """
+
+    def __init__(
+        self,
+        ttft_ms: float = 400,
+        ttft_sigma: float = 0.5,
+        tokens_per_second: float = 80,
+        speech_chars_per_second: float = 300,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 120,
+        cache_min_tokens: int = 1024
+    ):
+        self.ttft_ms = ttft_ms
+        self.ttft_sigma = ttft_sigma
+        self.tokens_per_second = tokens_per_second
+        self.speech_chars_per_second = speech_chars_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.cache_min_tokens = cache_min_tokens
+
+    # Wait before the first token: log-normal around the median `ttft_ms`
+    def first_token_delay(self) -> float:
+        return self.ttft_ms / 1000 * math.exp(random.gauss(0, self.ttft_sigma))
+
+    # Pick what happens to one call: None (normal), 500, 429 or "hang"
+    def injected_fault(self):
+        roll = random.random()
+        if roll < self.error_rate:
+            return 500
+        roll -= self.error_rate
+        if roll < self.rate_limit_rate:
+            return 429
+        roll -= self.rate_limit_rate
+        if roll < self.hang_rate:
+            return "hang"
+        return None
+
+
+class StubStats:
+    """
+    Calls and injected errors per stage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, stage: str, fault=None):
+        with self._lock:
+            counts = self._counts(stage)
+            counts["calls"] += 1
+            if fault == 500:
+                counts["errors"] += 1
+            elif fault == 429:
+                counts["rate_limited"] += 1
+            elif fault == "hang":
+                counts["hung"] += 1
+
+    # Prompt tokens of an answered chat call, and how many were cached
+    def record_tokens(self, stage: str, prompt_tokens: int, cached_tokens: int):
+        with self._lock:
+            counts = self._counts(stage)
+            counts["prompt_tokens"] += prompt_tokens
+            counts["cached_tokens"] += cached_tokens
+
+    def _counts(self, stage: str) -> dict:
+        return self._stages.setdefault(stage, {
+            "calls": 0, "errors": 0, "rate_limited": 0, "hung": 0,
+            "prompt_tokens": 0, "cached_tokens": 0,
+        })
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._stages.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+class PrefixCache:
+    """
+    Remembers the message prefixes of recent requests, like OpenAI's prompt
+    cache: a request that starts with a remembered prefix gets those tokens
+    reported as cached (in steps of 128 tokens, from `min_tokens` on).
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._seen = OrderedDict()  # fingerprint of messages[:n] -> True
+
+    # Cached tokens for these messages (and remember all their prefixes)
+    def lookup(self, messages: list, min_tokens: int) -> int:
+        fingerprint = hashlib.sha256()
+        prefixes = []  # (fingerprint, tokens up to and including this message)
+        tokens = 0
+        for message in messages:
+            fingerprint.update(json.dumps(message, sort_keys=True).encode())
+            tokens += count_tokens(message.get("content") or "")
+            prefixes.append((fingerprint.hexdigest(), tokens))
+
+        cached = 0
+        with self._lock:
+            # Never the whole prompt: the last message is always new work
+            for key, upto in prefixes[:-1]:
+                if key in self._seen:
+                    self._seen.move_to_end(key)
+                    cached = upto
+            for key, _ in prefixes:
+                self._seen[key] = True
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+        if cached < max(min_tokens, 1):
+            return 0
+        return cached // 128 * 128 if min_tokens else cached
+
+    def reset(self):
+        with self._lock:
+            self._seen.clear()
+
+
+# Which step of the interview a chat call belongs to, from its task (the
+# last message, see services/ai_interview.py)
+def stage_for(prompt: str, wants_json: bool) -> str:
+    if wants_json:
+        return "combined"
+    if "Score: X" in prompt:
+        return "score"
+    if "one per line" in prompt:
+        return "question_pool"
+    if "Return only the job title" in prompt:
+        return "job_title"
+    if "interview coach" in prompt:
+        return "feedback"
+    return "question"
+
+# Rough token count (about 1.3 tokens per word)
+def count_tokens(text: str) -> int:
+    return max(1, int(len(text.split()) * 1.3))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Handles one request to the stand-in (settings and stats live on the server).
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep connections alive like the real API
+
+    # Don't print a line per request
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/stats":
+            return self._send_json(200, self.server.stats.stats())
+        self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/stats/reset":
+            self.server.stats.reset()
+            self.server.prefix_cache.reset()
+            return self._send_json(200, {})
+        if self.path.endswith("/chat/completions"):
+            return self._chat(body)
+        if self.path.endswith("/audio/speech"):
+            return self._speech(body)
+        self._send_json(404, {"error": {"message": "Not found"}})
+
+    # ---------------------- Endpoints ----------------------
+
+    def _chat(self, body: dict):
+        settings = self.server.settings
+        messages = body.get("messages") or [{"content": ""}]
+        task = messages[-1].get("content") or ""
+        wants_json = (body.get("response_format") or {}).get("type") == "json_object"
+        stage = stage_for(task, wants_json)
+        fault = settings.injected_fault()
+        self.server.stats.record(stage, fault)
+        if fault is not None:
+            return self._fail(fault)
+
+        text = answer_for(task, wants_json)
+        prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+        cached_tokens = self.server.prefix_cache.lookup(messages, settings.cache_min_tokens)
+        self.server.stats.record_tokens(stage, prompt_tokens, cached_tokens)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": count_tokens(text),
+            "total_tokens": prompt_tokens + count_tokens(text),
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        model = body.get("model", "gpt-3.5-turbo")
+        time.sleep(settings.first_token_delay())
+
+        if not body.get("stream"):
+            time.sleep(usage["completion_tokens"] / settings.tokens_per_second)
+            return self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        # Streamed: one Server-Sent Event per word, at the token rate
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        def chunk(delta: dict, finish_reason=None, with_usage=False) -> dict:
+            return {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [] if with_usage else [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+                "usage": usage if with_usage else None,
+            }
+
+        self._start_chunked(200, "text/event-stream")
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == 0 else " " + word
+            self._write_event(chunk({"role": "assistant", "content": piece} if i == 0 else {"content": piece}))
+            time.sleep(count_tokens(word) / settings.tokens_per_second)
+        self._write_event(chunk({}, finish_reason="stop"))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._write_event(chunk({}, with_usage=True))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _speech(self, body: dict):
+        settings = self.server.settings
+        text = body.get("input", "")
+        fault = settings.injected_fault()
+        self.server.stats.record("speech", fault)
+        if fault is not None:
+            return self._fail(fault)
+
+        time.sleep(settings.first_token_delay() + len(text) / settings.speech_chars_per_second)
+        # About 1 KB of "MP3" per 10 characters (MPEG frame sync bytes, then padding)
+        audio = b"\xff\xfb\x90\x00" + os.urandom(100 * max(1, len(text)))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(audio)))
+        self.end_headers()
+        self.wfile.write(audio)
+
+    # ---------------------- Responses ----------------------
+
+    # An injected failure: a 500, a 429 (with Retry-After), or a hang
+    def _fail(self, fault):
+        if fault == "hang":
+            time.sleep(self.server.settings.hang_seconds)
+            fault = 500
+        message = "Rate limit reached (injected)" if fault == 429 else "Server error (injected)"
+        headers = {"Retry-After": "1"} if fault == 429 else {}
+        self._send_json(fault, {"error": {"message": message, "type": "stub_error"}}, headers)
+
+    def _send_json(self, status: int, data: dict, headers: dict = None):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _start_chunked(self, status: int, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    # Send one piece of a chunked response (an empty piece ends it)
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _write_event(self, data: dict):
+        self._write_chunk(f"data: {json.dumps(data)}\n\n".encode())
+
+
+# Create the stand-in server (call serve_forever() on it, e.g. in a thread)
+def create_server(host: str, port: int, settings: StubSettings) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024  # Don't refuse connections under load
+    server.settings = settings
+    server.stats = StubStats()
+    server.prefix_cache = PrefixCache()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI stand-in for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--ttft-ms", type=float, default=400, help="median wait before the first token (ms)")
+    parser.add_argument("--ttft-sigma", type=float, default=0.5, help="spread of that wait (log-normal sigma)")
+    parser.add_argument("--tokens-per-sec", type=float, default=80, help="completion tokens per second")
+    parser.add_argument("--speech-chars-per-sec", type=float, default=300, help="speech input characters per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls answered with a 429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of calls that hang")
+    parser.add_argument("--hang-seconds", type=float, default=120, help="how long a hanging call hangs")
+    parser.add_argument("--cache-min-tokens", type=int, default=1024, help="shortest prompt prefix that is cached")
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        ttft_ms=args.ttft_ms,
+        ttft_sigma=args.ttft_sigma,
+        tokens_per_second=args.tokens_per_sec,
+        speech_chars_per_second=args.speech_chars_per_sec,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        cache_min_tokens=args.cache_min_tokens
+    )
+    server = create_server(args.host, args.port, settings)
+    print(f"OpenAI stand-in listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+# config.py
+
+# Central place for the app's tunable settings.
+# Every value can be overridden with an environment variable (for example in
+# your .env file), so production and local development can differ without
+# code changes.
+
+# Import os to read environment variables and build file paths
+import os
+
+# Load settings from the .env file before reading any of them
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Find the folder where this file lives (the project root)
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Folder used for database files and other local state
+INSTANCE_DIR = os.path.join(basedir, "instance")
+os.makedirs(INSTANCE_DIR, exist_ok=True)
+
+
+# ---------------------- Interview Sessions ----------------------
+
+# Where interview state is kept between /upload and /chat:
+#   "memory" – fast in-process store (one per worker process)
+#   "sqlite" – shared file-backed store, visible to every worker
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+
+# How long an idle interview is kept before it is thrown away (seconds)
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+
+# Maximum number of interviews the in-memory store keeps per worker
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "20000"))
+
+# Number of independently locked shards in the in-memory store
+SESSION_SHARDS = int(os.getenv("SESSION_SHARDS", "64"))
+
+# SQLite file used by the "sqlite" session backend
+SESSION_DB_PATH = os.getenv(
+    "SESSION_DB_PATH", os.path.join(INSTANCE_DIR, "sessions.db")
+)
+
+
+# ---------------------- Database ----------------------
+
+# Where the main app database lives (users, interview history)
+DATABASE_URI = os.getenv(
+    "DATABASE_URL", f"sqlite:///{os.path.join(INSTANCE_DIR, 'users.db')}"
+)
+
+
+# SQLite tuning for the app database (WAL, lock waiting, pool sizes).
+# Set DB_SQLITE_PROFILE=0 to use SQLite's defaults instead.
+DB_SQLITE_PROFILE = os.getenv("DB_SQLITE_PROFILE", "1") == "1"
+
+# How long a connection waits for another one to finish writing (milliseconds)
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+
+# How often SQLite flushes to disk: NORMAL is safe with WAL and much faster
+# than FULL (a power cut can lose the last commits, never corrupt the file)
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+
+# Connections kept open per worker, extra ones allowed under load, and how
+# long a request waits for a free connection (seconds)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Logged-in users are kept in memory for this long (seconds) so most requests
+# don't load them from the database again (0 turns the cache off)
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# Apply pending database migrations when the app starts
+DB_MIGRATE_ON_START = os.getenv("DB_MIGRATE_ON_START", "1") == "1"
+
+
+# ---------------------- Career Home ----------------------
+
+# Interviews per page in the history table (and the most a request may ask for)
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+HISTORY_PAGE_MAX = int(os.getenv("HISTORY_PAGE_MAX", "100"))
+
+# Long histories are shrunk to at most this many points on the progress chart
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "200"))
+
+# Histories longer than this are averaged into buckets by the database
+# instead of being read in full and shrunk with LTTB (faster, a bit smoother)
+CHART_LTTB_MAX_ROWS = int(os.getenv("CHART_LTTB_MAX_ROWS", "5000"))
+
+
+# ---------------------- Score Analytics ----------------------
+
+# Number of interviews averaged in the moving-average lines
+ANALYTICS_MOVING_AVERAGE_WINDOW = int(os.getenv("ANALYTICS_MOVING_AVERAGE_WINDOW", "5"))
+
+# Most recent moving-average points sent to the browser
+ANALYTICS_SERIES_MAX_POINTS = int(os.getenv("ANALYTICS_SERIES_MAX_POINTS", "500"))
+
+# The per-job-title numbers (all users) are recomputed at most this often (seconds)
+ANALYTICS_CACHE_SECONDS = float(os.getenv("ANALYTICS_CACHE_SECONDS", "300"))
+
+# Rows read from the database at a time when filling the arrays
+ANALYTICS_CHUNK_ROWS = int(os.getenv("ANALYTICS_CHUNK_ROWS", "50000"))
+
+
+# ---------------------- Leaderboard ----------------------
+
+# Entries kept (and the most a request may ask for) in each top list
+LEADERBOARD_TOP_K = int(os.getenv("LEADERBOARD_TOP_K", "100"))
+
+# Reads pick up interviews saved by other workers at most this often (seconds).
+# The worker that saves an interview updates its boards straight away.
+LEADERBOARD_SYNC_SECONDS = float(os.getenv("LEADERBOARD_SYNC_SECONDS", "5"))
+
+# Rows read from the database at a time when the boards are first loaded
+LEADERBOARD_LOAD_CHUNK_ROWS = int(os.getenv("LEADERBOARD_LOAD_CHUNK_ROWS", "50000"))
+
+
+# ---------------------- Admin Export ----------------------
+
+# Rows fetched from the database at a time by export.py (memory stays at
+# about one batch, however big the table is)
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "10000"))
+
+# Incremental exports by time look back this far before the last run
+# (seconds), so rows saved while the last export was running aren't missed
+EXPORT_WATERMARK_LAG_SECONDS = float(os.getenv("EXPORT_WATERMARK_LAG_SECONDS", "300"))
+
+
+# ---------------------- AI Calls ----------------------
+
+# How the last interview turn gets its feedback and score:
+#   "sequential" – feedback call, then score call (two waits in a row)
+#   "parallel"   – both calls sent at the same time
+#   "combined"   – one structured call returns feedback and score together
+FINAL_TURN_MODE = os.getenv("FINAL_TURN_MODE", "parallel")
+
+# Maximum number of AI calls a worker runs in the background at once
+LLM_EXECUTOR_WORKERS = int(os.getenv("LLM_EXECUTOR_WORKERS", "16"))
+
+# Start generating the follow-up question in the background as soon as the
+# first question is shown (it does not depend on the candidate's answer)
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+
+# Maximum number of speculative follow-up calls in flight per worker
+PREFETCH_MAX_IN_FLIGHT = int(os.getenv("PREFETCH_MAX_IN_FLIGHT", "8"))
+
+# Unused prefetched questions are thrown away after this many seconds
+PREFETCH_TTL_SECONDS = int(os.getenv("PREFETCH_TTL_SECONDS", "1800"))
+
+
+# ---------------------- Job Title Classifier ----------------------
+
+# Guess the job title locally from the resume (services/job_titles.py) and
+# only ask the AI when the local guess isn't sure enough
+JOB_TITLE_LOCAL_ENABLED = os.getenv("JOB_TITLE_LOCAL_ENABLED", "true").lower() == "true"
+
+# The local guess is used when the best title scores at least this much
+# (a title named in the resume is worth 5, the first one named 10; a skill
+# is worth up to 1) ...
+JOB_TITLE_MIN_SCORE = float(os.getenv("JOB_TITLE_MIN_SCORE", "8"))
+
+# ... and at least this many times the second-best title
+JOB_TITLE_MIN_MARGIN = float(os.getenv("JOB_TITLE_MIN_MARGIN", "1.5"))
+
+
+# ---------------------- Question Pool ----------------------
+
+# Serve first questions from a pool of ready-made questions per job title
+# (services/question_pool.py) instead of asking the AI on every upload
+QUESTION_POOL_ENABLED = os.getenv("QUESTION_POOL_ENABLED", "true").lower() == "true"
+
+# Also keep pools per job title and main resume skill ("Backend Engineer" +
+# "kafka"); questions fit the resume better, but more pools need filling
+QUESTION_POOL_BY_SKILL = os.getenv("QUESTION_POOL_BY_SKILL", "false").lower() == "true"
+
+# Questions written by one refill call
+QUESTION_POOL_BATCH_SIZE = int(os.getenv("QUESTION_POOL_BATCH_SIZE", "8"))
+
+# A pool with fewer questions than this is refilled in the background
+QUESTION_POOL_LOW_WATER = int(os.getenv("QUESTION_POOL_LOW_WATER", "3"))
+
+# Most questions kept per pool, and most pools kept per worker
+QUESTION_POOL_MAX_SIZE = int(os.getenv("QUESTION_POOL_MAX_SIZE", "24"))
+QUESTION_POOL_MAX_TITLES = int(os.getenv("QUESTION_POOL_MAX_TITLES", "200"))
+
+# Two questions are near-duplicates when their MinHash signatures agree in
+# more than this share of places (about the share of word pairs they share)
+QUESTION_POOL_DUPLICATE_THRESHOLD = float(os.getenv("QUESTION_POOL_DUPLICATE_THRESHOLD", "0.5"))
+
+# Comma-separated job titles whose pools are filled at startup, so even
+# their first candidates get a pooled question (e.g. "Software Engineer,Data Analyst")
+QUESTION_POOL_WARM_TITLES = [
+    t.strip() for t in os.getenv("QUESTION_POOL_WARM_TITLES", "").split(",") if t.strip()
+]
+
+
+# ---------------------- OpenAI Connection ----------------------
+
+# Address of the OpenAI API (empty = the real one). Point it at a local
+# stand-in such as benchmarks/openai_stub_server.py for load tests.
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Connections to OpenAI shared by every AI call in a worker: the most open
+# at once, how many idle ones are kept alive, and for how long (seconds)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+
+# Time limits (seconds): opening a connection, short calls (job title,
+# questions), long calls (feedback, score) and speech
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_TIMEOUT_SHORT = float(os.getenv("OPENAI_TIMEOUT_SHORT", "20"))
+OPENAI_TIMEOUT_LONG = float(os.getenv("OPENAI_TIMEOUT_LONG", "60"))
+OPENAI_TIMEOUT_SPEECH = float(os.getenv("OPENAI_TIMEOUT_SPEECH", "60"))
+
+# Failed calls (timeouts, connection errors, 429 and 5xx answers) are tried
+# again this many times, waiting a random time up to
+# base * 2^attempt seconds (never more than the max) in between
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_RETRY_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5"))
+OPENAI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "8"))
+
+# Hedging: if a short call has no answer after this many seconds, send the
+# same request again and use whichever answers first (0 turns it off)
+OPENAI_HEDGE_AFTER_SECONDS = float(os.getenv("OPENAI_HEDGE_AFTER_SECONDS", "0"))
+
+# Maximum number of hedged calls in flight per worker (others aren't hedged)
+OPENAI_HEDGE_MAX_IN_FLIGHT = int(os.getenv("OPENAI_HEDGE_MAX_IN_FLIGHT", "16"))
+
+# Circuit breaker: after this many failed calls in a row, AI requests fail
+# straight away for OPENAI_BREAKER_RESET_SECONDS, then one test call decides
+# whether OpenAI is back
+OPENAI_BREAKER_THRESHOLD = int(os.getenv("OPENAI_BREAKER_THRESHOLD", "5"))
+OPENAI_BREAKER_RESET_SECONDS = float(os.getenv("OPENAI_BREAKER_RESET_SECONDS", "30"))
+
+
+# ---------------------- Result Cache ----------------------
+
+# SQLite file that keeps cached AI results across restarts and workers
+RESULT_CACHE_DB_PATH = os.getenv(
+    "RESULT_CACHE_DB_PATH", os.path.join(INSTANCE_DIR, "cache.db")
+)
+
+# Maximum number of results each cache keeps in memory per worker
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "5000"))
+
+# How long a cached result stays valid (seconds, default 7 days)
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# How often (seconds) each worker deletes expired cached results
+RESULT_CACHE_PURGE_SECONDS = int(os.getenv("RESULT_CACHE_PURGE_SECONDS", "3600"))
+
+
+# ---------------------- Text-to-Speech ----------------------
+
+# OpenAI voice settings used for every spoken message
+TTS_MODEL = os.getenv("TTS_MODEL", "tts-1")
+TTS_VOICE = os.getenv("TTS_VOICE", "nova")
+
+# Folder where generated audio is cached (reused when the same text is spoken again)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(basedir, "static", "tts"))
+
+# Maximum total size of the audio cache before the least recently played
+# files are deleted (bytes, default 200 MB)
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# How often (seconds) each worker re-reads the audio cache folder in the
+# background, to count the files other workers wrote towards the budget
+TTS_CACHE_RESCAN_SECONDS = int(os.getenv("TTS_CACHE_RESCAN_SECONDS", "60"))
+
+# Streaming speech: how many sentences are synthesized at the same time
+TTS_STREAM_CONCURRENCY = int(os.getenv("TTS_STREAM_CONCURRENCY", "3"))
+
+# Streaming speech: sentences are merged or split to stay within these sizes
+TTS_STREAM_MIN_CHARS = int(os.getenv("TTS_STREAM_MIN_CHARS", "40"))
+TTS_STREAM_MAX_CHARS = int(os.getenv("TTS_STREAM_MAX_CHARS", "600"))
+
+
+# ---------------------- Temporary Files ----------------------
+
+# Files in the uploads folder are deleted after this many seconds
+UPLOAD_MAX_AGE_SECONDS = int(os.getenv("UPLOAD_MAX_AGE_SECONDS", "600"))
+
+# Speech files still being written (".part" files in the audio cache) are
+# normally renamed or removed within seconds; ones left behind by a crashed
+# request are deleted after this many seconds
+TTS_TEMP_MAX_AGE_SECONDS = int(os.getenv("TTS_TEMP_MAX_AGE_SECONDS", "600"))
+
+
+# ---------------------- Resume Parsing ----------------------
+
+# Only the first this-many PDF pages are read (longer documents are cut off)
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "30"))
+
+# Give up on a document that takes longer than this to read (seconds)
+RESUME_PARSE_TIMEOUT = float(os.getenv("RESUME_PARSE_TIMEOUT", "15"))
+
+# PDFs with at least this many pages are split across several worker
+# processes (smaller ones are read by one worker)
+RESUME_PARALLEL_MIN_PAGES = int(os.getenv("RESUME_PARALLEL_MIN_PAGES", "6"))
+
+# Number of processes used to read large PDFs (0 = one per CPU core)
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", "0"))
+
+# Resumes are cleaned up and cut to about this many tokens before they are
+# put into AI prompts (the least useful sections are dropped first)
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "1200"))
+
+# Tokenizer used to count prompt tokens
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+
+# ---------------------- Monitoring ----------------------
+
+# If set, /metrics only answers requests sending "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Profile this share of requests (0 = off, 0.01 = one in a hundred) and keep
+# the profile when the request took at least PROFILE_SLOW_SECONDS
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "2"))
+
+# Folder for saved profiles (open them with python -m pstats or snakeviz)
+# and how many are kept (oldest deleted first)
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(INSTANCE_DIR, "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
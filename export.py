@@ -0,0 +1,223 @@
+# Export users, interview history or Career Home stats as CSV or JSONL.
+#
+#   python export.py history --format jsonl --output history.jsonl
+#   python export.py history --since 2024-01-01 --until 2024-02-01
+#   python export.py stats --output stats.csv --watermark exports.json
+#   python export.py users --columns username   # (what list_users.py used to print)
+#
+# Rows are streamed from the database in batches of EXPORT_BATCH_ROWS
+# (a server-side cursor where the database has one) and written out as they
+# arrive, so memory stays flat however many millions of rows there are.
+#
+# This doesn't import the app (no Flask, OpenAI, PDF parsing, ...): it
+# connects straight to DATABASE_URL with SQLAlchemy and reads the table layout
+# from the database itself. Password hashes are never exported.
+#
+# With --watermark FILE only what changed since the last export with the same
+# file is written, and the file is updated once the export has finished:
+#   - history: interviews saved since then (by id, each exactly once)
+#   - users:   new users and users who interviewed since then
+#   - stats:   stats updated since then
+# A user or stats row that changed again shows up again (newest values), so
+# load incremental files by key (user_id / id).
+
+# Import built-in modules
+import argparse     # To read command-line options
+import csv          # To write CSV
+import json         # To write JSONL and the watermark file
+import os           # To replace the watermark file safely
+import sys          # For stdout and progress on stderr
+import time         # For throughput
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Import SQLAlchemy (no Flask needed)
+from sqlalchemy import DateTime, MetaData, create_engine, func, or_, select
+from sqlalchemy.exc import InvalidRequestError
+
+# Import app settings (database location, batch size)
+import config
+
+
+# ---------------------- What Can Be Exported ----------------------
+
+# table:       the database table
+# date_column: what --since/--until filter on
+# id_column:   a key that only grows (new rows), followed by --watermark
+# time_column: a change time, followed by --watermark
+Export = namedtuple("Export", "table date_column id_column time_column")
+
+EXPORTS = {
+    "users":   Export("user", "last_interview_time", "id", "last_interview_time"),
+    "history": Export("interview_history", "created_at", "id", None),
+    "stats":   Export("user_stats", "updated_at", None, "updated_at"),
+}
+
+# Never written out
+HIDDEN_COLUMNS = {"password"}
+
+FORMATS = ("csv", "jsonl")
+
+
+# ---------------------- Query ----------------------
+
+# "2024-01-31" or "2024-01-31 14:00" -> datetime
+def parse_date(text: str) -> datetime:
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a date: {text!r} (use YYYY-MM-DD or 'YYYY-MM-DD HH:MM')")
+
+# The SELECT for one export, in primary-key order. Also returns the watermark
+# to save if the export finishes.
+def build_query(conn, spec: Export, table, columns: list, since=None, until=None, mark=None):
+    query = select(*(table.c[name] for name in columns)).order_by(*table.primary_key.columns)
+
+    date = table.c[spec.date_column]
+    if since is not None:
+        query = query.where(date >= since)
+    if until is not None:
+        query = query.where(date < until)
+
+    new_mark = {}
+    if spec.id_column:
+        key = table.c[spec.id_column]
+        top_id = conn.scalar(select(func.max(key))) or 0
+        new_mark["id"] = max(top_id, (mark or {}).get("id", 0))
+        if spec.time_column is None:
+            # Rows saved while exporting wait for the next run (exactly once)
+            query = query.where(key <= top_id)
+    if spec.time_column:
+        # Rows can be saved with a change time a little in the past (a slow
+        # transaction), so the next run looks back a bit (they may repeat)
+        settled = datetime.utcnow() - timedelta(seconds=config.EXPORT_WATERMARK_LAG_SECONDS)
+        previous = (mark or {}).get("time")
+        new_mark["time"] = max(settled.isoformat(), previous or "")
+
+    if mark:
+        changed = []
+        if spec.id_column and "id" in mark:
+            changed.append(table.c[spec.id_column] > mark["id"])
+        if spec.time_column and mark.get("time"):
+            changed.append(table.c[spec.time_column] > datetime.fromisoformat(mark["time"]))
+        if changed:
+            query = query.where(or_(*changed))
+    return query, new_mark
+
+
+# ---------------------- Writing ----------------------
+
+# A function that writes a batch of rows in the chosen format
+def row_writer(out, fmt: str, columns: list, date_indexes: list):
+    def plain(row):
+        # Dates as ISO 8601 ("2024-01-31T14:00:00")
+        if not date_indexes:
+            return row
+        row = list(row)
+        for i in date_indexes:
+            if row[i] is not None:
+                row[i] = row[i].isoformat()
+        return row
+
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        return lambda rows: writer.writerows(map(plain, rows))
+
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    return lambda rows: out.write("".join(dumps(dict(zip(columns, plain(row)))) + "\n" for row in rows))
+
+# Read the watermark file ({} if there is none yet)
+def load_watermarks(path: str) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+# Write the watermark file in one step (a crash leaves the old one)
+def save_watermarks(path: str, marks: dict):
+    temp = path + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(marks, f, indent=2, sort_keys=True)
+    os.replace(temp, path)
+
+
+# ---------------------- Main ----------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream users, interview history or stats to CSV/JSONL")
+    parser.add_argument("what", choices=sorted(EXPORTS), help="what to export")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="output format")
+    parser.add_argument("--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--columns", help="comma-separated columns to write (default: all)")
+    parser.add_argument("--since", type=parse_date, help="only rows on or after this date")
+    parser.add_argument("--until", type=parse_date, help="only rows before this date")
+    parser.add_argument("--watermark", help="JSON file remembering the last export: only export what changed since")
+    parser.add_argument("--batch-size", type=int, default=config.EXPORT_BATCH_ROWS, help="rows fetched at a time")
+    parser.add_argument("--progress-every", type=float, default=10, help="seconds between progress lines")
+    args = parser.parse_args()
+    if args.watermark and (args.since or args.until):
+        # The watermark would move past rows the date filter left out
+        parser.error("--watermark can't be combined with --since/--until")
+
+    spec = EXPORTS[args.what]
+    engine = create_engine(config.DATABASE_URI)
+    metadata = MetaData()
+    try:
+        metadata.reflect(engine, only=[spec.table])
+    except InvalidRequestError:
+        parser.error(f"table {spec.table!r} doesn't exist in {engine.url!r} (start the app or run migrate.py first)")
+    table = metadata.tables[spec.table]
+
+    available = [c.name for c in table.columns if c.name not in HIDDEN_COLUMNS]
+    columns = args.columns.split(",") if args.columns else available
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        parser.error(f"unknown columns {unknown}; {args.what} has {available}")
+    date_indexes = [i for i, name in enumerate(columns) if isinstance(table.c[name].type, DateTime)]
+
+    marks = load_watermarks(args.watermark)
+    count = 0
+    start = last_report = time.monotonic()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        with engine.connect() as conn:
+            query, new_mark = build_query(conn, spec, table, columns, args.since, args.until,
+                                          marks.get(args.what) if args.watermark else None)
+            write = row_writer(out, args.format, columns, date_indexes)
+            # Stream: at most one batch of rows is held at a time
+            result = conn.execution_options(stream_results=True, yield_per=args.batch_size).execute(query)
+            for rows in result.partitions():
+                write(rows)
+                count += len(rows)
+                if time.monotonic() - last_report >= args.progress_every:
+                    elapsed = time.monotonic() - start
+                    print(f"Progress: {count} rows, {count / elapsed:,.0f} rows/s", file=sys.stderr)
+                    last_report = time.monotonic()
+        out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    # Only remember how far we got once everything is written
+    if args.watermark:
+        marks[args.what] = new_mark
+        save_watermarks(args.watermark, marks)
+
+    elapsed = max(time.monotonic() - start, 1e-9)
+    print(f"Exported {count} {args.what} rows in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
+
+# Instructions for the developer:
+# Nightly incremental dumps for reporting (the first run exports everything,
+# later runs only what changed; each run writes a new file):
+#
+# python export.py history --format jsonl --output history-$(date +%F).jsonl --watermark exports.json
+# python export.py stats --format jsonl --output stats-$(date +%F).jsonl --watermark exports.json
+#
+# List the registered users:
+#
+# python export.py users --columns username
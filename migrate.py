@@ -0,0 +1,26 @@
+# Don't let importing the app apply migrations on its own; we do it below
+import os
+os.environ["DB_MIGRATE_ON_START"] = "0"
+
+# Import the Flask app instance from your main app
+from app import app
+
+# Import the migration runner (see models/migrations.py)
+from models.migrations import MIGRATIONS, run_migrations, schema_version
+
+# Run inside the app context so we can talk to the database
+with app.app_context():
+    applied = run_migrations()
+
+    # Show what changed
+    for version, description, _ in MIGRATIONS:
+        if version in applied:
+            print(f"Applied {version}: {description}")
+    print(f"Database schema is at version {schema_version()}.")
+
+# Instructions for the developer:
+# The app applies pending migrations by itself when it starts. If you turn
+# that off (DB_MIGRATE_ON_START=0), for example to upgrade the database once
+# before starting several workers, run:
+#
+# python migrate.py
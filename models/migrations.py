@@ -0,0 +1,93 @@
+# models/migrations.py
+
+# Versioned changes to the database layout.
+#
+# Every change gets a number, a short description and a function that makes
+# it. The database remembers which numbers have already been applied (in the
+# schema_version table), so each change runs exactly once per database, in
+# order, no matter how many times the app starts. To change the layout, add
+# a new entry at the end of MIGRATIONS - never edit one that has shipped.
+#
+# Migration functions receive an open connection inside the migration
+# transaction and should be safe on a fresh database too (where step 1 has
+# already created every table from the current models).
+
+# Import SQLAlchemy helpers
+from sqlalchemy import inspect, text
+
+# Import the database object and models
+from models.user import db, InterviewHistory
+
+
+# ---------------------- Migration Steps ----------------------
+
+# 1: Create any tables that don't exist yet (users, interview history, stats)
+def _create_tables(conn):
+    db.metadata.create_all(bind=conn)
+
+# 2: Index interview history by user and date (history pages, chart, stats)
+def _index_history_by_user_date(conn):
+    for index in InterviewHistory.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+
+# 3: A score column per rubric category (clarity, professionalism, ...)
+def _add_category_score_columns(conn):
+    for key in InterviewHistory.CATEGORY_KEYS:
+        add_column(conn, "interview_history", f"score_{key} SMALLINT")
+
+
+# Add a column to an existing table unless it is already there
+# (tables made by step 1 already have every column)
+def add_column(conn, table: str, column_sql: str):
+    name = column_sql.split()[0]
+    columns = {c["name"] for c in inspect(conn).get_columns(table)}
+    if name not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_sql}"))
+
+
+# (version, description, function) - append only, in order
+MIGRATIONS = [
+    (1, "Create missing tables", _create_tables),
+    (2, "Index interview_history on (user_id, created_at)", _index_history_by_user_date),
+    (3, "Add rubric category score columns to interview_history", _add_category_score_columns),
+]
+
+
+# ---------------------- Runner ----------------------
+
+# Make sure the version table exists and return the versions already applied
+def _applied_versions(conn) -> set:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        " version INTEGER PRIMARY KEY,"
+        " description VARCHAR(255) NOT NULL,"
+        " applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_version"))}
+
+# Apply every migration this database hasn't seen yet and return their numbers.
+# All of them run in one transaction that holds the write lock, so several
+# app processes starting at once don't apply the same step twice.
+def run_migrations(engine=None) -> list:
+    engine = engine or db.engine
+    applied = []
+    with engine.connect().execution_options(sqlite_begin="IMMEDIATE") as conn:
+        with conn.begin():
+            done = _applied_versions(conn)
+            for version, description, migrate in MIGRATIONS:
+                if version in done:
+                    continue
+                migrate(conn)
+                conn.execute(
+                    text("INSERT INTO schema_version (version, description) VALUES (:v, :d)"),
+                    {"v": version, "d": description},
+                )
+                applied.append(version)
+    return applied
+
+# The newest version applied to this database (0 if none)
+def schema_version(engine=None) -> int:
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        return max(_applied_versions(conn), default=0)
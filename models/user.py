@@ -59,6 +59,64 @@ class InterviewHistory(db.Model):
     # When the interview was created (set automatically to current time)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # The AI's score (1-10) for each rubric category, read from its breakdown.
+    # Empty for interviews saved before these columns existed, or when the AI
+    # left a category out. Small integers keep the rows (and scans) compact.
+    score_clarity         = db.Column(db.SmallInteger, nullable=True)
+    score_professionalism = db.Column(db.SmallInteger, nullable=True)
+    score_relevance       = db.Column(db.SmallInteger, nullable=True)
+    score_technical       = db.Column(db.SmallInteger, nullable=True)
+    score_problem_solving = db.Column(db.SmallInteger, nullable=True)
+    score_experience      = db.Column(db.SmallInteger, nullable=True)
+
     # Create a relationship to the User so we can easily do:
     # current_user.interviews to get all interviews for a user
     user = db.relationship('User', backref=db.backref('interviews', lazy='dynamic'))
+
+    # Index for reading one user's interviews in date order (history pages
+    # and the progress chart). SQLite adds the row id to every index, so
+    # (created_at, id) page cursors are answered from the index too.
+    __table_args__ = (
+        db.Index('ix_interview_history_user_created', 'user_id', 'created_at'),
+    )
+
+    # Short names of the rubric categories (each has a score_<name> column)
+    CATEGORY_KEYS = ("clarity", "professionalism", "relevance", "technical", "problem_solving", "experience")
+
+    # Fill the category columns from {"clarity": 7, ...} (unknown names are ignored)
+    def set_category_scores(self, scores: dict):
+        for key in self.CATEGORY_KEYS:
+            if key in scores:
+                setattr(self, f"score_{key}", scores[key])
+
+
+# -------------------- UserStats Model --------------------
+
+# Running totals for each user, updated every time an interview is saved,
+# so the Career Home dashboard never has to scan the whole interview history
+class UserStats(db.Model):
+    # One row per user (the user's id is also this table's id)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+
+    # How many interviews the user has finished
+    total_interviews = db.Column(db.Integer, default=0, nullable=False)
+
+    # Best score the user has ever received
+    highest_score = db.Column(db.Integer, default=0, nullable=False)
+
+    # Length of the current and the best run of consecutive interviews
+    # scoring at least 5, 6, 7 and 8 (used for the "Run of ..." badges)
+    current_run_5 = db.Column(db.Integer, default=0, nullable=False)
+    best_run_5    = db.Column(db.Integer, default=0, nullable=False)
+    current_run_6 = db.Column(db.Integer, default=0, nullable=False)
+    best_run_6    = db.Column(db.Integer, default=0, nullable=False)
+    current_run_7 = db.Column(db.Integer, default=0, nullable=False)
+    best_run_7    = db.Column(db.Integer, default=0, nullable=False)
+    current_run_8 = db.Column(db.Integer, default=0, nullable=False)
+    best_run_8    = db.Column(db.Integer, default=0, nullable=False)
+
+    # When these numbers last changed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Lets us do user.stats to get this row
+    user = db.relationship('User', backref=db.backref('stats', uselist=False))
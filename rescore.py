@@ -0,0 +1,286 @@
+# Re-score a batch of past interviews offline (e.g. after a rubric change).
+#
+# Reads a JSONL file with one interview per line:
+#   {"id": "...", "questions": "...", "answer": "...", "resume": "...", "job_title": "..."}
+# ("questions" and "answer" may also be lists, in the order they were asked and
+# given; "resume_text" works instead of "resume",
+# and "id" is optional: the line number is used instead)
+#
+# and writes one JSONL result per interview as soon as it is ready:
+#   {"id": "...", "score": 7, "breakdown": "...", "categories": {"clarity": 7, ...}, "feedback": "..."}
+#
+# The output file is also the checkpoint: run the same command again after a
+# crash (or Ctrl+C) and interviews already in it are skipped.
+#
+# How fast it goes is limited two ways: at most --concurrency interviews are
+# scored at once, and at most --max-rpm OpenAI requests are started per minute.
+# When OpenAI answers "rate limited" (429) even after retries, the pace is
+# halved for a while and the interview is tried again later.
+
+# Import built-in modules
+import argparse     # To read command-line options
+import email.utils  # To read Retry-After dates
+import os           # To check for an existing output file
+import json         # To read and write JSONL
+import sys          # To print progress to stderr
+import threading    # Lock for the pacer and the output file
+import time         # For pacing and throughput
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone
+
+import openai
+
+# Import app settings and the scoring functions used by /chat
+import config
+from services.ai_interview import get_feedback, score_answer, get_feedback_and_score, parse_category_scores
+from services.openai_client import UpstreamUnavailable
+from services.resume_compactor import compact_resume
+
+
+# ---------------------- Pacing ----------------------
+
+class Pacer:
+    """
+    Spaces out OpenAI requests to stay under a requests-per-minute limit.
+    After a 429 the gap between requests doubles; every success shrinks it
+    again, back down to the configured limit.
+    """
+
+    def __init__(self, max_rpm: float):
+        self.base_interval = 60.0 / max_rpm if max_rpm > 0 else 0.0
+        self.interval = self.base_interval
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    # Wait for this thread's turn to start a request
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    # OpenAI asked us to slow down: pause everyone and halve the pace
+    def slow_down(self, pause: float):
+        with self._lock:
+            self.interval = min(60.0, max(self.interval * 2, self.base_interval, 0.05))
+            self._next_slot = max(self._next_slot, time.monotonic() + pause)
+
+    # A request worked: creep back towards the configured pace
+    def success(self):
+        with self._lock:
+            self.interval = max(self.base_interval, self.interval * 0.95)
+
+
+# ---------------------- Reading & Writing ----------------------
+
+# Yield (id, record) for every interview in the input file
+def read_records(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"line {line_number}: not valid JSON, skipped", file=sys.stderr)
+                continue
+            yield str(record.get("id", f"line-{line_number}")), record
+
+# Ids already in the output file (the checkpoint). A line cut off by a crash
+# is removed, so new results are appended cleanly.
+def load_checkpoint(path: str) -> set:
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    for line in data.decode("utf-8").splitlines():
+        try:
+            done.add(str(json.loads(line)["id"]))
+        except (ValueError, KeyError):
+            continue
+    return done
+
+
+class ResultWriter:
+    """
+    Appends results to the output file as they finish (one line each,
+    flushed straight away so a crash loses at most the interviews in flight).
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, result: dict):
+        line = json.dumps(result, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# ---------------------- Scoring ----------------------
+
+# What is asked for each interview:
+#   "score"    – a new score and breakdown (one request)
+#   "full"     – feedback, then a score (two requests)
+#   "combined" – feedback and score in one structured request
+MODES = ("score", "full", "combined")
+
+# Score one interview the same way /chat does. `result` holds what earlier
+# attempts already got (e.g. the feedback, when the score call was rate
+# limited): only the missing calls are made, so nothing is paid for twice.
+def score_record(record: dict, mode: str, pacer: Pacer, result: dict = None) -> dict:
+    resume = compact_resume(record.get("resume") or record.get("resume_text") or "")
+    args = (record.get("questions", ""), record.get("answer", ""), resume, record.get("job_title", ""))
+
+    result = {} if result is None else result
+    if mode == "combined":
+        if "score" not in result:
+            pacer.wait()
+            feedback, score, breakdown = get_feedback_and_score(*args)
+            result.update(feedback=feedback, score=score, breakdown=breakdown)
+    else:
+        if mode == "full" and "feedback" not in result:
+            pacer.wait()
+            result["feedback"] = get_feedback(*args)
+        if "score" not in result:
+            pacer.wait()
+            score, breakdown = score_answer(*args)
+            result.update(score=score, breakdown=breakdown)
+    # Each rubric category's own score, like the app saves them
+    result["categories"] = parse_category_scores(result["breakdown"])
+    return result
+
+# Longest pause a Retry-After header can ask for (seconds)
+MAX_RETRY_AFTER = 300.0
+
+# Seconds to wait from a Retry-After header: a number of seconds or an HTTP
+# date (both are allowed); `default` when it is missing or unreadable
+def retry_after_seconds(header, default: float) -> float:
+    if not header:
+        return default
+    try:
+        seconds = float(header)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return default
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+# Score one interview, waiting and trying again while OpenAI is rate
+# limiting or the circuit breaker is open. Returns (result, error).
+def score_with_retries(record_id: str, record: dict, mode: str, pacer: Pacer, max_attempts: int):
+    partial = {}  # Calls that already worked are kept between attempts
+    for attempt in range(1, max_attempts + 1):
+        try:
+            result = score_record(record, mode, pacer, partial)
+        except openai.RateLimitError as e:
+            retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+            pacer.slow_down(retry_after_seconds(retry_after, 5.0 * attempt))
+            error = e
+            continue
+        except UpstreamUnavailable as e:
+            pacer.slow_down(config.OPENAI_BREAKER_RESET_SECONDS)
+            error = e
+            continue
+        except Exception as e:
+            return None, e
+        pacer.success()
+        return {"id": record_id, **result}, None
+    return None, error
+
+
+# ---------------------- Main ----------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score past interviews from a JSONL file")
+    parser.add_argument("input", help="JSONL file of interviews")
+    parser.add_argument("output", help="JSONL file for the results (also the checkpoint)")
+    parser.add_argument("--mode", choices=MODES, default="score",
+                        help="what to ask for each interview (see MODES)")
+    parser.add_argument("--concurrency", type=int, default=8, help="interviews scored at once")
+    parser.add_argument("--max-rpm", type=float, default=300, help="most OpenAI requests started per minute (0 = no limit)")
+    parser.add_argument("--max-attempts", type=int, default=5, help="tries per interview when rate limited")
+    parser.add_argument("--progress-every", type=float, default=10, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    done = load_checkpoint(args.output)
+    if done:
+        print(f"Resuming: {len(done)} interviews already scored", file=sys.stderr)
+
+    pacer = Pacer(args.max_rpm)
+    writer = ResultWriter(args.output)
+    counts = {"scored": 0, "failed": 0, "skipped": 0}
+    start = last_report = time.monotonic()
+
+    def report(final=False):
+        minutes = max(time.monotonic() - start, 1e-9) / 60
+        print(
+            f"{'Done' if final else 'Progress'}: {counts['scored']} scored, {counts['failed']} failed, "
+            f"{counts['skipped']} skipped, {counts['scored'] / minutes:.1f} interviews/min",
+            file=sys.stderr
+        )
+
+    # Keep at most `concurrency` interviews in flight, reading the input as we go
+    pool = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="rescore")
+    in_flight = {}
+
+    def collect(futures):
+        nonlocal last_report
+        for future in futures:
+            record_id = in_flight.pop(future)
+            result, error = future.result()
+            if error is None:
+                writer.write(result)
+                counts["scored"] += 1
+            else:
+                counts["failed"] += 1
+                print(f"{record_id}: {type(error).__name__}: {error}", file=sys.stderr)
+        if time.monotonic() - last_report >= args.progress_every:
+            report()
+            last_report = time.monotonic()
+
+    try:
+        for record_id, record in read_records(args.input):
+            if record_id in done:
+                counts["skipped"] += 1
+                continue
+            while len(in_flight) >= args.concurrency:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+            future = pool.submit(score_with_retries, record_id, record, args.mode, pacer, args.max_attempts)
+            in_flight[future] = record_id
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(finished)
+    except KeyboardInterrupt:
+        print("Stopped: run the same command again to continue", file=sys.stderr)
+        pool.shutdown(wait=False, cancel_futures=True)
+    finally:
+        writer.close()
+    report(final=True)
+
+
+if __name__ == "__main__":
+    main()
+
+# Instructions for the developer:
+# Re-grade past interviews after changing the scoring rubric (the output file
+# can be read back with any JSONL tool; failed interviews are listed on stderr
+# and are tried again the next time the command runs):
+#
+# python rescore.py interviews.jsonl rescored.jsonl --concurrency 16 --max-rpm 500
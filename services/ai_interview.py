@@ -1,86 +1,291 @@
-# Import the OpenAI library to talk to ChatGPT or other OpenAI models
-import openai
+# Import json to read the structured (JSON) answer of the combined call
+import json
 
-# Import os to access environment variables (like API keys)
-import os
+# Import queue to hand streamed text between threads
+import queue
+
+# Import logging to record how many tokens each AI call used
+import logging
+
+# Import asyncio to run AI calls side by side in the async versions
+import asyncio
+
+# Import re to read the category scores out of a breakdown
+import re
 
 # Load environment variables from a .env file (keeps secrets hidden)
 from dotenv import load_dotenv
 
+# Per-user interview state lives in the shared session store
+from services.session_store import session_store
+
+# Shared pool used to run AI calls side by side
+from services.executor import llm_executor
+
+# Background generation of answers we can predict (like the follow-up question)
+from services.prefetch import prefetcher
+
+# Cache for results that only depend on the resume (repeat uploads)
+from services.result_cache import create_result_cache, content_key
+
+# Local job-title guess (no AI call) and clean-up of the AI's job titles
+from services.job_titles import classify, normalize_title, record_outcome, canonical_base, skill_tags
+
+# Ready-made questions per job title, with near-duplicate checks
+from services.question_pool import create_question_pool
+
+# App settings (e.g. which final-turn mode to use)
+import config
+
+# The interview table (for the names of the rubric category columns)
+from models.user import InterviewHistory
+
 # Load secret settings like the OpenAI API key
 load_dotenv()
 
-# Create a client to talk to OpenAI using the API key
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# The shared OpenAI clients (sync, and async for the ASGI entry point) and
+# the rules every call follows: time limits, retries, hedging, circuit breaker
+from services.openai_client import client, async_client, upstream
+
+# Stage timings and token counts for the /metrics page
+from services.metrics import span, timed, record_tokens
+
+# Short calls (tighter time limit, may be hedged); every other call is "long"
+SHORT_STAGES = {"guess_job_title", "ask_interview_question"}
+
+# Kind of call for upstream.call(): "short" or "long"
+def _kind(stage: str) -> str:
+    return "short" if stage in SHORT_STAGES else "long"
+
+# Logger for token usage of every AI call
+logger = logging.getLogger(__name__)
+
+# Log the token usage reported by a completion (or the last streamed chunk)
+# and add it to the /metrics totals. cached_tokens is the part of the prompt
+# OpenAI could reuse from an earlier call (see "Conversation Layout" below).
+def _log_usage(stage: str, response):
+    usage = getattr(response, "usage", None)
+    record_tokens(stage, usage)
+    if usage is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        logger.info(
+            "%s: prompt_tokens=%s cached_tokens=%s completion_tokens=%s total_tokens=%s",
+            stage, usage.prompt_tokens, getattr(details, "cached_tokens", None) or 0,
+            usage.completion_tokens, usage.total_tokens
+        )
+
+# Prompt versions: bump one whenever its prompt text (or the way its answer
+# is cleaned up) changes, so answers cached for the old one are no longer used
+JOB_TITLE_PROMPT_VERSION = "3"
+QUESTION_PROMPT_VERSION  = "3"
+
+# Caches for the job title and the opening question of a resume
+job_title_cache      = create_result_cache("job_title", JOB_TITLE_PROMPT_VERSION)
+first_question_cache = create_result_cache("first_question", QUESTION_PROMPT_VERSION)
+
+
+# ---------------------- Conversation Layout ----------------------
+
+# Every AI call of an interview sends the same, growing list of messages:
+#   1. the system preamble below (the same for every call and every user)
+#   2. the resume
+#   3. the position (once the job title is known)
+#   4. the questions asked so far, then the candidate's answers
+#   5. the task of this call (ask a question, give feedback, score, ...)
+# Each call only adds to the end of what the previous call sent, so OpenAI
+# can reuse (cache) the processed beginning of the prompt: cached tokens are
+# cheaper and the answer starts sooner. Keep parts 1-4 exactly the same from
+# call to call: any change in them means nothing after it can be reused.
+SYSTEM_PREAMBLE = """
+You are the AI behind a mock job interview practice tool: you act as a recruiter, a coach and a career analyst.
+
+The messages that follow contain the candidate's resume, the position they are interviewing for, the questions asked so far and the candidate's answers.
+The last message is your task for this step. Follow it exactly and answer only what it asks for.
+""".strip()
+
+# The resume, always the second message
+def _resume_message(resume_text: str) -> dict:
+    return {"role": "user", "content": f"--- Resume ---\n{resume_text}"}
+
+# The position, always the third message
+def _position_message(job_title: str) -> dict:
+    return {"role": "user", "content": f"The candidate is interviewing for the position of {job_title}."}
+
+# Tasks that ask for the first and for every further interview question
+FIRST_QUESTION_TASK = """
+You are a professional recruiter conducting this mock interview.
+Use the candidate's resume to ask only one specific, realistic, and job-relevant interview question.
+Reply with the question only.
+""".strip()
+
+# (Repeats are caught after the fact, see _unless_repeated())
+NEXT_QUESTION_TASK = """
+Ask one more specific, realistic, and job-relevant interview question.
+Reply with the question only.
+""".strip()
+
+# Accept one question/answer as text or several as a list
+def _as_list(items) -> list[str]:
+    if isinstance(items, str):
+        return [items] if items else []
+    return list(items)
+
+# The messages every call of this interview starts with (parts 1-4 above).
+# `questions` are the questions asked so far, `answers` the candidate's answers.
+def conversation(resume_text: str, job_title: str = None, questions=(), answers=()) -> list[dict]:
+    messages = [{"role": "system", "content": SYSTEM_PREAMBLE}, _resume_message(resume_text)]
+    if job_title is None:
+        return messages
+    messages.append(_position_message(job_title))
+
+    # Each question is the assistant's answer to one of the question tasks
+    for i, question in enumerate(_as_list(questions)):
+        messages.append({"role": "user", "content": FIRST_QUESTION_TASK if i == 0 else NEXT_QUESTION_TASK})
+        messages.append({"role": "assistant", "content": question})
+
+    answers = _as_list(answers)
+    for i, answer in enumerate(answers):
+        label = "The candidate's answer" if len(answers) == 1 else f"The candidate's answer to question {i + 1}"
+        messages.append({"role": "user", "content": f'{label}:\n"{answer}"'})
+    return messages
+
+# The full message list of one call: the conversation plus this call's task
+def _with_task(messages: list[dict], task: str) -> list[dict]:
+    return messages + [{"role": "user", "content": task}]
 
 
 # ---------------------- AI Utilities ----------------------
 
-# This function tries to guess the job title based on the resume
-def guess_job_title(resume_text: str) -> str:
-    # Create a prompt (instructions for the AI)
-    prompt = f"""
+# Task that asks for the most likely job title (sent before the position is known)
+JOB_TITLE_TASK = """
 You are a professional career analyst.
-
-Given the following resume, guess the most likely job title this candidate is applying for.
+Given the resume above, guess the most likely job title this candidate is applying for.
 Be specific but realistic. Return only the job title.
+""".strip()
+
+# The messages that ask for the job title
+def _job_title_messages(resume_text: str) -> list[dict]:
+    return _with_task(conversation(resume_text), JOB_TITLE_TASK)
+
+# The job title found locally in the resume (services/job_titles.py), or
+# None when the local guess isn't sure enough and the AI should be asked
+def _local_job_title(resume_text: str):
+    if not config.JOB_TITLE_LOCAL_ENABLED:
+        return None
+    with span("classify_job_title"):
+        result = classify(resume_text)
+    record_outcome(result.confident)
+    return result.title if result.confident else None
+
+# The job title if it is known without asking the AI, plus the cache key to
+# save the AI's answer under: (key, title or None)
+def _known_job_title(resume_text: str):
+    # Most resumes name their job clearly: no AI call needed
+    local = _local_job_title(resume_text)
+    key = content_key(resume_text, version=JOB_TITLE_PROMPT_VERSION)
+    if local is not None:
+        return key, local
+    # Same resume as before? Reuse the earlier answer and skip the AI call
+    return key, job_title_cache.get(key)
 
---- Resume ---
-{resume_text}
-"""
-    # Send the prompt to ChatGPT using OpenAI API
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",  # Use this version of ChatGPT
-        messages=[{"role": "system", "content": prompt}],
-        temperature=0.5  # How creative the AI is (lower = more focused)
-    )
-    # Return the AI's answer, cleaned of extra whitespace
-    return response.choices[0].message.content.strip()
+# This function tries to guess the job title based on the resume
+def guess_job_title(resume_text: str) -> str:
+    key, known = _known_job_title(resume_text)
+    if known is not None:
+        return known
+
+    # Send the messages to ChatGPT using OpenAI API
+    with span("guess_job_title"):
+        response = upstream.call(
+            "short", client.chat.completions.create,
+            model="gpt-3.5-turbo",  # Use this version of ChatGPT
+            messages=_job_title_messages(resume_text),
+            temperature=0.5  # How creative the AI is (lower = more focused)
+        )
+    _log_usage("guess_job_title", response)
+    # Return the AI's answer on the same canonical titles as the local guess
+    # ("Sr. Software Eng" -> "Senior Software Engineer"), and remember it
+    job_title = normalize_title(response.choices[0].message.content)
+    job_title_cache.put(key, job_title)
+    return job_title
+
+# The messages that ask for the next interview question
+def _question_messages(
+    resume_text: str,
+    job_title: str,
+    previous_questions: list[str]
+) -> list[dict]:
+    task = NEXT_QUESTION_TASK if previous_questions else FIRST_QUESTION_TASK
+    return _with_task(conversation(resume_text, job_title, previous_questions), task)
 
 # This function asks a realistic interview question using the resume and job title
+@timed("ask_interview_question")
 def ask_interview_question(
     resume_text: str,
     job_title: str,
     previous_questions: list[str]
 ) -> str:
-    # Create a prompt for the AI to generate one job-specific question
-    prompt = f"""
-You are a professional recruiter conducting a mock interview for the position of {job_title}.
-
-Use the candidate's resume to ask only one specific, realistic, and job-relevant interview question.
-
-Avoid repeating these previous questions:
-{chr(10).join(previous_questions)}
-
---- Resume ---
-{resume_text}
-"""
     # Ask ChatGPT to generate the question
-    response = client.chat.completions.create(
+    response = upstream.call(
+        "short", client.chat.completions.create,
         model="gpt-3.5-turbo",
-        messages=[{"role": "system", "content": prompt}],
+        messages=_question_messages(resume_text, job_title, previous_questions),
         temperature=0.7  # Slightly more creative
     )
+    _log_usage("ask_interview_question", response)
     return response.choices[0].message.content.strip()
 
-# This function gives feedback on the candidate's answer
-def get_feedback(
-    questions: str,
-    answer: str,
-    resume_text: str,
-    job_title: str
-) -> str:
-    # Create a prompt for the AI to critique the candidate’s response
-    prompt = f"""
-You are an expert interview coach.
-
-The candidate was asked these question(s):
-{questions}
-
-They answered with:
-"{answer}"
-
-Strictly analyze their response.
+# Task that asks for a batch of questions for the question pool. It has no
+# resume, so the same questions suit every candidate for the position.
+POOL_QUESTIONS_TASK = """
+You are a professional recruiter preparing mock interviews for the position of {job_title}{focus}.
+Write {count} different, specific, realistic, and job-relevant interview questions for this position, each on a different topic.
+Reply with the questions only, one per line, without numbering.
+""".strip()
+
+# Bullets or numbers the AI sometimes puts in front of a line anyway
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+# Ask the AI for `count` questions for a job title (and skill) at once
+def generate_pool_questions(job_title: str, skill: str, count: int) -> list[str]:
+    focus = f", with a focus on {skill}" if skill else ""
+    task = POOL_QUESTIONS_TASK.format(job_title=job_title, focus=focus, count=count)
+    with span("question_pool_refill"):
+        response = upstream.call(
+            "long", client.chat.completions.create,
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": task}],
+            temperature=0.9  # Varied questions
+        )
+    _log_usage("question_pool_refill", response)
+    lines = (_LIST_MARKER.sub("", line).strip() for line in response.choices[0].message.content.splitlines())
+    return [line for line in lines if len(line) >= 15]
+
+# The pools of this worker, filled with generate_pool_questions()
+question_pool = create_question_pool(generate_pool_questions)
+
+# A pooled question for this candidate, or None (pool off, a job title
+# outside the taxonomy, or nothing suitable pooled yet)
+def _pooled_question(user_id, resume_text: str, job_title: str, avoid: list[str]):
+    if not config.QUESTION_POOL_ENABLED or canonical_base(job_title) is None:
+        return None
+    skill = None
+    if config.QUESTION_POOL_BY_SKILL:
+        tags = skill_tags(resume_text, job_title, limit=1)
+        skill = tags[0] if tags else None
+    return question_pool.take(job_title, skill, user_id=user_id, avoid=avoid)
+
+# A follow-up that is a near-duplicate of an earlier question is swapped for a
+# pooled one (if there is one that isn't)
+def _unless_repeated(user_id, state: dict, followup: str) -> str:
+    if not question_pool.is_duplicate(followup, state["previous_questions"]):
+        return followup
+    pooled = _pooled_question(user_id, state["resume_text"], state["job_title"], state["previous_questions"])
+    return pooled or followup
+
+# Task that asks for feedback on the candidate's answers
+FEEDBACK_TASK = """
+You are an expert interview coach. Strictly analyze the candidate's response to the questions above.
 
 If the answer is irrelevant, empty, nonsensical, or clearly a placeholder like "1234", "asdf", or "n/a" — explicitly state this and give direct feedback on why that is unacceptable in a professional interview.
 
@@ -89,34 +294,34 @@ If the answer was valid, give constructive feedback on how to improve it further
 Focus only on the quality of their answer. Do not comment on their resume unless it directly relates to the quality of the answer.
 
 Return your feedback using clear bullet points.
-"""
+""".strip()
+
+# The messages that ask for feedback. `questions` and `answer` may be one
+# text each or the lists of questions asked and answers given, in order.
+def _feedback_messages(questions, answer, resume_text: str, job_title: str) -> list[dict]:
+    return _with_task(conversation(resume_text, job_title, questions, answer), FEEDBACK_TASK)
+
+# This function gives feedback on the candidate's answer
+@timed("get_feedback")
+def get_feedback(
+    questions: str | list[str],
+    answer: str | list[str],
+    resume_text: str,
+    job_title: str
+) -> str:
     # Ask the AI for feedback
-    response = client.chat.completions.create(
+    response = upstream.call(
+        "long", client.chat.completions.create,
         model="gpt-3.5-turbo",
-        messages=[{"role": "system", "content": prompt}],
+        messages=_feedback_messages(questions, answer, resume_text, job_title),
         temperature=0.7
     )
+    _log_usage("get_feedback", response)
     return response.choices[0].message.content.strip()
 
-# This function scores the answer from 1–10 and gives a breakdown
-def score_answer(
-    questions: str,
-    answer: str,
-    resume_text: str,
-    job_title: str
-) -> tuple[int, str]:
-    # Prompt for AI to judge and score the interview answer
-    prompt = f"""
-You are a professional recruiter evaluating a candidate's interview performance for the role of {job_title}.
-
-Here are the interview questions asked:
-{questions}
-
-Here is the candidate's full response:
-{answer}
-
-Here is their resume:
-{resume_text}
+# Task that scores the answer from 1–10 with a breakdown
+SCORE_TASK = """
+You are a professional recruiter evaluating the candidate's interview performance above.
 
 First, if the answer is empty, irrelevant, or contains placeholders like "1234", "asdf", or "n/a", assign a very low score between 1-3 and explain why.
 
@@ -129,26 +334,26 @@ Otherwise, score the response from 1 (very poor) to 10 (excellent) based on the
 5. Problem-Solving & Critical Thinking
 6. Experience & Resume Alignment
 
-Format your response like this:
+Format your response like this, giving every category its own score from 1 to 10 first:
 
 Score: X  
 Breakdown:
-- Clarity: ...
-- Professionalism: ...
-- Relevance: ...
-- Technical/Role-Specific Accuracy: ...
-- Problem-Solving & Critical Thinking: ...
-- Experience & Resume Alignment: ...
-"""
-    # Get the AI's response
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "system", "content": prompt}],
-        temperature=0.7
-    )
-
+- Clarity: X - ...
+- Professionalism: X - ...
+- Relevance: X - ...
+- Technical/Role-Specific Accuracy: X - ...
+- Problem-Solving & Critical Thinking: X - ...
+- Experience & Resume Alignment: X - ...
+""".strip()
+
+# The messages that ask for the score (same arguments as _feedback_messages)
+def _score_messages(questions, answer, resume_text: str, job_title: str) -> list[dict]:
+    return _with_task(conversation(resume_text, job_title, questions, answer), SCORE_TASK)
+
+# Split the scoring answer into the numeric score and the breakdown text
+def parse_score(text: str) -> tuple[int, str]:
     # Process the response to extract the score
-    lines = response.choices[0].message.content.strip().splitlines()
+    lines = text.strip().splitlines()
     score_line = next((l for l in lines if l.lower().startswith("score:")), "Score: 0")
     try:
         score = int(score_line.split(":")[1].strip())
@@ -157,87 +362,572 @@ Breakdown:
 
     # Get everything except the "Score:" line as the breakdown
     breakdown = "\n".join(l for l in lines if not l.lower().startswith("score:"))
+    if score == 0:
+        score = _score_from_categories(breakdown)
     return score, breakdown
 
+# This function scores the answer from 1–10 and gives a breakdown
+@timed("score_answer")
+def score_answer(
+    questions: str | list[str],
+    answer: str | list[str],
+    resume_text: str,
+    job_title: str
+) -> tuple[int, str]:
+    # Get the AI's response
+    response = upstream.call(
+        "long", client.chat.completions.create,
+        model="gpt-3.5-turbo",
+        messages=_score_messages(questions, answer, resume_text, job_title),
+        temperature=0.7
+    )
+    _log_usage("score_answer", response)
+    return parse_score(response.choices[0].message.content)
+
+
+# Names of the score categories, in the order they are shown to the user
+SCORE_CATEGORIES = [
+    "Clarity",
+    "Professionalism",
+    "Relevance",
+    "Technical/Role-Specific Accuracy",
+    "Problem-Solving & Critical Thinking",
+    "Experience & Resume Alignment",
+]
+
+# Short names of the categories, in the same order (InterviewHistory keeps
+# each one in its score_<name> column)
+SCORE_CATEGORY_KEYS = list(InterviewHistory.CATEGORY_KEYS)
+
+# "- Problem-Solving & Critical Thinking: 7 - ..." -> ("Problem-Solving & Critical Thinking", "7")
+_CATEGORY_LINE = re.compile(r"^[\s\-*•]*(?:\d+\.\s*)?([A-Za-z][A-Za-z/&\- ]*?)\s*:\s*(\d{1,2})\b")
+
+# Read each category's number out of a breakdown ("- Clarity: 7 - ...").
+# Returns {key: score}; a category that is missing or out of range is None.
+def parse_category_scores(breakdown: str) -> dict:
+    scores = dict.fromkeys(SCORE_CATEGORY_KEYS)
+    for line in (breakdown or "").splitlines():
+        match = _CATEGORY_LINE.match(line)
+        if not match:
+            continue
+        label = re.sub(r"[\s\-]+", "_", match.group(1).strip().lower())
+        value = int(match.group(2))
+        for key in SCORE_CATEGORY_KEYS:
+            if label.startswith(key) and scores[key] is None and 1 <= value <= 10:
+                scores[key] = value
+    return scores
+
+# The rounded average of the category scores, for answers whose overall
+# "Score:" is missing (0 if no category has a score either)
+def _score_from_categories(breakdown: str) -> int:
+    values = [v for v in parse_category_scores(breakdown).values() if v is not None]
+    return round(sum(values) / len(values)) if values else 0
+
+# Task that asks for feedback AND a score as one JSON answer
+COMBINED_TASK = f"""
+You are an expert interview coach and a professional recruiter evaluating the candidate's interview performance above.
+
+If the answer is irrelevant, empty, nonsensical, or clearly a placeholder like "1234", "asdf", or "n/a" — explicitly state this in the feedback, explain why that is unacceptable in a professional interview, and assign a very low score between 1-3.
+
+Otherwise, give constructive feedback on how to improve the answer, focusing only on the quality of the answer, and score it from 1 (very poor) to 10 (excellent) based on these categories:
+{chr(10).join(f"- {c}" for c in SCORE_CATEGORIES)}
+
+Respond with a JSON object exactly like this:
+{{
+  "feedback": ["bullet point", "..."],
+  "score": 7,
+  "breakdown": {{{", ".join(f'"{c}": "X - ..."' for c in SCORE_CATEGORIES)}}}
+}}
+Every breakdown value starts with that category's own score from 1 to 10.
+""".strip()
+
+# The messages that ask for feedback and score together
+def _combined_messages(questions, answer, resume_text: str, job_title: str) -> list[dict]:
+    return _with_task(conversation(resume_text, job_title, questions, answer), COMBINED_TASK)
+
+# Split the combined JSON answer into (feedback, score, breakdown)
+def _parse_combined(content: str) -> tuple[str, int, str]:
+    # Read the JSON (fall back to showing the raw text if it is malformed)
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content, 0, ""
+
+    # Feedback as bullet points, like get_feedback returns it
+    feedback = data.get("feedback", "")
+    if isinstance(feedback, list):
+        feedback = "\n".join(f"- {item}" for item in feedback)
+
+    # Score as a whole number (0 if missing, like score_answer's fallback)
+    try:
+        score = int(data.get("score", 0))
+    except (TypeError, ValueError):
+        score = 0
+
+    # Breakdown in the same "- Category: ..." layout as score_answer
+    breakdown = data.get("breakdown") or {}
+    if isinstance(breakdown, dict):
+        breakdown = "\n".join(f"- {k}: {v}" for k, v in breakdown.items())
+    if score == 0:
+        score = _score_from_categories(str(breakdown))
+    return str(feedback).strip(), score, str(breakdown)
+
+# This function gets feedback AND a score from a single AI call
+@timed("get_feedback_and_score")
+def get_feedback_and_score(
+    questions: str | list[str],
+    answer: str | list[str],
+    resume_text: str,
+    job_title: str
+) -> tuple[str, int, str]:
+    # Ask for a JSON answer so it can be split into feedback and score reliably
+    response = upstream.call(
+        "long", client.chat.completions.create,
+        model="gpt-3.5-turbo",
+        messages=_combined_messages(questions, answer, resume_text, job_title),
+        temperature=0.7,
+        response_format={"type": "json_object"}
+    )
+    _log_usage("get_feedback_and_score", response)
+    return _parse_combined(response.choices[0].message.content.strip())
+
+# Get feedback and a score for the final answer, using the configured mode
+def evaluate_answer(
+    questions: str | list[str],
+    answer: str | list[str],
+    resume_text: str,
+    job_title: str
+) -> tuple[str, int, str]:
+    mode = config.FINAL_TURN_MODE
+    args = (questions, answer, resume_text, job_title)
+
+    # One structured call returns everything
+    if mode == "combined":
+        return get_feedback_and_score(*args)
+
+    # Both calls in flight at the same time, so the user waits for the slower one only
+    if mode == "parallel":
+        fb_future    = llm_executor.submit(get_feedback, *args)
+        score_future = llm_executor.submit(score_answer, *args)
+        score, breakdown = score_future.result()
+        return fb_future.result(), score, breakdown
+
+    # "sequential": the original behaviour, one call after the other
+    if mode == "sequential":
+        fb = get_feedback(*args)
+        score, breakdown = score_answer(*args)
+        return fb, score, breakdown
+
+    raise ValueError(f"Unknown FINAL_TURN_MODE: {mode!r}")
+
+
+# ---------------------- Streaming Variants ----------------------
+
+# Marks the end of a background stream
+_END_OF_STREAM = object()
+
+# Send the messages with streaming turned on and yield the text as it arrives
+# (the stage is timed until the last piece has arrived)
+def _stream_completion(stage: str, messages: list[dict], temperature: float):
+    with span(stage):
+        stream = upstream.call(
+            _kind(stage), client.chat.completions.create,
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True}  # Last chunk reports token usage
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            elif getattr(chunk, "usage", None) is not None:
+                _log_usage(stage, chunk)
+
+# Start consuming a stream on the shared pool right away and buffer its pieces,
+# so two streams can be in flight while only one of them is shown
+def _stream_in_background(chunks):
+    buffer = queue.Queue()
+
+    def pump():
+        try:
+            for text in chunks:
+                buffer.put(text)
+        except Exception as e:
+            buffer.put(e)
+        finally:
+            buffer.put(_END_OF_STREAM)
+
+    llm_executor.submit(pump)
+    while True:
+        item = buffer.get()
+        if item is _END_OF_STREAM:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+# Streaming version of ask_interview_question (yields pieces of the question)
+def stream_interview_question(
+    resume_text: str,
+    job_title: str,
+    previous_questions: list[str]
+):
+    yield from _stream_completion(
+        "ask_interview_question", _question_messages(resume_text, job_title, previous_questions), 0.7
+    )
+
+# Streaming version of get_feedback (yields pieces of the feedback)
+def stream_feedback(questions: str | list[str], answer: str | list[str], resume_text: str, job_title: str):
+    yield from _stream_completion(
+        "get_feedback", _feedback_messages(questions, answer, resume_text, job_title), 0.7
+    )
+
+# Streaming version of score_answer (yields pieces of the raw "Score: X ..." text;
+# pass the joined text to parse_score() once the stream ends)
+def stream_score_answer(questions: str | list[str], answer: str | list[str], resume_text: str, job_title: str):
+    yield from _stream_completion(
+        "score_answer", _score_messages(questions, answer, resume_text, job_title), 0.7
+    )
+
+
+# ---------------------- Async Variants ----------------------
+
+# These do the same as the functions above, but wait for OpenAI with
+# "await" instead of blocking a thread, so one worker process can have many
+# interviews waiting on the AI at the same time.
+
+# Send the messages with the async client and return the answer text
+async def _acomplete(stage: str, messages: list[dict], temperature: float, **options) -> str:
+    with span(stage):
+        response = await upstream.acall(
+            _kind(stage), async_client.chat.completions.create,
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=temperature,
+            **options
+        )
+    _log_usage(stage, response)
+    return response.choices[0].message.content
+
+# Async version of guess_job_title (same local guess and cache). The cache
+# is a SQLite file: reads and writes run in a thread, so a slow disk or a
+# locked database never stalls the event loop (and every other request on it)
+async def aguess_job_title(resume_text: str) -> str:
+    key, known = await asyncio.to_thread(_known_job_title, resume_text)
+    if known is not None:
+        return known
+    job_title = normalize_title(await _acomplete("guess_job_title", _job_title_messages(resume_text), 0.5))
+    await asyncio.to_thread(job_title_cache.put, key, job_title)
+    return job_title
+
+# Async version of ask_interview_question
+async def aask_interview_question(
+    resume_text: str,
+    job_title: str,
+    previous_questions: list[str]
+) -> str:
+    messages = _question_messages(resume_text, job_title, previous_questions)
+    return (await _acomplete("ask_interview_question", messages, 0.7)).strip()
+
+# Async version of get_feedback
+async def aget_feedback(questions: str | list[str], answer: str | list[str], resume_text: str, job_title: str) -> str:
+    messages = _feedback_messages(questions, answer, resume_text, job_title)
+    return (await _acomplete("get_feedback", messages, 0.7)).strip()
+
+# Async version of score_answer
+async def ascore_answer(
+    questions: str | list[str],
+    answer: str | list[str],
+    resume_text: str,
+    job_title: str
+) -> tuple[int, str]:
+    messages = _score_messages(questions, answer, resume_text, job_title)
+    return parse_score(await _acomplete("score_answer", messages, 0.7))
+
+# Async version of get_feedback_and_score
+async def aget_feedback_and_score(
+    questions: str | list[str],
+    answer: str | list[str],
+    resume_text: str,
+    job_title: str
+) -> tuple[str, int, str]:
+    messages = _combined_messages(questions, answer, resume_text, job_title)
+    content = await _acomplete(
+        "get_feedback_and_score", messages, 0.7, response_format={"type": "json_object"}
+    )
+    return _parse_combined(content.strip())
+
+# Async version of evaluate_answer (same FINAL_TURN_MODE setting)
+async def aevaluate_answer(
+    questions: str | list[str],
+    answer: str | list[str],
+    resume_text: str,
+    job_title: str
+) -> tuple[str, int, str]:
+    mode = config.FINAL_TURN_MODE
+    args = (questions, answer, resume_text, job_title)
+
+    if mode == "combined":
+        return await aget_feedback_and_score(*args)
+
+    # Both calls in flight at the same time (no threads needed)
+    if mode == "parallel":
+        fb, (score, breakdown) = await asyncio.gather(aget_feedback(*args), ascore_answer(*args))
+        return fb, score, breakdown
+
+    if mode == "sequential":
+        fb = await aget_feedback(*args)
+        score, breakdown = await ascore_answer(*args)
+        return fb, score, breakdown
+
+    raise ValueError(f"Unknown FINAL_TURN_MODE: {mode!r}")
+
 
 # ---------------------- Interview Session Handling ----------------------
 
-# Store session state in a dictionary (resets when the app restarts)
-user_data = {
-    "resume_text": "",           # The uploaded resume as plain text
-    "job_title": "",             # Job title guessed from resume
-    "previous_questions": [],    # List of already asked questions
-    "current_question": "",      # The most recent question asked
-    "main_answer": "",           # The user's main answer (before follow-up)
-    "stage": "initial"           # Stage of the interview: initial → followup → done
-}
+# Build the starting state for a brand-new interview
+def _new_session(resume_text: str, job_title: str) -> dict:
+    return {
+        "resume_text": resume_text,  # The uploaded resume as plain text
+        "job_title": job_title,      # Job title guessed from resume
+        "previous_questions": [],    # List of already asked questions
+        "current_question": "",      # The most recent question asked
+        "main_answer": "",           # The user's main answer (before follow-up)
+        "stage": "initial"           # Stage of the interview: initial → followup → done
+    }
+
+# The first question if one is ready without asking the AI, plus the cache
+# key to save the AI's question under: (key, question or None)
+def _ready_first_question(user_id, resume_text: str, job_title: str):
+    # Any earlier interview of this user is abandoned: stop its prefetch
+    prefetcher.cancel_user(user_id)
+    # A ready-made question for this job title if one is pooled, else the
+    # first question asked for this resume before
+    key = content_key(resume_text, job_title, version=QUESTION_PROMPT_VERSION)
+    return key, _pooled_question(user_id, resume_text, job_title, []) or first_question_cache.get(key)
 
 # Start a new interview by asking the first question
-def start_interview(resume_text: str, job_title: str) -> str:
+def start_interview(user_id, interview_id: str, resume_text: str, job_title: str) -> str:
     """
     Initialize a new interview session and return the first question.
     """
-    # Reset all user session data
-    user_data.update({
-        "resume_text": resume_text,
-        "job_title": job_title,
-        "previous_questions": [],
-        "current_question": "",
-        "main_answer": "",
-        "stage": "initial"
-    })
-    # Ask the first interview question
-    first_q = ask_interview_question(resume_text, job_title, [])
-    # Save that question to memory
-    user_data["previous_questions"] = [first_q]
-    user_data["current_question"]  = first_q
+    key, first_q = _ready_first_question(user_id, resume_text, job_title)
+    if first_q is None:
+        first_q = ask_interview_question(resume_text, job_title, [])
+        first_question_cache.put(key, first_q)
+    _save_first_question(user_id, interview_id, resume_text, job_title, first_q)
     return first_q
 
+# Streaming version of start_interview: yields the first question piece by piece
+def stream_start_interview(user_id, interview_id: str, resume_text: str, job_title: str):
+    key, first_q = _ready_first_question(user_id, resume_text, job_title)
+    if first_q is not None:
+        # Pooled, or seen this resume before: the whole question is ready at once
+        yield first_q
+    else:
+        parts = []
+        for text in stream_interview_question(resume_text, job_title, []):
+            parts.append(text)
+            yield text
+        first_q = "".join(parts).strip()
+        first_question_cache.put(key, first_q)
+    _save_first_question(user_id, interview_id, resume_text, job_title, first_q)
+
+# Save a new interview with its first question and start prefetching the follow-up
+def _save_first_question(user_id, interview_id, resume_text, job_title, first_q):
+    # Fresh session data for this user's interview
+    state = _new_session(resume_text, job_title)
+    # Save that question to the session store
+    state["previous_questions"] = [first_q]
+    state["current_question"]  = first_q
+    session_store.put(user_id, interview_id, state)
+    # The follow-up question doesn't depend on the answer, so start it right away
+    if config.PREFETCH_ENABLED:
+        prefetcher.start(
+            (user_id, interview_id),
+            ask_interview_question, resume_text, job_title, [first_q]
+        )
+
+# Messages shown when there is nothing left to ask
+SESSION_EXPIRED_MESSAGE = "Your interview session has expired. Refresh the page to start a new one."
+INTERVIEW_DONE_MESSAGE  = "Interview complete. Refresh the page to try another resume."
+
+# Build the final turn's response (feedback, score and breakdown as HTML)
+def _final_result(fb: str, score: int, breakdown: str, job_title: str) -> dict:
+    return {
+        "feedback": (
+            f"{fb}<br><br>"
+            f"<strong>Total Score:</strong> {score}/10<br><br>"
+            f"<strong>Score Breakdown:</strong><br>"
+            f"{breakdown.replace(chr(10), '<br><br>')}"
+        ),
+        "job_title":  job_title,
+        "score":      score,
+        "categories": parse_category_scores(breakdown)  # Saved with the score
+    }
+
 # Handle the user's response and move through interview stages
-def process_interview_message(message: str) -> dict:
+def process_interview_message(user_id, interview_id: str, message: str) -> dict:
     """
     Advance the interview based on the incoming user message.
     Returns a dict ready for jsonify(), including job_title and score.
     """
+    # Look up this user's interview (it may have expired or never existed)
+    state = session_store.get(user_id, interview_id) if interview_id else None
+    if state is None:
+        prefetcher.cancel((user_id, interview_id))
+        return {"feedback": SESSION_EXPIRED_MESSAGE}
+
     # Grab current state info
-    rt    = user_data["resume_text"]
-    jt    = user_data["job_title"]
-    stage = user_data["stage"]
+    rt    = state["resume_text"]
+    jt    = state["job_title"]
+    stage = state["stage"]
 
     # If this is the first answer to the first question
     if stage == "initial":
-        user_data["main_answer"] = message  # Save their main answer
-
-        # Ask a follow-up question (to dig deeper)
-        followup = ask_interview_question(rt, jt, user_data["previous_questions"])
-        user_data["stage"]             = "followup"  # Move to next stage
-        user_data["current_question"]  = followup
-        user_data["previous_questions"].append(followup)
+        state["main_answer"] = message  # Save their main answer
+
+        # Ask a follow-up question (to dig deeper), using the prefetched one if ready
+        followup = prefetcher.take((user_id, interview_id))
+        if followup is None:
+            followup = ask_interview_question(rt, jt, state["previous_questions"])
+        followup = _unless_repeated(user_id, state, followup)
+        state["stage"]             = "followup"  # Move to next stage
+        state["current_question"]  = followup
+        state["previous_questions"].append(followup)
+        session_store.put(user_id, interview_id, state)
         return {"feedback": f"<strong>Follow‑up Question:</strong><br>{followup}"}
 
     # If we're now handling the follow-up response
     elif stage == "followup":
-        # Combine the two answers into one
-        full_ans  = f"{user_data['main_answer']}\n\nFollow‑up Answer:\n{message}"
-        # Combine all asked questions
-        combo_q   = "\n\n".join(user_data["previous_questions"])
+        # Both answers, in the order the questions were asked
+        answers = [state["main_answer"], message]
         # Get feedback and score from AI
-        fb        = get_feedback(combo_q, full_ans, rt, jt)
-        score, breakdown = score_answer(combo_q, full_ans, rt, jt)
-        user_data["stage"] = "done"  # Mark interview complete
+        fb, score, breakdown = evaluate_answer(state["previous_questions"], answers, rt, jt)
+        state["stage"] = "done"  # Mark interview complete
+        session_store.put(user_id, interview_id, state)
 
         # Return feedback and score to front-end
-        return {
-            "feedback": (
-                f"{fb}<br><br>"
-                f"<strong>Total Score:</strong> {score}/10<br><br>"
-                f"<strong>Score Breakdown:</strong><br>"
-                f"{breakdown.replace(chr(10), '<br><br>')}"
-            ),
-            "job_title": jt,
-            "score":     score
-        }
+        return _final_result(fb, score, breakdown, jt)
 
     # If the interview is already done
     else:
-        return {"feedback": "Interview complete. Refresh the page to try another resume."}
+        return {"feedback": INTERVIEW_DONE_MESSAGE}
+
+# Streaming version of process_interview_message.
+# Yields ("token", {"section": ..., "text": ...}) while the AI is writing, and
+# finally ("done", result) where result has the same shape as the JSON version.
+def stream_interview_message(user_id, interview_id: str, message: str):
+    # Look up this user's interview (it may have expired or never existed)
+    state = session_store.get(user_id, interview_id) if interview_id else None
+    if state is None:
+        prefetcher.cancel((user_id, interview_id))
+        yield "done", {"feedback": SESSION_EXPIRED_MESSAGE}
+        return
+
+    rt    = state["resume_text"]
+    jt    = state["job_title"]
+    stage = state["stage"]
+
+    # First answer: send the follow-up question (prefetched if possible)
+    if stage == "initial":
+        state["main_answer"] = message
+        followup = prefetcher.take((user_id, interview_id))
+        if followup is None:
+            # (Shown as it is written, so it can't be swapped like a prefetched one)
+            parts = []
+            for text in stream_interview_question(rt, jt, state["previous_questions"]):
+                parts.append(text)
+                yield "token", {"section": "question", "text": text}
+            followup = "".join(parts).strip()
+        else:
+            followup = _unless_repeated(user_id, state, followup)
+            yield "token", {"section": "question", "text": followup}
+        state["stage"]             = "followup"
+        state["current_question"]  = followup
+        state["previous_questions"].append(followup)
+        session_store.put(user_id, interview_id, state)
+        yield "done", {"feedback": f"<strong>Follow‑up Question:</strong><br>{followup}"}
+
+    # Follow-up answer: stream the feedback, then the score
+    elif stage == "followup":
+        answers   = [state["main_answer"], message]
+        args      = (state["previous_questions"], answers, rt, jt)
+
+        # Unless configured to go one after the other, the score is generated
+        # in the background while the feedback is being shown
+        score_stream = stream_score_answer(*args)
+        if config.FINAL_TURN_MODE != "sequential":
+            score_stream = _stream_in_background(score_stream)
+
+        fb_parts = []
+        for text in stream_feedback(*args):
+            fb_parts.append(text)
+            yield "token", {"section": "feedback", "text": text}
+
+        score_parts = []
+        for text in score_stream:
+            score_parts.append(text)
+            yield "token", {"section": "score", "text": text}
+
+        score, breakdown = parse_score("".join(score_parts))
+        state["stage"] = "done"
+        session_store.put(user_id, interview_id, state)
+        yield "done", _final_result("".join(fb_parts).strip(), score, breakdown, jt)
+
+    # Interview already finished
+    else:
+        yield "done", {"feedback": INTERVIEW_DONE_MESSAGE}
+
+
+# ---------------------- Async Interview Session Handling ----------------------
+
+# Async version of start_interview. The caches, the question pool and the
+# session store may touch SQLite files, so they run in a thread (like the
+# database work in asgi.py); only the wait for OpenAI happens on the loop.
+async def astart_interview(user_id, interview_id: str, resume_text: str, job_title: str) -> str:
+    key, first_q = await asyncio.to_thread(_ready_first_question, user_id, resume_text, job_title)
+    if first_q is None:
+        first_q = await aask_interview_question(resume_text, job_title, [])
+        await asyncio.to_thread(first_question_cache.put, key, first_q)
+    await asyncio.to_thread(_save_first_question, user_id, interview_id, resume_text, job_title, first_q)
+    return first_q
+
+# Async version of process_interview_message (same stages, same results)
+async def aprocess_interview_message(user_id, interview_id: str, message: str) -> dict:
+    # Look up this user's interview (it may have expired or never existed).
+    # The session store can be a SQLite file: read and write it in a thread.
+    state = await asyncio.to_thread(session_store.get, user_id, interview_id) if interview_id else None
+    if state is None:
+        prefetcher.cancel((user_id, interview_id))
+        return {"feedback": SESSION_EXPIRED_MESSAGE}
+
+    rt    = state["resume_text"]
+    jt    = state["job_title"]
+    stage = state["stage"]
+
+    # First answer: send the follow-up question (prefetched if possible)
+    if stage == "initial":
+        state["main_answer"] = message
+        followup = await prefetcher.atake((user_id, interview_id))
+        if followup is None:
+            followup = await aask_interview_question(rt, jt, state["previous_questions"])
+        followup = await asyncio.to_thread(_unless_repeated, user_id, state, followup)
+        state["stage"]             = "followup"
+        state["current_question"]  = followup
+        state["previous_questions"].append(followup)
+        await asyncio.to_thread(session_store.put, user_id, interview_id, state)
+        return {"feedback": f"<strong>Follow‑up Question:</strong><br>{followup}"}
+
+    # Follow-up answer: feedback and score
+    elif stage == "followup":
+        answers   = [state["main_answer"], message]
+        fb, score, breakdown = await aevaluate_answer(state["previous_questions"], answers, rt, jt)
+        state["stage"] = "done"
+        await asyncio.to_thread(session_store.put, user_id, interview_id, state)
+        return _final_result(fb, score, breakdown, jt)
+
+    # Interview already finished
+    else:
+        return {"feedback": INTERVIEW_DONE_MESSAGE}
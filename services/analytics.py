@@ -0,0 +1,310 @@
+# services/analytics.py
+
+# Score analytics for Career Home: trends, percentiles and moving averages
+# of the overall score and of each rubric category (clarity,
+# professionalism, ...), per user and per job title.
+#
+# Rows are read from the database straight into NumPy arrays (one column of
+# numbers per score, a chunk of rows at a time) and every statistic is
+# computed on whole arrays at once, so it stays fast with millions of saved
+# interviews. Scores that are missing (NULL) are NaN and are left out.
+#
+# The per-job-title numbers cover every user, so they are computed at most
+# once every ANALYTICS_CACHE_SECONDS per worker, in the background: requests
+# get the previous numbers meanwhile instead of waiting for the scan.
+
+# Import built-in modules
+import logging    # To report a failed background refresh
+import threading  # Lock for the job-title cache
+import time       # Age of the job-title cache
+import warnings   # To hide NumPy's warning about all-empty columns
+from concurrent.futures import ThreadPoolExecutor
+
+# Import Flask's current_app, to give the background refresh an app context
+from flask import current_app
+
+# Import NumPy for the array maths
+import numpy as np
+
+# Import app settings (window, cache time, chunk size)
+import config
+
+# Import the database models
+from models.user import db, InterviewHistory
+
+logger = logging.getLogger(__name__)
+
+
+# The scores that are analysed: the overall score and each rubric category
+FIELDS = ["score"] + list(InterviewHistory.CATEGORY_KEYS)
+_COLUMNS = [InterviewHistory.score] + [
+    getattr(InterviewHistory, f"score_{key}") for key in InterviewHistory.CATEGORY_KEYS
+]
+
+# Percentiles reported for every score
+PERCENTILES = (25, 50, 75, 90)
+
+
+# ---------------------- Loading ----------------------
+
+# Run a query whose first columns are `labels` and whose last columns are
+# the scores in FIELDS order. Returns (labels as lists, scores as an
+# n x len(FIELDS) float32 array with NaN for NULL), read chunk by chunk.
+#
+# The rows are read with the database driver's own cursor: turning a million
+# rows into SQLAlchemy Row objects costs more than all the maths afterwards.
+# (So values come back as the driver gives them, e.g. dates as text on SQLite.)
+def _load(query, label_count: int):
+    chunk = config.ANALYTICS_CHUNK_ROWS
+    labels = [[] for _ in range(label_count)]
+    parts = []
+    conn = db.session.connection()
+    compiled = query.compile(conn)
+    params = compiled.construct_params()
+    if conn.dialect.positional:
+        params = [params[name] for name in compiled.positiontup]
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(str(compiled), params)
+        while rows := cursor.fetchmany(chunk):
+            # One object array for the chunk, then the score columns as numbers
+            # (NULL -> NaN)
+            table = np.array(rows, dtype=object)
+            for i in range(label_count):
+                labels[i].extend(table[:, i])
+            parts.append(table[:, label_count:].astype(np.float32))
+    finally:
+        cursor.close()
+    if not parts:
+        return labels, np.empty((0, len(FIELDS)), dtype=np.float32)
+    return labels, np.concatenate(parts)
+
+# Number every distinct label (in order of first appearance): returns
+# (names, one code per row)
+def _codes(labels: list):
+    names = list(dict.fromkeys(labels))
+    index = {name: i for i, name in enumerate(names)}
+    return names, np.fromiter(map(index.__getitem__, labels), dtype=np.int64, count=len(labels))
+
+
+# ---------------------- Statistics ----------------------
+
+# Turn NumPy numbers into JSON-friendly ones (NaN -> None, 2 decimals)
+def _clean(values):
+    return [None if np.isnan(v) else round(float(v), 2) for v in np.atleast_1d(values)]
+
+# Mean, count and percentiles of every column (NaN ignored)
+def summarize(scores: np.ndarray) -> dict:
+    counts = np.count_nonzero(~np.isnan(scores), axis=0)
+    # A column with no scores at all is fine: its numbers are simply empty
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        means = np.nanmean(scores, axis=0) if len(scores) else np.full(len(FIELDS), np.nan)
+        pcts = (
+            np.nanpercentile(scores, PERCENTILES, axis=0) if len(scores)
+            else np.full((len(PERCENTILES), len(FIELDS)), np.nan)
+        )
+    summary = {}
+    for j, field in enumerate(FIELDS):
+        entry = {"count": int(counts[j]), "mean": _clean(means[j])[0]}
+        for i, p in enumerate(PERCENTILES):
+            entry[f"p{p}"] = _clean(pcts[i, j])[0]
+        summary[field] = entry
+    return summary
+
+# Moving average over the last `window` scores of every column (NaN ignored):
+# running sums, so it costs the same for any window size
+def moving_average(scores: np.ndarray, window: int) -> np.ndarray:
+    valid = ~np.isnan(scores)
+    zero_row = np.zeros((1, scores.shape[1]))
+    sums = np.concatenate([zero_row, np.cumsum(np.where(valid, scores, 0), axis=0)])
+    counts = np.concatenate([zero_row, np.cumsum(valid, axis=0)])
+    ends = np.arange(1, len(scores) + 1)
+    starts = np.maximum(ends - window, 0)
+    total = sums[ends] - sums[starts]
+    seen = counts[ends] - counts[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(seen > 0, total / seen, np.nan)
+
+# How much each score changes per interview (least-squares slope; NaN when
+# there are fewer than two scores)
+def trend(scores: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(scores)
+    x = np.arange(len(scores), dtype=np.float64)[:, None]
+    n = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(valid, x, 0).sum(axis=0) / n
+        y_mean = np.where(valid, scores, 0).sum(axis=0) / n
+        dx = np.where(valid, x - x_mean, 0)
+        dy = np.where(valid, scores - y_mean, 0)
+        slope = (dx * dy).sum(axis=0) / (dx * dx).sum(axis=0)
+    return np.where(n >= 2, slope, np.nan)
+
+# Count, mean and percentiles of every column per group (`codes` numbers the
+# group of each row): one sort per column instead of a loop over groups.
+# "sorted_values" keeps each column's values sorted within their group
+# (values, group starts, group sizes) for ranking a score later.
+def group_summaries(codes: np.ndarray, scores: np.ndarray, group_count: int) -> dict:
+    result = {"count": np.bincount(codes, minlength=group_count)}
+    sorted_columns = []
+    for j, field in enumerate(FIELDS):
+        column = scores[:, j]
+        valid = ~np.isnan(column)
+        group, values = codes[valid], column[valid]
+        counts = np.bincount(group, minlength=group_count)
+        sums = np.bincount(group, weights=values, minlength=group_count)
+        # Sort by group, then by value: each group's values are one sorted slice
+        order = np.lexsort((values, group))
+        ordered = values[order]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            entry = {"mean": np.where(counts > 0, sums / counts, np.nan)}
+        for p in PERCENTILES:
+            index = starts + np.floor(p / 100 * np.maximum(counts - 1, 0)).astype(np.int64)
+            picked = ordered[np.minimum(index, max(len(ordered) - 1, 0))] if len(ordered) else np.zeros(group_count)
+            entry[f"p{p}"] = np.where(counts > 0, picked, np.nan)
+        result[field] = entry
+        sorted_columns.append((ordered, starts, counts))
+    result["sorted_values"] = sorted_columns
+    return result
+
+
+# ---------------------- Job Titles (all users) ----------------------
+
+# One background thread recomputes the job-title numbers (a full table scan)
+_refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics")
+
+class JobTitleStats:
+    """
+    Score statistics of every job title across all users, recomputed in the
+    background once they are older than `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()          # Guards the fields below
+        self._compute_lock = threading.Lock()  # One scan at a time
+        self._computed_at = None
+        self._data = None
+        self._refreshing = False
+
+    # The numbers. Old ones are returned straight away (a refresh is started
+    # in the background); only the very first call waits for the scan.
+    def get(self) -> dict:
+        with self._lock:
+            if self._data is not None:
+                if time.monotonic() - self._computed_at > self.ttl:
+                    self._start_refresh(current_app._get_current_object())
+                return self._data
+        # Nothing computed yet (or a warm-up is still running): wait for it
+        with self._compute_lock:
+            if self._data is None:
+                self._store(self._compute())
+            return self._data
+
+    # Compute the numbers in the background now (e.g. at startup)
+    def warm(self, app):
+        with self._lock:
+            self._start_refresh(app)
+
+    def clear(self):
+        with self._lock:
+            self._data = None
+
+    # Submit a refresh unless one is running (caller holds self._lock)
+    def _start_refresh(self, app):
+        if not self._refreshing:
+            self._refreshing = True
+            _refresher.submit(self._refresh, app)
+
+    def _refresh(self, app):
+        try:
+            with app.app_context(), self._compute_lock:
+                self._store(self._compute())
+        except Exception:
+            # Keep serving the old numbers; the next request tries again
+            logger.exception("Recomputing the job-title analytics failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _store(self, data: dict):
+        with self._lock:
+            self._data = data
+            self._computed_at = time.monotonic()
+
+    def _compute(self) -> dict:
+        (titles,), scores = _load(db.select(InterviewHistory.job_title, *_COLUMNS), 1)
+        names, codes = _codes(titles)
+        groups = group_summaries(codes, scores, len(names))
+        return {"names": names, "index": {name: i for i, name in enumerate(names)}, "groups": groups}
+
+    # Summary of one job title, plus where `user_means` would rank in it
+    # (the share of that title's interviews scoring at most the user's average)
+    def describe(self, title: str, user_means: dict = None):
+        data = self.get()
+        i = data["index"].get(title)
+        if i is None:
+            return None
+        groups = data["groups"]
+        entry = {"interviews": int(groups["count"][i])}
+        for j, field in enumerate(FIELDS):
+            stats = {"mean": _clean(groups[field]["mean"][i])[0]}
+            for p in PERCENTILES:
+                stats[f"p{p}"] = _clean(groups[field][f"p{p}"][i])[0]
+            mine = (user_means or {}).get(field)
+            ordered, starts, counts = groups["sorted_values"][j]
+            if mine is not None and counts[i] > 0:
+                values = ordered[starts[i]:starts[i] + counts[i]]
+                rank = np.searchsorted(values, mine, side="right") / counts[i]
+                stats["your_percentile"] = round(float(rank) * 100, 1)
+            entry[field] = stats
+        return entry
+
+
+# The job-title statistics for this worker
+job_title_stats = JobTitleStats(config.ANALYTICS_CACHE_SECONDS)
+
+
+# ---------------------- One User ----------------------
+
+# Everything the analytics endpoint shows for one user
+def user_analytics(user_id: int, window: int = None) -> dict:
+    window = max(1, window or config.ANALYTICS_MOVING_AVERAGE_WINDOW)
+    query = (
+        db.select(InterviewHistory.created_at, InterviewHistory.job_title, *_COLUMNS)
+        .where(InterviewHistory.user_id == user_id)
+        .order_by(InterviewHistory.created_at, InterviewHistory.id)
+    )
+    (dates, titles), scores = _load(query, 2)
+
+    # Moving averages and trend over the whole history; only the most recent
+    # points of the moving average are sent
+    averages = moving_average(scores, window)
+    trends = trend(scores)
+    keep = slice(max(0, len(scores) - config.ANALYTICS_SERIES_MAX_POINTS), None)
+    # "YYYY-MM-DD HH:MM" (whether the driver gave a datetime or text)
+    series = {"dates": [str(d)[:16] for d in dates[keep]]}
+    for j, field in enumerate(FIELDS):
+        series[field] = _clean(averages[keep, j]) if len(scores) else []
+
+    # The user's own numbers per job title, and how they compare with everyone
+    by_title = {}
+    if len(scores):
+        names, codes = _codes(titles)
+        groups = group_summaries(codes, scores, len(names))
+        for i, name in enumerate(names):
+            means = {field: _clean(groups[field]["mean"][i])[0] for field in FIELDS}
+            by_title[name] = {
+                "interviews": int(groups["count"][i]),
+                "mean": means,
+                "everyone": job_title_stats.describe(name, means),
+            }
+
+    return {
+        "interviews": len(scores),
+        "summary": summarize(scores),
+        "trend_per_interview": dict(zip(FIELDS, _clean(trends) if len(scores) else [None] * len(FIELDS))),
+        "moving_average": {"window": window, **series},
+        "job_titles": by_title,
+    }
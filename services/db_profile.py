@@ -0,0 +1,79 @@
+# services/db_profile.py
+
+# Storage settings for the main app database when it is a SQLite file.
+#
+# Out of the box SQLite uses a rollback journal (readers block the writer),
+# fails right away with "database is locked" when another connection is
+# writing, and flushes to disk on every commit. This module:
+#   - switches the database to WAL mode (readers and one writer at a time
+#     don't block each other) and relaxes fsyncs to synchronous=NORMAL
+#   - makes connections wait up to DB_BUSY_TIMEOUT_MS for a lock instead of
+#     failing straight away
+#   - sizes the connection pool
+#   - lets write transactions take the write lock up front (BEGIN IMMEDIATE),
+#     so two requests never both read and then both try to upgrade to a
+#     write, which SQLite can only resolve by failing one of them
+
+# Import built-in modules
+import sqlite3  # To recognise SQLite connections
+
+# Import SQLAlchemy's event hooks
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Import app settings (timeouts, pool sizes)
+import config
+
+# Import the database object
+from models.user import db
+
+
+# ---------------------- Engine Options ----------------------
+
+# Connection settings passed to SQLAlchemy (app.config["SQLALCHEMY_ENGINE_OPTIONS"])
+def engine_options(database_uri: str) -> dict:
+    if not database_uri.startswith("sqlite") or not config.DB_SQLITE_PROFILE:
+        return {}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "connect_args": {"timeout": config.DB_BUSY_TIMEOUT_MS / 1000},
+    }
+
+
+# ---------------------- Per-Connection Settings ----------------------
+
+# Runs once for every new SQLite connection the app's engine opens
+@event.listens_for(Engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection) or not config.DB_SQLITE_PROFILE:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS}")
+    cursor.close()
+
+# Runs whenever a transaction starts on a SQLite connection.
+# Normally nothing happens here: the sqlite3 module only opens a real
+# transaction right before the first INSERT/UPDATE/DELETE, so plain reads
+# never hold a snapshot that would later have to be upgraded to a write.
+# Transactions started by begin_write() take the write lock straight away.
+@event.listens_for(Engine, "begin")
+def _on_begin(conn):
+    if conn.dialect.name != "sqlite" or not config.DB_SQLITE_PROFILE:
+        return
+    if conn.get_execution_options().get("sqlite_begin") == "IMMEDIATE":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+# ---------------------- Write Transactions ----------------------
+
+# Finish the request's current (read) transaction and start a write
+# transaction that holds the database's write lock until the next commit.
+# Call this before changing rows that were read earlier in the request:
+# they are read again inside the lock, so concurrent updates can't be lost.
+def begin_write():
+    db.session.commit()
+    db.session.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
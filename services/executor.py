@@ -0,0 +1,18 @@
+# services/executor.py
+
+# A shared, size-limited pool of background threads for AI calls.
+# Using one bounded pool (instead of starting threads freely) means a burst
+# of users can never open an unlimited number of upstream connections.
+
+# Import the built-in thread pool
+from concurrent.futures import ThreadPoolExecutor
+
+# Import app settings
+import config
+
+
+# The pool every service submits its background AI calls to
+llm_executor = ThreadPoolExecutor(
+    max_workers=config.LLM_EXECUTOR_WORKERS,
+    thread_name_prefix="llm"
+)
@@ -0,0 +1,196 @@
+# services/history.py
+
+# Reads a user's interview history for Career Home in pieces whose size does
+# not depend on how many interviews the user has done:
+#   - history_page(): one page of the table, newest first, using "keyset"
+#     pagination (continue after the last row seen instead of OFFSET, so
+#     page 500 is as fast as page 1)
+#   - chart_series(): the progress chart, shrunk to at most a fixed number of
+#     points with the Largest-Triangle-Three-Buckets (LTTB) algorithm, which
+#     keeps the peaks and dips that make the line look right (very long
+#     histories are averaged into buckets by the database instead)
+# Both queries use the (user_id, created_at) index on interview_history.
+
+# Import built-in modules
+import base64                  # To make page cursors URL-safe
+from datetime import datetime  # To read dates back out of cursors
+
+# Import app settings (page sizes, chart size)
+import config
+
+# Import the database models
+from models.user import db, InterviewHistory, UserStats
+
+
+# Date format used for labels in the table and on the chart
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+# ---------------------- Cursors ----------------------
+
+# A cursor is the (created_at, id) of the last row on a page, so the next
+# page can start right after it. It's opaque to the browser.
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+# Turn a cursor back into (created_at, id); raises ValueError if it's invalid
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created, row_id = raw.split("|")
+        return datetime.fromisoformat(created), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+# ---------------------- Table ----------------------
+
+# Return one page of the user's interviews (newest first) and the cursor for
+# the next page (None on the last page)
+def history_page(user_id: int, limit: int = None, cursor: str = None) -> dict:
+    limit = config.HISTORY_PAGE_SIZE if limit is None else limit
+    limit = max(1, min(limit, config.HISTORY_PAGE_MAX))
+
+    query = (
+        db.session.query(
+            InterviewHistory.id,
+            InterviewHistory.created_at,
+            InterviewHistory.job_title,
+            InterviewHistory.score,
+        )
+        .filter(InterviewHistory.user_id == user_id)
+    )
+    # Only rows older than the last one already sent
+    if cursor:
+        created, row_id = decode_cursor(cursor)
+        query = query.filter(
+            db.or_(
+                InterviewHistory.created_at < created,
+                db.and_(InterviewHistory.created_at == created, InterviewHistory.id < row_id),
+            )
+        )
+    # Read one extra row to find out whether there is another page
+    rows = (
+        query.order_by(InterviewHistory.created_at.desc(), InterviewHistory.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [
+            {
+                "date": r.created_at.strftime(DATE_FORMAT),
+                "job_title": r.job_title,
+                "score": r.score,
+            }
+            for r in rows
+        ],
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+    }
+
+
+# ---------------------- Chart ----------------------
+
+# Largest-Triangle-Three-Buckets: pick `threshold` of the (x, y) points that
+# best keep the shape of the line. The first and last points are always kept;
+# every bucket in between keeps the point forming the largest triangle with
+# the previously kept point and the average of the next bucket.
+def lttb(points: list, threshold: int) -> list:
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    size = (len(points) - 2) / (threshold - 2)  # Points per bucket
+    a = 0  # Index of the last kept point
+
+    for i in range(threshold - 2):
+        # The bucket we pick a point from, and the one after it
+        start = int(i * size) + 1
+        end = int((i + 1) * size) + 1
+        next_end = min(int((i + 2) * size) + 1, len(points))
+
+        # Average point of the next bucket (the last point for the final bucket)
+        nxt = points[end:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in nxt) / len(nxt)
+        avg_y = sum(p[1] for p in nxt) / len(nxt)
+
+        # Keep the point making the biggest triangle
+        ax, ay = points[a][0], points[a][1]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (points[j][1] - ay) - (ax - points[j][0]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+# Return the chart data for a user: at most `max_points` dates and scores
+# (oldest first) plus the total number of interviews they stand for.
+# Histories up to CHART_LTTB_MAX_ROWS are read and shrunk with LTTB; longer
+# ones are averaged into equal-sized buckets inside the database, so only
+# `max_points` rows ever come back to Python.
+def chart_series(user_id: int, max_points: int = None) -> dict:
+    max_points = config.CHART_MAX_POINTS if max_points is None else max_points
+    max_points = max(3, min(max_points, config.CHART_MAX_POINTS))
+
+    stats = db.session.get(UserStats, user_id)
+    total = stats.total_interviews if stats is not None else None
+    if total is not None and total > config.CHART_LTTB_MAX_ROWS:
+        return {**_bucketed_series(user_id, max_points), "total": total}
+
+    # Only the two columns we need, straight from the index order
+    rows = (
+        db.session.query(InterviewHistory.created_at, InterviewHistory.score)
+        .filter(InterviewHistory.user_id == user_id)
+        .order_by(InterviewHistory.created_at, InterviewHistory.id)
+        .all()
+    )
+    points = [(r.created_at.timestamp(), r.score, r.created_at) for r in rows]
+    sampled = lttb(points, max_points)
+
+    return {
+        "labels": [p[2].strftime(DATE_FORMAT) for p in sampled],
+        "scores": [p[1] for p in sampled],
+        "total": len(points),
+    }
+
+# Split the history into `buckets` equal runs of interviews (in date order)
+# and return the first date and the average score of each run
+def _bucketed_series(user_id: int, buckets: int) -> dict:
+    numbered = (
+        db.session.query(
+            InterviewHistory.created_at.label("created_at"),
+            InterviewHistory.score.label("score"),
+            db.func.ntile(buckets).over(
+                order_by=(InterviewHistory.created_at, InterviewHistory.id)
+            ).label("bucket"),
+        )
+        .filter(InterviewHistory.user_id == user_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(
+            db.func.min(numbered.c.created_at).label("created_at"),
+            db.func.avg(numbered.c.score).label("score"),
+        )
+        .group_by(numbered.c.bucket)
+        .order_by(numbered.c.bucket)
+        .all()
+    )
+    return {
+        "labels": [r.created_at.strftime(DATE_FORMAT) for r in rows],
+        "scores": [round(float(r.score), 1) for r in rows],
+    }
+
+# Cheap version tag for a user's history: changes whenever an interview is saved
+def history_version(user_id: int) -> str:
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        return "0"
+    return f"{stats.total_interviews}-{stats.updated_at.timestamp():.0f}"
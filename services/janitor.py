@@ -0,0 +1,158 @@
+# services/janitor.py
+
+# Deletes temporary files once they are too old, on one background thread,
+# so requests never have to scan a folder to clean up.
+#
+#   janitor.track(path, max_age_seconds)   # O(log n): "delete this later"
+#   janitor.sweep(folder, max_age_seconds) # Startup: clean what's already there
+#   janitor.every(seconds, fn)             # Run fn() on the thread now and then
+#
+# Known files are kept in a heap ordered by when they expire, so the thread
+# only ever looks at the next file due and sleeps until then. Files that are
+# already gone when their time comes (e.g. renamed into the audio cache) are
+# simply skipped.
+
+# Import built-in modules
+import heapq      # Expiry heap (soonest first)
+import itertools  # To number periodic jobs (ties in the heap)
+import logging    # To report files that couldn't be deleted
+import os         # To delete and list files
+import threading  # The background thread and its wake-up signal
+import time       # Expiry times
+
+logger = logging.getLogger(__name__)
+
+
+class FileJanitor:
+    """
+    Background thread that deletes files when they expire.
+    The thread starts on first use.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []      # (expires_at, path), soonest first
+        self._sweeps = []    # (folder, max_age, suffix) waiting to be scanned
+        self._jobs = []      # (next_run, number, interval, fn), soonest first
+        self._job_numbers = itertools.count()
+        self._thread = None
+        self._counts = {"tracked": 0, "deleted": 0, "already_gone": 0, "errors": 0, "sweeps": 0,
+                        "jobs_run": 0, "job_errors": 0}
+
+    # Delete `path` once it is `max_age` seconds old (from now)
+    def track(self, path: str, max_age: float):
+        with self._cond:
+            heapq.heappush(self._heap, (time.time() + max_age, path))
+            self._counts["tracked"] += 1
+            self._start()
+            # Wake the thread only if this file is now the next one due
+            if self._heap[0][1] == path:
+                self._cond.notify()
+
+    # Scan `folder` once in the background: delete files (ending in `suffix`)
+    # older than `max_age`, and track the rest
+    def sweep(self, folder: str, max_age: float, suffix: str = ""):
+        with self._cond:
+            self._sweeps.append((folder, max_age, suffix))
+            self._start()
+            self._cond.notify()
+
+    # Call fn() on the janitor thread every `seconds` (first run after one
+    # interval). For periodic cleanup that shouldn't slow down any request.
+    def every(self, seconds: float, fn):
+        with self._cond:
+            heapq.heappush(self._jobs, (time.time() + seconds, next(self._job_numbers), seconds, fn))
+            self._start()
+            self._cond.notify()
+
+    # Counters for the /metrics page
+    def stats(self) -> dict:
+        with self._cond:
+            totals = dict(self._counts)
+            totals["pending"] = len(self._heap)
+        return totals
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-janitor", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # Sleep until a sweep is asked for or the next file or job is due
+                while not self._sweeps and self._next_due() > time.time():
+                    self._cond.wait(self._next_due() - time.time() if self._heap or self._jobs else None)
+                sweeps, self._sweeps = self._sweeps, []
+                due = []
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[1])
+                jobs = []
+                while self._jobs and self._jobs[0][0] <= now:
+                    jobs.append(heapq.heappop(self._jobs))
+            # Delete outside the lock, so track() never waits on the disk
+            for folder, max_age, suffix in sweeps:
+                self._scan(folder, max_age, suffix)
+            for path in due:
+                self._delete(path)
+            for job in jobs:
+                self._run_job(*job)
+
+    # When the next file or job is due (infinity if there is none)
+    def _next_due(self) -> float:
+        times = [h[0][0] for h in (self._heap, self._jobs) if h]
+        return min(times) if times else float("inf")
+
+    # Run one periodic job and schedule its next run (a failing job is logged
+    # and tried again next time)
+    def _run_job(self, _, number, interval, fn):
+        try:
+            fn()
+            name = "jobs_run"
+        except Exception:
+            logger.exception("Periodic cleanup %r failed", fn)
+            name = "job_errors"
+        with self._cond:
+            self._counts[name] += 1
+            heapq.heappush(self._jobs, (time.time() + interval, number, interval, fn))
+
+    # Startup sweep of one folder
+    def _scan(self, folder: str, max_age: float, suffix: str):
+        try:
+            entries = list(os.scandir(folder))
+        except OSError as e:
+            logger.warning("Could not scan %s for old files: %s", folder, e)
+            return
+        now = time.time()
+        for entry in entries:
+            if not entry.name.endswith(suffix):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                age = now - entry.stat().st_mtime
+            except OSError:
+                continue
+            if age >= max_age:
+                self._delete(entry.path)
+            else:
+                self.track(entry.path, max_age - age)
+        with self._cond:
+            self._counts["sweeps"] += 1
+
+    def _delete(self, path: str):
+        try:
+            os.remove(path)
+            name = "deleted"
+        except FileNotFoundError:
+            name = "already_gone"
+        except OSError as e:
+            logger.warning("Could not delete old file %s: %s", path, e)
+            name = "errors"
+        with self._cond:
+            self._counts[name] += 1
+
+
+# The janitor for this worker (uploads and unfinished speech files)
+janitor = FileJanitor()
@@ -0,0 +1,417 @@
+# services/job_titles.py
+
+# Local job-title classifier and title normalizer.
+#
+#   classify(resume_text)  -> Classification(title, score, runner_up, confident)
+#   normalize_title(text)  -> "Senior Software Engineer" for "Sr. Software Eng"
+#
+# TAXONOMY lists the canonical job titles: for each, the names a resume (or
+# the AI) uses for it ("aliases") and typical skills ("keywords"). At import
+# every alias and keyword (1 to 3 words) goes into one dictionary, so
+# classifying a resume is a single pass over its words with a dictionary
+# lookup per 1-, 2- and 3-word phrase: no AI call, well under a millisecond.
+#
+# Titles found in the resume count most (the first one named, normally the
+# headline, counts double); a skill counts less the more titles share it. The result
+# is "confident" when the best title scores at least JOB_TITLE_MIN_SCORE and
+# JOB_TITLE_MIN_MARGIN times the runner-up, and the resume mentions at least
+# one of its skills (a lone "nurse" or "tutor" in a sentence is not enough to
+# go on). Otherwise guess_job_title() asks
+# the AI and puts its answer through normalize_title(), so both paths give
+# the same names and the interview history doesn't split one job into many.
+
+# Import built-in modules
+import re         # To split text into words
+import threading  # Lock for the counters
+from collections import namedtuple
+
+# App settings (thresholds)
+import config
+
+
+# ---------------------- Taxonomy ----------------------
+
+# Canonical title -> (aliases, keywords). Aliases and keywords are written in
+# lower case, after the abbreviations in ABBREVIATIONS are expanded.
+TAXONOMY = {
+    "Software Engineer": (
+        ["software engineer", "software developer", "programmer", "application developer",
+         "software development engineer"],
+        ["java", "c++", "c#", "object oriented", "design patterns", "unit testing", "algorithms",
+         "code review", "git", "agile"],
+    ),
+    "Backend Engineer": (
+        ["backend engineer", "back end engineer", "backend developer", "back end developer",
+         "server side developer", "api developer"],
+        ["flask", "django", "fastapi", "spring boot", "node.js", "rest api", "microservices",
+         "postgresql", "redis", "kafka", "grpc", "sqlalchemy"],
+    ),
+    "Frontend Engineer": (
+        ["frontend engineer", "front end engineer", "frontend developer", "front end developer",
+         "ui developer", "ui engineer"],
+        ["react", "vue", "angular", "typescript", "javascript", "css", "html", "redux", "webpack",
+         "next.js", "tailwind", "accessibility"],
+    ),
+    "Full Stack Engineer": (
+        ["full stack engineer", "fullstack engineer", "full stack developer", "fullstack developer",
+         "web developer"],
+        ["react", "node.js", "express", "mongodb", "javascript", "typescript", "rest api", "django"],
+    ),
+    "Mobile Engineer": (
+        ["mobile engineer", "mobile developer", "ios developer", "ios engineer", "android developer",
+         "android engineer", "mobile app developer"],
+        ["swift", "swiftui", "kotlin", "objective c", "react native", "flutter", "xcode",
+         "android studio", "jetpack compose"],
+    ),
+    "DevOps Engineer": (
+        ["devops engineer", "site reliability engineer", "sre", "platform engineer",
+         "infrastructure engineer", "cloud engineer"],
+        ["kubernetes", "docker", "terraform", "ansible", "ci cd", "jenkins", "aws", "gcp", "azure",
+         "prometheus", "grafana", "helm", "on call", "linux"],
+    ),
+    "Data Scientist": (
+        ["data scientist"],
+        ["machine learning", "statistics", "pandas", "scikit learn", "regression", "a b testing",
+         "hypothesis testing", "jupyter", "rstudio", "feature engineering", "xgboost"],
+    ),
+    "Data Engineer": (
+        ["data engineer", "etl developer", "big data engineer"],
+        ["spark", "airflow", "etl", "data pipelines", "snowflake", "bigquery", "redshift", "dbt",
+         "hadoop", "kafka", "data warehouse"],
+    ),
+    "Data Analyst": (
+        ["data analyst", "business intelligence analyst", "bi analyst", "reporting analyst"],
+        ["sql", "excel", "tableau", "power bi", "dashboards", "looker", "reporting", "pivot tables",
+         "data visualization"],
+    ),
+    "Machine Learning Engineer": (
+        ["machine learning engineer", "ai engineer", "deep learning engineer", "mlops engineer"],
+        ["pytorch", "tensorflow", "deep learning", "model training", "model deployment", "nlp",
+         "computer vision", "llm", "transformers", "mlops"],
+    ),
+    "QA Engineer": (
+        ["qa engineer", "quality assurance engineer", "test engineer", "software tester",
+         "automation tester", "sdet", "qa analyst"],
+        ["selenium", "cypress", "test automation", "test cases", "regression testing", "jira",
+         "manual testing", "playwright", "test plans"],
+    ),
+    "Security Engineer": (
+        ["security engineer", "security analyst", "cybersecurity analyst", "penetration tester",
+         "information security analyst"],
+        ["siem", "penetration testing", "vulnerability", "incident response", "owasp", "firewall",
+         "splunk", "threat modeling", "iso 27001", "soc"],
+    ),
+    "Engineering Manager": (
+        ["engineering manager", "software engineering manager", "head of engineering",
+         "director of engineering", "vp of engineering"],
+        ["managed a team", "hiring", "mentoring", "performance reviews", "roadmap", "stakeholders",
+         "one on ones", "team of"],
+    ),
+    "Product Manager": (
+        ["product manager", "product owner", "technical product manager"],
+        ["roadmap", "user stories", "product strategy", "stakeholders", "prioritization",
+         "backlog", "go to market", "user research", "okrs", "product discovery"],
+    ),
+    "Project Manager": (
+        ["project manager", "program manager", "project coordinator", "scrum master",
+         "delivery manager"],
+        ["pmp", "gantt", "budget", "risk management", "scrum", "stakeholders", "ms project",
+         "prince2", "milestones", "resource planning"],
+    ),
+    "UX Designer": (
+        ["ux designer", "ui designer", "ui ux designer", "ux ui designer", "product designer",
+         "interaction designer", "ux researcher"],
+        ["figma", "sketch", "wireframes", "prototyping", "user research", "usability testing",
+         "design systems", "adobe xd", "personas"],
+    ),
+    "Graphic Designer": (
+        ["graphic designer", "visual designer", "art director"],
+        ["photoshop", "illustrator", "indesign", "branding", "typography", "adobe creative suite",
+         "logo design", "print design"],
+    ),
+    "Business Analyst": (
+        ["business analyst", "business systems analyst", "systems analyst"],
+        ["requirements gathering", "process mapping", "bpmn", "use cases", "stakeholders", "sql",
+         "gap analysis", "user acceptance testing", "visio"],
+    ),
+    "Financial Analyst": (
+        ["financial analyst", "finance analyst", "investment analyst", "fp a analyst"],
+        ["financial modeling", "forecasting", "budgeting", "variance analysis", "excel", "valuation",
+         "dcf", "p l", "financial statements"],
+    ),
+    "Accountant": (
+        ["accountant", "staff accountant", "bookkeeper", "auditor"],
+        ["gaap", "ifrs", "reconciliation", "accounts payable", "accounts receivable", "general ledger",
+         "quickbooks", "month end close", "cpa", "audit", "tax"],
+    ),
+    "Marketing Manager": (
+        ["marketing manager", "digital marketing manager", "marketing specialist",
+         "growth marketer", "brand manager", "content marketing manager"],
+        ["seo", "sem", "google analytics", "campaigns", "social media", "email marketing",
+         "hubspot", "content strategy", "brand awareness", "ppc"],
+    ),
+    "Sales Representative": (
+        ["sales representative", "account executive", "sales manager", "business development representative",
+         "sales development representative", "account manager", "sales associate"],
+        ["quota", "crm", "salesforce", "pipeline", "cold calling", "lead generation", "closing deals",
+         "revenue", "prospecting", "b2b"],
+    ),
+    "Customer Support Specialist": (
+        ["customer support specialist", "customer service representative", "customer success manager",
+         "support specialist", "help desk technician", "customer support representative"],
+        ["zendesk", "tickets", "customer satisfaction", "csat", "troubleshooting", "call center",
+         "customer inquiries", "freshdesk"],
+    ),
+    "Human Resources Specialist": (
+        ["human resources specialist", "hr specialist", "hr generalist", "recruiter",
+         "talent acquisition specialist", "hr manager", "human resources manager"],
+        ["onboarding", "recruiting", "employee relations", "payroll", "hris", "benefits administration",
+         "workday", "sourcing candidates", "performance management"],
+    ),
+    "Teacher": (
+        ["teacher", "instructor", "lecturer", "tutor", "teaching assistant", "educator"],
+        ["lesson planning", "curriculum", "classroom management", "students", "grading",
+         "differentiated instruction", "teaching certificate"],
+    ),
+    "Registered Nurse": (
+        ["registered nurse", "nurse", "rn", "nurse practitioner", "licensed practical nurse"],
+        ["patient care", "bls", "acls", "medication administration", "emr", "epic", "triage",
+         "icu", "vital signs", "clinical"],
+    ),
+    "Mechanical Engineer": (
+        ["mechanical engineer", "design engineer", "manufacturing engineer"],
+        ["solidworks", "autocad", "cad", "fea", "ansys", "gd t", "prototyping", "catia",
+         "thermodynamics", "manufacturing"],
+    ),
+    "Electrical Engineer": (
+        ["electrical engineer", "electronics engineer", "hardware engineer", "embedded engineer",
+         "embedded software engineer"],
+        ["pcb", "circuit design", "altium", "matlab", "embedded c", "fpga", "vhdl", "verilog",
+         "microcontrollers", "oscilloscope"],
+    ),
+    "Civil Engineer": (
+        ["civil engineer", "structural engineer", "site engineer"],
+        ["autocad", "civil 3d", "structural analysis", "construction", "surveying", "revit",
+         "reinforced concrete", "site supervision"],
+    ),
+    "Operations Manager": (
+        ["operations manager", "operations coordinator", "supply chain manager", "logistics manager",
+         "warehouse manager"],
+        ["supply chain", "logistics", "inventory", "lean", "six sigma", "process improvement",
+         "vendor management", "kpis", "erp", "procurement"],
+    ),
+}
+
+# Written-out forms of common abbreviations (applied word by word)
+ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "jnr": "junior",
+    "eng": "engineer", "engr": "engineer", "dev": "developer", "devs": "developers",
+    "mgr": "manager", "mngr": "manager", "swe": "software engineer",
+    "ml": "machine learning",
+}
+
+# Seniority words kept in front of the canonical title
+LEVELS = {
+    "intern": "Intern", "junior": "Junior", "entry": "Junior", "associate": "Associate",
+    "mid": "Mid-Level", "senior": "Senior", "lead": "Lead", "staff": "Staff", "principal": "Principal",
+}
+
+# How much one distinct title or skill found in the resume counts
+ALIAS_WEIGHT = 5.0
+KEYWORD_WEIGHT = 1.0
+
+# Longest phrase in the index, in words
+MAX_PHRASE_WORDS = 3
+
+
+# ---------------------- Index ----------------------
+
+# The canonical titles, in a fixed order (the classifier numbers them)
+TITLES = list(TAXONOMY)
+
+# A word: letters/digits, with + # . inside (c++, c#, node.js). Anything else
+# separates words, so "ci/cd" and "front-end" are two words each.
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*(?<!\.)")
+
+# Lower-case words with abbreviations written out
+def _words(text: str) -> list[str]:
+    words = _WORD.findall(text.lower())
+    if ABBREVIATIONS.keys().isdisjoint(words):
+        return words
+    # Joining and splitting again turns "swe" -> "software engineer" into two words
+    return " ".join([ABBREVIATIONS.get(word, word) for word in words]).split()
+
+# Phrase -> list of (title number, weight, is an alias)
+def _build_index() -> dict:
+    keyword_titles = {}
+    for i, (_, keywords) in enumerate(TAXONOMY.values()):
+        for keyword in keywords:
+            keyword_titles.setdefault(" ".join(_words(keyword)), set()).add(i)
+
+    index = {}
+    for i, (aliases, _) in enumerate(TAXONOMY.values()):
+        for alias in aliases:
+            index.setdefault(" ".join(_words(alias)), []).append((i, ALIAS_WEIGHT, True))
+    # A skill shared by several titles tells less about each of them
+    for keyword, titles in keyword_titles.items():
+        for i in titles:
+            index.setdefault(keyword, []).append((i, KEYWORD_WEIGHT / len(titles), False))
+    return index
+
+_INDEX = _build_index()
+
+# Every phrase in the index that is the start of a longer one ("software"
+# for "software engineer"): words that are neither are skipped straight away
+_PREFIXES = {
+    " ".join(words[:n])
+    for words in (phrase.split(" ") for phrase in _INDEX)
+    for n in range(1, len(words))
+}
+
+
+# ---------------------- Classifier ----------------------
+
+# The classifier's answer: the best title (with seniority, if the resume gives
+# one), its score, the runner-up's score, and whether it is sure enough
+Classification = namedtuple("Classification", ["title", "score", "runner_up", "confident"])
+
+# Counters for the /metrics page
+_lock = threading.Lock()
+_counts = {"local": 0, "fallback": 0, "normalized": 0, "unmatched": 0}
+
+def _count(name: str):
+    with _lock:
+        _counts[name] += 1
+
+def stats() -> dict:
+    with _lock:
+        return dict(_counts)
+
+# Record whether guess_job_title() used the local answer or asked the AI
+def record_outcome(confident: bool):
+    _count("local" if confident else "fallback")
+
+
+# Score every canonical title for a resume
+def classify(resume_text: str) -> Classification:
+    words = _words(resume_text)
+    scores = [0.0] * len(TITLES)
+    skill_scores = [0.0] * len(TITLES)  # The part of each score from skills
+    seen = set()
+    # Where each title's name was first found (for the headline and the seniority word)
+    first_alias = {}
+
+    for start in range(len(words)):
+        phrase = words[start]
+        # Most words are in no phrase at all
+        if phrase not in _INDEX and phrase not in _PREFIXES:
+            continue
+        for end in range(start + 1, min(start + MAX_PHRASE_WORDS, len(words)) + 1):
+            if end > start + 1:
+                phrase += " " + words[end - 1]
+            hits = _INDEX.get(phrase)
+            if hits is not None:
+                for i, weight, is_alias in hits:
+                    # Each phrase counts once per title
+                    if (phrase, i) in seen:
+                        continue
+                    seen.add((phrase, i))
+                    scores[i] += weight
+                    if not is_alias:
+                        skill_scores[i] += weight
+                    elif i not in first_alias:
+                        first_alias[i] = start
+            # No longer phrase starts like this one
+            if phrase not in _PREFIXES:
+                break
+
+    # The first title the resume names is normally its headline: count it twice
+    if first_alias:
+        headline = min(first_alias.values())
+        for i, start in first_alias.items():
+            if start == headline:
+                scores[i] += ALIAS_WEIGHT
+
+    ranked = sorted(range(len(TITLES)), key=scores.__getitem__, reverse=True)
+    best, second = ranked[0], ranked[1]
+    top, runner_up = scores[best], scores[second]
+    if top == 0:
+        return Classification(None, 0.0, 0.0, False)
+
+    title = TITLES[best]
+    # "Senior Backend Engineer": keep the seniority word right before the title
+    start = first_alias.get(best)
+    if start is not None and start > 0 and words[start - 1] in LEVELS:
+        title = f"{LEVELS[words[start - 1]]} {title}"
+
+    confident = (top >= config.JOB_TITLE_MIN_SCORE and top >= config.JOB_TITLE_MIN_MARGIN * runner_up
+                 and skill_scores[best] > 0)
+    return Classification(title, round(top, 2), round(runner_up, 2), confident)
+
+
+# "Senior Backend Engineer" -> "Backend Engineer"; None if not a canonical title
+def canonical_base(title: str):
+    words = (title or "").split(" ")
+    if len(words) > 1 and words[0].lower() in LEVELS:
+        words = words[1:]
+    base = " ".join(words)
+    return base if base in TAXONOMY else None
+
+# The skills of a (canonical) title that the resume mentions, most telling
+# first (skills fewer titles share come first)
+def skill_tags(resume_text: str, title: str, limit: int = 3) -> list[str]:
+    base = canonical_base(title)
+    if base is None:
+        return []
+    i = TITLES.index(base)
+    text = " " + " ".join(_words(resume_text)) + " "
+    found = []
+    for keyword in TAXONOMY[base][1]:
+        phrase = " ".join(_words(keyword))
+        if f" {phrase} " in text:
+            weight = next(w for t, w, is_alias in _INDEX[phrase] if t == i and not is_alias)
+            found.append((-weight, keyword))
+    return [keyword for _, keyword in sorted(found)[:limit]]
+
+
+# ---------------------- Normalizer ----------------------
+
+# Put a free-form job title (e.g. the AI's answer) onto the canonical names:
+# "Sr. Software Eng" -> "Senior Software Engineer". Titles that aren't in the
+# taxonomy are kept, only tidied up.
+def normalize_title(text: str) -> str:
+    cleaned = " ".join(text.strip().strip("\"'*.").split())
+    if not cleaned:
+        return cleaned
+    # The AI sometimes answers "Job title: X"
+    cleaned = re.sub(r"^(job\s*title|title|position)\s*:\s*", "", cleaned, flags=re.I)
+    words = _words(cleaned)
+
+    level = None
+    while words and words[0] in LEVELS:
+        level = LEVELS[words.pop(0)]
+    phrase = " ".join(words)
+
+    # The whole title, or failing that its longest known part ("Python Backend Developer")
+    match = None
+    for i, weight, is_alias in _INDEX.get(phrase, ()):
+        if is_alias:
+            match = i
+            break
+    if match is None:
+        for length in range(min(len(words), MAX_PHRASE_WORDS), 0, -1):
+            for start in range(len(words) - length + 1):
+                for i, weight, is_alias in _INDEX.get(" ".join(words[start:start + length]), ()):
+                    if is_alias:
+                        match = i
+                        break
+                if match is not None:
+                    break
+            if match is not None:
+                break
+
+    if match is None:
+        _count("unmatched")
+        return cleaned
+    _count("normalized")
+    return f"{level} {TITLES[match]}" if level else TITLES[match]
@@ -0,0 +1,385 @@
+# services/leaderboard.py
+
+# Cross-user leaderboards: highest score, longest streak and number of
+# interviews, overall and per job title.
+#
+#   leaderboards.top("highest_score", job_title=None, limit=100)
+#   leaderboards.rank(user_id, "interviews", job_title="Data Analyst")
+#   leaderboards.start(app)   # At startup: load the boards in the background
+#   leaderboards.catch_up()   # After saving an interview result
+#
+# Each board keeps, in this worker's memory:
+#   - every user's value (a flat array for the overall boards, a dict for
+#     the per-title ones, which only hold that title's users)
+#   - a Fenwick tree counting users per value, so "how many users are ahead
+#     of me" is a sum over about log2(highest value) cells
+#   - the top LEADERBOARD_TOP_K entries, kept sorted
+# Every value here only ever goes up (a best score, a longest streak, a
+# count), so the top list stays exact on its own: a user outside it can
+# only get in by passing the last entry.
+#
+# The database stays the source of truth. The boards are loaded once per
+# worker on a background thread (one pass over interview_history; no request
+# waits for it, reads just see empty boards until it is done) and then follow
+# new rows in id order: every saved interview is applied exactly once,
+# whichever worker saved it. The worker that saves a result catches up
+# straight away; reads catch up at most every LEADERBOARD_SYNC_SECONDS.
+
+# Import built-in modules
+import bisect     # To keep the top list sorted
+import heapq      # To pick the top entries when loading
+import itertools  # Arrival order of values (ties: who got there first)
+import logging    # To report a failed load
+import threading  # Locks for the boards, syncing and the background load
+import time       # When the boards last caught up
+from array import array  # Compact per-user values
+
+# Import Flask's current_app, to give the background load an app context
+from flask import current_app
+
+# Import app settings and the database models
+import config
+from models.user import db, User, InterviewHistory
+
+logger = logging.getLogger(__name__)
+
+
+# The boards: overall ones for all three, per job title for the first two
+METRICS = ("highest_score", "interviews", "longest_streak")
+TITLE_METRICS = ("highest_score", "interviews")
+
+
+# ---------------------- One Board ----------------------
+
+class Leaderboard:
+    """
+    Rank and top list of one non-decreasing number per user.
+    Users with no value (or 0) aren't on the board.
+    """
+
+    def __init__(self, top_k: int, dense: bool = False):
+        self.top_k = top_k
+        # user id -> value: an array indexed by id for boards with every user
+        self._values = array("i") if dense else {}
+        self._dense = dense
+        self._tree = [0] * 17   # Fenwick tree over values 0..15 (grows as needed)
+        self._size = 0          # Users on the board
+        self._top = []          # (-value, arrival, user_id), best first
+        self._in_top = {}       # user_id -> its entry in _top
+        self._arrival = itertools.count(1)
+
+    # ----- values -----
+
+    def value(self, user_id: int) -> int:
+        if self._dense:
+            return self._values[user_id] if 0 <= user_id < len(self._values) else 0
+        return self._values.get(user_id, 0)
+
+    def _set_value(self, user_id: int, value: int):
+        if self._dense:
+            if user_id >= len(self._values):
+                self._values.extend([0] * (user_id + 1 - len(self._values) + 1024))
+        self._values[user_id] = value
+
+    # ----- Fenwick tree (index = value + 1) -----
+
+    def _grow(self, value: int):
+        capacity = len(self._tree) - 1
+        if value < capacity:
+            return
+        while capacity <= value:
+            capacity *= 2
+        # Rebuild from the per-value counts
+        counts = [self._count_at(v) for v in range(len(self._tree) - 1)]
+        self._tree = [0] * (capacity + 1)
+        for v, n in enumerate(counts):
+            if n:
+                self._add(v, n)
+
+    def _add(self, value: int, amount: int):
+        i = value + 1
+        while i < len(self._tree):
+            self._tree[i] += amount
+            i += i & -i
+
+    # Users with a value of at most `value`
+    def _count_upto(self, value: int) -> int:
+        i = min(value + 1, len(self._tree) - 1)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _count_at(self, value: int) -> int:
+        return self._count_upto(value) - (self._count_upto(value - 1) if value > 0 else 0)
+
+    # ----- updates -----
+
+    # Raise a user's value (lower values are ignored: they never go down)
+    def update(self, user_id: int, value: int):
+        old = self.value(user_id)
+        if value <= old:
+            return
+        self._grow(value)
+        if old > 0:
+            self._add(old, -1)
+        else:
+            self._size += 1
+        self._add(value, 1)
+        self._set_value(user_id, value)
+        self._update_top(user_id, value)
+
+    # Add to a user's value (e.g. one more interview)
+    def increment(self, user_id: int, amount: int = 1):
+        self.update(user_id, self.value(user_id) + amount)
+
+    def _update_top(self, user_id: int, value: int):
+        entry = (-value, next(self._arrival), user_id)
+        old = self._in_top.pop(user_id, None)
+        if old is not None:
+            del self._top[bisect.bisect_left(self._top, old)]
+        elif len(self._top) >= self.top_k and entry >= self._top[-1]:
+            return  # Not good enough for the top list
+        bisect.insort(self._top, entry)
+        self._in_top[user_id] = entry
+        if len(self._top) > self.top_k:
+            dropped = self._top.pop()
+            del self._in_top[dropped[2]]
+
+    # Replace everything with (user_id, value) pairs (for the first load)
+    def load(self, pairs):
+        self._values = array("i") if self._dense else {}
+        self._tree = [0] * 17
+        self._size = 0
+        counts = {}
+        for user_id, value in pairs:
+            if value > 0:
+                self._set_value(user_id, value)
+                counts[value] = counts.get(value, 0) + 1
+                self._size += 1
+        if counts:
+            self._grow(max(counts))
+        for value, n in counts.items():
+            self._add(value, n)
+        # Ties among loaded users go by user id
+        if self._dense:
+            users = ((u, v) for u, v in enumerate(self._values) if v > 0)
+        else:
+            users = self._values.items()
+        self._top = heapq.nsmallest(self.top_k, ((-v, 0, u) for u, v in users))
+        self._in_top = {entry[2]: entry for entry in self._top}
+
+    # ----- reads -----
+
+    # [(rank, user_id, value)] of the best `limit` users. Equal values share a rank.
+    def top(self, limit: int) -> list:
+        result = []
+        for position, (neg_value, _, user_id) in enumerate(self._top[:limit]):
+            rank = position + 1 if not result or result[-1][2] != -neg_value else result[-1][0]
+            result.append((rank, user_id, -neg_value))
+        return result
+
+    # (rank, value, users on the board) of one user; rank is None if they aren't on it
+    def rank(self, user_id: int) -> tuple:
+        value = self.value(user_id)
+        if value <= 0:
+            return None, 0, self._size
+        ahead = self._size - self._count_upto(value)
+        return ahead + 1, value, self._size
+
+
+# ---------------------- All Boards ----------------------
+
+class Leaderboards:
+    """
+    The overall and per-job-title boards of this worker, kept in step with
+    interview_history.
+    """
+
+    def __init__(self, top_k: int, sync_seconds: float):
+        self.top_k = top_k
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()       # Guards the boards
+        self._sync_lock = threading.Lock()  # One catch-up at a time
+        self._boards = None                 # (metric, job_title or None) -> Leaderboard
+        self._last_id = 0                   # Last interview_history id applied
+        self._synced_at = 0.0
+        self._loading = False               # A background load is running
+        self._counts = {"loads": 0, "syncs": 0, "rows_applied": 0}
+
+    # ----- reads -----
+
+    # Have the boards been loaded yet? (until then they read as empty)
+    @property
+    def ready(self) -> bool:
+        return self._boards is not None
+
+    def top(self, metric: str, job_title: str = None, limit: int = None) -> list:
+        self._maybe_sync()
+        with self._lock:
+            board = (self._boards or {}).get((metric, job_title))
+            return board.top(min(limit or self.top_k, self.top_k)) if board else []
+
+    def rank(self, user_id: int, metric: str, job_title: str = None) -> tuple:
+        self._maybe_sync()
+        with self._lock:
+            board = (self._boards or {}).get((metric, job_title))
+            return board.rank(user_id) if board else (None, 0, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._counts)
+            totals["boards"] = len(self._boards or {})
+            totals["last_id"] = self._last_id
+        return totals
+
+    # ----- syncing -----
+
+    # Load the boards on a background thread (once; again after a failure)
+    def start(self, app):
+        with self._lock:
+            if self._boards is not None or self._loading:
+                return
+            self._loading = True
+        threading.Thread(target=self._load_in_background, args=(app,),
+                         name="leaderboard-load", daemon=True).start()
+
+    # Apply every interview saved since the last catch-up (by any worker).
+    # While the boards are still loading there is nothing to do: the load
+    # (and the catch-up right after it) includes every saved row.
+    def catch_up(self):
+        if self._boards is None:
+            return
+        with self._sync_lock:
+            self._apply_new_rows()
+            self._synced_at = time.monotonic()
+
+    def _load_in_background(self, app):
+        try:
+            with app.app_context(), self._sync_lock:
+                self._load()
+                # Interviews saved while the history was being read
+                self._apply_new_rows()
+                self._synced_at = time.monotonic()
+        except Exception:
+            logger.exception("Loading the leaderboards failed")
+        finally:
+            with self._lock:
+                self._loading = False
+
+    # Catch up if it has been a while; a read never waits for another
+    # thread's catch-up (it just sees the boards a moment older)
+    def _maybe_sync(self):
+        if self._boards is None:
+            # Not loaded (the startup load failed or never ran): try now
+            self.start(current_app._get_current_object())
+            return
+        if time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        if self._sync_lock.acquire(blocking=False):
+            try:
+                self._apply_new_rows()
+                self._synced_at = time.monotonic()
+            finally:
+                self._sync_lock.release()
+
+    def _new_board(self, key) -> Leaderboard:
+        # The overall boards hold (nearly) every user: a flat array is smallest
+        return Leaderboard(self.top_k, dense=key[1] is None)
+
+    # First load: one grouped pass over the history, plus the streaks
+    def _load(self):
+        chunk = config.LEADERBOARD_LOAD_CHUNK_ROWS
+        last_id = db.session.scalar(db.select(db.func.max(InterviewHistory.id))) or 0
+        grouped = db.session.execute(
+            db.select(
+                InterviewHistory.user_id, InterviewHistory.job_title,
+                db.func.max(InterviewHistory.score), db.func.count()
+            )
+            .where(InterviewHistory.id <= last_id)
+            .group_by(InterviewHistory.user_id, InterviewHistory.job_title)
+            .execution_options(yield_per=chunk)
+        )
+        best, count = {}, {}
+        per_title = {}
+        for user_id, job_title, top_score, n in grouped:
+            best[user_id] = max(best.get(user_id, 0), top_score)
+            count[user_id] = count.get(user_id, 0) + n
+            per_title.setdefault(job_title, ([], []))
+            per_title[job_title][0].append((user_id, top_score))
+            per_title[job_title][1].append((user_id, n))
+        streaks = db.session.execute(
+            db.select(User.id, User.longest_streak)
+            .where(User.longest_streak > 0)
+            .execution_options(yield_per=chunk)
+        )
+
+        boards = {}
+        for metric, pairs in (("highest_score", best.items()), ("interviews", count.items()),
+                              ("longest_streak", streaks)):
+            boards[(metric, None)] = self._new_board((metric, None))
+            boards[(metric, None)].load(pairs)
+        for job_title, (scores, counts) in per_title.items():
+            for metric, pairs in (("highest_score", scores), ("interviews", counts)):
+                boards[(metric, job_title)] = self._new_board((metric, job_title))
+                boards[(metric, job_title)].load(pairs)
+        db.session.commit()  # End the read transaction
+
+        with self._lock:
+            self._boards = boards
+            self._last_id = last_id
+            self._counts["loads"] += 1
+
+    # Apply interview_history rows with an id above the last one applied
+    def _apply_new_rows(self):
+        rows = db.session.execute(
+            db.select(
+                InterviewHistory.id, InterviewHistory.user_id, InterviewHistory.job_title,
+                InterviewHistory.score, User.longest_streak
+            )
+            .join(User, User.id == InterviewHistory.user_id)
+            .where(InterviewHistory.id > self._last_id)
+            .order_by(InterviewHistory.id)
+        ).all()
+        db.session.commit()  # End the read transaction
+        if not rows:
+            return
+        with self._lock:
+            for row_id, user_id, job_title, score, longest_streak in rows:
+                for key in (("highest_score", job_title), ("interviews", job_title)):
+                    if key not in self._boards:
+                        self._boards[key] = self._new_board(key)
+                self._boards[("highest_score", None)].update(user_id, score)
+                self._boards[("highest_score", job_title)].update(user_id, score)
+                self._boards[("interviews", None)].increment(user_id)
+                self._boards[("interviews", job_title)].increment(user_id)
+                self._boards[("longest_streak", None)].update(user_id, longest_streak)
+                self._last_id = row_id
+            self._counts["syncs"] += 1
+            self._counts["rows_applied"] += len(rows)
+
+
+# The leaderboards of this worker
+leaderboards = Leaderboards(config.LEADERBOARD_TOP_K, config.LEADERBOARD_SYNC_SECONDS)
+
+
+# ---------------------- Usernames ----------------------
+
+# Usernames never change, so the ones shown on the boards are remembered
+_usernames = {}
+_usernames_lock = threading.Lock()
+
+# user id -> username for these ids (one query for the ones not seen yet)
+def usernames(user_ids) -> dict:
+    with _usernames_lock:
+        missing = [u for u in user_ids if u not in _usernames]
+    if missing:
+        rows = db.session.execute(db.select(User.id, User.username).where(User.id.in_(missing))).all()
+        with _usernames_lock:
+            # Keep the memory bounded (the top lists change slowly)
+            if len(_usernames) > 100000:
+                _usernames.clear()
+            _usernames.update(rows)
+    with _usernames_lock:
+        return {u: _usernames.get(u) for u in user_ids}
@@ -0,0 +1,234 @@
+# services/metrics.py
+
+# Timings, token counts and error counts for the /metrics page, in the
+# Prometheus text format (so Prometheus or Grafana can read it directly).
+#
+#   with span("get_feedback"):      # Time one stage of an interview
+#       ...
+#   record_tokens("get_feedback", response.usage)
+#
+# The stats() of the caches and stores are added to the page too (see
+# add_stats_source). Numbers are kept per worker process.
+
+# Import built-in modules
+import bisect     # To find a value's histogram bucket
+import functools  # For the timed() decorator
+import threading  # Locks protecting the numbers
+import time       # For span timing
+from contextlib import contextmanager
+
+
+# ---------------------- Metric Types ----------------------
+
+# Write label values safely (Prometheus escaping rules)
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+# {name="value",...} for one set of labels ("" when there are none)
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+# Numbers in the format Prometheus expects
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    A number that only goes up (per set of label values).
+    """
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    How often a value (usually seconds) fell into each bucket, plus the sum
+    and count (per set of label values).
+    """
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labelvalues, values in sorted(series.items()):
+            # Buckets are cumulative: "how many were <= le"
+            running = 0
+            for bound, count in zip(self.buckets, values):
+                running += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {running}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, inf)} {values[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(values[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {values[-1]}")
+        return lines
+
+
+# ---------------------- The Metrics ----------------------
+
+# Bucket bounds in seconds, from a fast cache hit to a very slow AI answer
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+stage_seconds = Histogram(
+    "career_stage_seconds", "Time spent in one stage of an interview",
+    ["stage"], SECONDS_BUCKETS
+)
+stage_errors = Counter(
+    "career_stage_errors_total", "Stages that ended with an error",
+    ["stage", "error"]
+)
+openai_tokens = Counter(
+    "career_openai_tokens_total", "Tokens reported by OpenAI completions",
+    ["stage", "type"]
+)
+openai_errors = Counter(
+    "career_openai_errors_total", "Failed OpenAI requests (before any retry)",
+    ["kind", "error"]
+)
+request_seconds = Histogram(
+    "career_http_request_seconds", "Time to answer a request (streamed responses: until the first byte)",
+    ["endpoint", "method", "status"], SECONDS_BUCKETS
+)
+slow_profiles = Counter(
+    "career_slow_request_profiles_total", "Profiles saved for slow requests",
+    ["path"]
+)
+
+_all_metrics = [stage_seconds, stage_errors, openai_tokens, openai_errors, request_seconds, slow_profiles]
+
+
+# ---------------------- Recording ----------------------
+
+# Time a stage of an interview (also counts it as an error if it raises).
+# Works around "await" too, and around a generator that is being consumed.
+# Only real errors are counted: a client leaving a stream early (GeneratorExit,
+# or CancelledError for async views) and Ctrl+C aren't failures of the stage.
+@contextmanager
+def span(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        stage_errors.inc(stage, type(e).__name__)
+        raise
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage)
+
+# Decorator version of span(): time every call of a function as `stage`
+def timed(stage: str):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# Add the token counts of one completion (its `usage`) to the totals
+def record_tokens(stage: str, usage):
+    if usage is None:
+        return
+    openai_tokens.inc(stage, "prompt", amount=usage.prompt_tokens or 0)
+    openai_tokens.inc(stage, "completion", amount=usage.completion_tokens or 0)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached:
+        openai_tokens.inc(stage, "cached", amount=cached)
+
+# Count a failed OpenAI request: the HTTP status if there was one, or the
+# kind of error (e.g. APITimeoutError)
+def record_openai_error(kind: str, error: Exception):
+    status = getattr(error, "status_code", None)
+    openai_errors.inc(kind, str(status) if status else type(error).__name__)
+
+
+# ---------------------- Stats of Other Components ----------------------
+
+# name -> function returning a stats() dict (caches, stores, ...)
+_stats_sources = {}
+
+# Show a component's stats() on the /metrics page as career_<name>_<key>
+def add_stats_source(name: str, stats_fn):
+    _stats_sources[name] = stats_fn
+
+# Turn one stats() dict into gauge lines. Numbers become gauges, text (like
+# a backend name) becomes a gauge with the text as a label, and nested dicts
+# (like per-route totals) become gauges with a "key" label.
+def _stats_lines(name: str, stats: dict) -> list[str]:
+    lines = []
+    nested = {k: v for k, v in stats.items() if isinstance(v, dict)}
+    if nested:
+        # {"chat": {"requests": 3, ...}, ...} -> career_<name>_requests{key="chat"} 3
+        fields = sorted({field for row in nested.values() for field in row})
+        for field in fields:
+            metric = f"career_{name}_{field}"
+            lines.append(f"# TYPE {metric} gauge")
+            for key, row in sorted(nested.items()):
+                if isinstance(row.get(field), (int, float)):
+                    lines.append(f'{metric}{{key="{_escape(key)}"}} {_number(row[field])}')
+    for key, value in sorted(stats.items()):
+        metric = f"career_{name}_{key}"
+        if isinstance(value, (int, float)):
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_number(value)}")
+        elif isinstance(value, str):
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f'{metric}{{value="{_escape(value)}"}} 1')
+    return lines
+
+
+# ---------------------- The /metrics Page ----------------------
+
+# Everything in the Prometheus text format
+def render() -> str:
+    lines = []
+    for metric in _all_metrics:
+        lines.extend(metric.render())
+    for name, stats_fn in sorted(_stats_sources.items()):
+        try:
+            lines.extend(_stats_lines(name, stats_fn()))
+        except Exception as e:
+            lines.append(f"# {name}: stats unavailable ({type(e).__name__})")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,348 @@
+# services/openai_client.py
+
+# The one connection to OpenAI shared by every service (interview AI and
+# text-to-speech), plus the rules every call follows:
+#   - a pool of kept-alive connections (no new TLS handshake per call)
+#   - a time limit per kind of call, so a slow answer can't hold a worker forever
+#   - retries with a random (jittered) wait for timeouts, 429s and 5xx errors
+#   - optional hedging: a slow short call is sent a second time and the first
+#     answer wins
+#   - a circuit breaker: when OpenAI keeps failing, calls fail straight away
+#     instead of every user waiting for the full timeout
+
+# Import built-in modules
+import asyncio    # For the async versions of the call rules
+import os         # To read the API key
+import random     # For the jittered wait between retries
+import threading  # Locks for the breaker and counters
+import time       # To time the breaker's cool-down
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Import the OpenAI library and the HTTP library it runs on
+import httpx
+import openai
+
+# Import app settings
+import config
+
+# Error counts for the /metrics page
+from services.metrics import record_openai_error
+
+
+# ---------------------- Shared Clients ----------------------
+
+# How many connections are kept open (and kept alive) to OpenAI
+_limits = httpx.Limits(
+    max_connections=config.OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=config.OPENAI_MAX_KEEPALIVE,
+    keepalive_expiry=config.OPENAI_KEEPALIVE_EXPIRY
+)
+
+# Time limit for one kind of call (connecting has its own, shorter limit)
+def _timeout(seconds: float) -> httpx.Timeout:
+    return httpx.Timeout(seconds, connect=config.OPENAI_CONNECT_TIMEOUT)
+
+# Time limits per kind of call
+TIMEOUTS = {
+    "short":  _timeout(config.OPENAI_TIMEOUT_SHORT),
+    "long":   _timeout(config.OPENAI_TIMEOUT_LONG),
+    "speech": _timeout(config.OPENAI_TIMEOUT_SPEECH),
+}
+
+class _LazyClient:
+    """
+    Builds the real client the first time it is used, then acts just like it.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._client = None
+        self._lock = threading.Lock()
+
+    # Only called for names this wrapper doesn't have (i.e. the client's)
+    def __getattr__(self, name):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build()
+        return getattr(self._client, name)
+
+# The clients every service uses. Retries are done by `upstream` below
+# (so the circuit breaker sees every failure), not by the OpenAI library.
+# They are built on first use: a process that never calls OpenAI (like a
+# resume-parsing worker, which imports the app) doesn't pay for their
+# connection pools and TLS setup.
+client = _LazyClient(lambda: openai.OpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=config.OPENAI_BASE_URL,
+    max_retries=0,
+    timeout=TIMEOUTS["long"],
+    http_client=openai.DefaultHttpxClient(limits=_limits)
+))
+async_client = _LazyClient(lambda: openai.AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=config.OPENAI_BASE_URL,
+    max_retries=0,
+    timeout=TIMEOUTS["long"],
+    http_client=openai.DefaultAsyncHttpxClient(limits=_limits)
+))
+
+
+# ---------------------- Circuit Breaker ----------------------
+
+class UpstreamUnavailable(Exception):
+    """
+    Raised instead of calling OpenAI while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calls to OpenAI for a while after too many failures in a row.
+
+    closed    – calls go through (normal)
+    open      – calls fail straight away until `reset_seconds` have passed
+    half-open – one test call goes through; success closes the breaker,
+                failure opens it again
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0         # Failures in a row
+        self._opened_at = None     # When the breaker opened (None = closed)
+        self._probing = False      # A half-open test call is running
+
+    # Ask to make a call: raises UpstreamUnavailable while the breaker is open
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._probing:
+                raise UpstreamUnavailable("OpenAI is failing, try again shortly")
+            # Cool-down over: let this one call test whether OpenAI is back
+            self._probing = True
+
+    # The call worked: back to normal
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    # The call failed because OpenAI is slow or down
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    # The call failed for another reason (e.g. a bad request): OpenAI itself
+    # answered, so a half-open test may end, but nothing is counted
+    def record_other(self):
+        with self._lock:
+            self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+
+# ---------------------- Call Rules ----------------------
+
+# Errors that mean "OpenAI is slow, overloaded or down" (worth another try)
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, openai.APIConnectionError):  # Includes timeouts
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class Upstream:
+    """
+    Runs OpenAI calls with a time limit, retries, hedging and a circuit breaker.
+
+    Usage: upstream.call("short", client.chat.completions.create, model=..., ...)
+    The first argument is the kind of call ("short", "long" or "speech"); the
+    rest is the function to call and its arguments (a `timeout` is added).
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float,
+        hedge_after: float,
+        hedge_max_in_flight: int
+    ):
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+        # Each hedged call may use two threads (the first try and the hedge)
+        self._hedge_slots = threading.BoundedSemaphore(max(1, hedge_max_in_flight))
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=2 * max(1, hedge_max_in_flight),
+            thread_name_prefix="hedge"
+        )
+        self._lock = threading.Lock()
+        self._counts = {
+            "calls": 0, "retries": 0, "failures": 0, "fast_failures": 0,
+            "hedges": 0, "hedge_wins": 0,
+        }
+
+    # Random wait before retry number `attempt` (0-based), "full jitter":
+    # spreads retries out so many clients don't all retry at the same moment
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    # Only short, non-streamed calls are hedged
+    def _should_hedge(self, kind: str, kwargs: dict) -> bool:
+        return self.hedge_after > 0 and kind == "short" and not kwargs.get("stream")
+
+    # Run fn(**kwargs) with the rules above and return its result
+    def call(self, kind: str, fn, **kwargs):
+        kwargs.setdefault("timeout", TIMEOUTS[kind])
+        hedge = self._should_hedge(kind, kwargs)
+        self._count("calls")
+        attempt = 0
+        while True:
+            self._before_call(kind)
+            try:
+                result = self._hedged(fn, kwargs) if hedge else fn(**kwargs)
+            except Exception as e:
+                if not self._after_failure(kind, e, attempt):
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    # Async version of call() (fn must be an async function)
+    async def acall(self, kind: str, fn, **kwargs):
+        kwargs.setdefault("timeout", TIMEOUTS[kind])
+        hedge = self._should_hedge(kind, kwargs)
+        self._count("calls")
+        attempt = 0
+        while True:
+            self._before_call(kind)
+            try:
+                result = await (self._ahedged(fn, kwargs) if hedge else fn(**kwargs))
+            except Exception as e:
+                if not self._after_failure(kind, e, attempt):
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    # Check the breaker before each try (counting calls it refuses)
+    def _before_call(self, kind: str):
+        try:
+            self.breaker.before_call()
+        except UpstreamUnavailable as e:
+            self._count("fast_failures")
+            record_openai_error(kind, e)
+            raise
+
+    # Record a failed try; True means "wait and try again"
+    def _after_failure(self, kind: str, error: Exception, attempt: int) -> bool:
+        if isinstance(error, openai.APIError):
+            record_openai_error(kind, error)
+        if not is_retryable(error):
+            self.breaker.record_other()
+            return False
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            self._count("failures")
+            return False
+        self._count("retries")
+        return True
+
+    # Send the call; if it has no answer after `hedge_after` seconds, send it
+    # again and return whichever answer comes first. The slower one is left
+    # to finish in the background and its answer is ignored.
+    def _hedged(self, fn, kwargs: dict):
+        # Too many hedged calls already running: make a plain call
+        if not self._hedge_slots.acquire(blocking=False):
+            return fn(**kwargs)
+        try:
+            first = self._hedge_pool.submit(fn, **kwargs)
+            done, _ = wait([first], timeout=self.hedge_after)
+            if done:
+                return first.result()
+
+            self._count("hedges")
+            second = self._hedge_pool.submit(fn, **kwargs)
+            pending = {first, second}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is second:
+                            self._count("hedge_wins")
+                        return future.result()
+            # Both failed: report the first one's error
+            return first.result()
+        finally:
+            self._hedge_slots.release()
+
+    # Async version of _hedged (the slower call is cancelled)
+    async def _ahedged(self, fn, kwargs: dict):
+        first = asyncio.ensure_future(fn(**kwargs))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if done:
+                return first.result()
+
+            self._count("hedges")
+            second = asyncio.ensure_future(fn(**kwargs))
+            tasks.append(second)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count("hedge_wins")
+                        return task.result()
+            return first.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    # Counters and breaker state for this worker
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["breaker"] = self.breaker.state
+        return counts
+
+
+# The call rules used by every service in this worker
+upstream = Upstream(
+    breaker=CircuitBreaker(config.OPENAI_BREAKER_THRESHOLD, config.OPENAI_BREAKER_RESET_SECONDS),
+    max_retries=config.OPENAI_MAX_RETRIES,
+    base_delay=config.OPENAI_RETRY_BASE_DELAY,
+    max_delay=config.OPENAI_RETRY_MAX_DELAY,
+    hedge_after=config.OPENAI_HEDGE_AFTER_SECONDS,
+    hedge_max_in_flight=config.OPENAI_HEDGE_MAX_IN_FLIGHT
+)
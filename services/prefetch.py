@@ -0,0 +1,155 @@
+# services/prefetch.py
+
+# Speculative prefetching of AI results.
+#
+# Some answers can be computed before the user asks for them (for example the
+# follow-up question, which never reads the candidate's answer). This module
+# starts that work in the background, hands the result over when the user
+# gets there, and cancels it if the interview is abandoned.
+#
+# Prefetches live in the worker process that started them. If a later request
+# lands on a different worker it simply misses and the caller makes the call
+# live, exactly like before.
+
+# Import built-in modules
+import asyncio     # To wait for a prefetch from async code
+import threading   # Locks and a semaphore to cap in-flight calls
+import time        # To expire results nobody came back for
+
+# Import app settings and the shared AI thread pool
+import config
+from services.executor import llm_executor
+
+
+class SpeculativePrefetcher:
+    """
+    Runs speculative calls on a shared executor, keyed by (user id, interview id).
+    """
+
+    def __init__(self, executor, max_in_flight: int, ttl_seconds: int):
+        self._executor = executor
+        self._ttl = ttl_seconds
+        # Caps how many speculative calls may run at the same time
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+        # Guards _pending and the counters (held only for dict updates)
+        self._lock = threading.Lock()
+        self._pending = {}  # (user_id, interview_id) -> (started_at, future)
+        self._last_sweep = time.monotonic()
+        self._counts = {
+            "started": 0,   # Speculative calls sent upstream
+            "used": 0,      # Results handed to a request
+            "wasted": 0,    # Cancelled, expired or replaced before use
+            "skipped": 0,   # Not started because the in-flight cap was reached
+            "failed": 0,    # Finished with an error (caller fell back to a live call)
+        }
+
+    # Start fn(*args) in the background for this key (unless the cap is reached)
+    def start(self, key, fn, *args):
+        self._sweep_expired()
+        # Never block a request waiting for a slot: just skip the speculation
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counts["skipped"] += 1
+            return
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # Free the slot as soon as the call finishes (or is cancelled)
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            old = self._pending.pop(key, None)
+            self._pending[key] = (time.monotonic(), future)
+            self._counts["started"] += 1
+        if old is not None:
+            self._discard(old[1])
+
+    # Hand over the prefetched result, or None if there is none to use
+    def take(self, key):
+        future = self._claim(key)
+        if future is None:
+            return None
+        try:
+            # Still running? Waiting for it is faster than starting over
+            result = future.result()
+        except Exception:
+            self._count("failed")
+            return None
+        self._count("used")
+        return result
+
+    # Async version of take(): waits for a running prefetch without blocking
+    # the event loop
+    async def atake(self, key):
+        future = self._claim(key)
+        if future is None:
+            return None
+        try:
+            result = await asyncio.wrap_future(future)
+        except Exception:
+            self._count("failed")
+            return None
+        self._count("used")
+        return result
+
+    # Remove and return the usable future for this key (None if there isn't one)
+    def _claim(self, key):
+        with self._lock:
+            entry = self._pending.pop(key, None)
+        if entry is None or entry[1].cancelled():
+            return None
+        return entry[1]
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    # Cancel the prefetch for one interview
+    def cancel(self, key):
+        with self._lock:
+            entry = self._pending.pop(key, None)
+        if entry is not None:
+            self._discard(entry[1])
+
+    # Cancel every prefetch belonging to a user (they started a new interview)
+    def cancel_user(self, user_id):
+        with self._lock:
+            keys = [k for k in self._pending if k[0] == user_id]
+            entries = [self._pending.pop(k) for k in keys]
+        for _, future in entries:
+            self._discard(future)
+
+    # Counters showing how many prefetches were used versus wasted
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._counts)
+            totals["pending"] = len(self._pending)
+        return totals
+
+    # Stop a future we no longer need and count it as wasted
+    def _discard(self, future):
+        # A call that already started cannot be interrupted; its result is dropped
+        future.cancel()
+        with self._lock:
+            self._counts["wasted"] += 1
+
+    # Drop results that were never picked up (checked at most once a minute)
+    def _sweep_expired(self):
+        now = time.monotonic()
+        if now - self._last_sweep < 60:
+            return
+        with self._lock:
+            self._last_sweep = now
+            expired = [k for k, (t, _) in self._pending.items() if now - t > self._ttl]
+            entries = [self._pending.pop(k) for k in expired]
+        for _, future in entries:
+            self._discard(future)
+
+
+# The prefetcher used by the interview service (one per worker process)
+prefetcher = SpeculativePrefetcher(
+    llm_executor,
+    config.PREFETCH_MAX_IN_FLIGHT,
+    config.PREFETCH_TTL_SECONDS
+)
@@ -0,0 +1,91 @@
+# services/profiling.py
+
+# Finds out where slow requests spend their time. A small share of requests
+# (PROFILE_SAMPLE_RATE) is run under cProfile; when one of them turns out to
+# be slow (PROFILE_SLOW_SECONDS or more) its profile is saved to PROFILE_DIR:
+#
+#   python -m pstats instance/profiles/<file>.prof     # or: snakeviz <file>.prof
+#
+# Profiling slows a request down a little, so it is off by default.
+# Only the normal (WSGI) request path is profiled: the async routes in asgi.py
+# hop between threads, which cProfile can't follow.
+
+# Import built-in modules
+import cProfile   # Python's built-in profiler
+import logging    # To log where a profile was saved
+import os         # For the profile folder
+import random     # To pick which requests are profiled
+import time       # To measure the request
+
+# Count of saved profiles for the /metrics page
+from services.metrics import slow_profiles
+
+logger = logging.getLogger(__name__)
+
+
+class SlowRequestProfiler:
+    """
+    WSGI middleware that profiles a sample of requests and keeps the
+    profiles of the slow ones.
+
+    Usage: app.wsgi_app = SlowRequestProfiler(app.wsgi_app, 0.01, 2, "profiles")
+    """
+
+    def __init__(self, wsgi_app, sample_rate: float, slow_seconds: float, folder: str, max_files: int = 50):
+        self.wsgi_app = wsgi_app
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.folder = folder
+        self.max_files = max_files
+        os.makedirs(folder, exist_ok=True)
+
+    def __call__(self, environ, start_response):
+        if random.random() >= self.sample_rate:
+            return self.wsgi_app(environ, start_response)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running in this thread
+            return self.wsgi_app(environ, start_response)
+
+        start = time.perf_counter()
+        try:
+            # (streamed responses are measured until they're built, not
+            # until they're sent)
+            result = self.wsgi_app(environ, start_response)
+        finally:
+            profiler.disable()
+        seconds = time.perf_counter() - start
+        if seconds >= self.slow_seconds:
+            self._save(profiler, environ, seconds)
+        return result
+
+    # Write the profile to the folder and delete the oldest ones over the limit
+    def _save(self, profiler: cProfile.Profile, environ: dict, seconds: float):
+        path_name = environ.get("PATH_INFO", "/").strip("/").replace("/", "_") or "index"
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{path_name}-{int(seconds * 1000)}ms.prof"
+        path = os.path.join(self.folder, filename)
+        try:
+            profiler.dump_stats(path)
+            self._prune()
+        except OSError as e:
+            logger.warning("Could not save profile %s: %s", path, e)
+            return
+        # Count by first path segment only ("/tts/<key>.mp3" -> "tts")
+        slow_profiles.inc(path_name.split("_")[0])
+        logger.info("Slow request %s took %.2fs, profile saved to %s",
+                    environ.get("PATH_INFO"), seconds, path)
+
+    def _prune(self):
+        files = [
+            os.path.join(self.folder, name)
+            for name in os.listdir(self.folder) if name.endswith(".prof")
+        ]
+        files.sort(key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
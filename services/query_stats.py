@@ -0,0 +1,60 @@
+# services/query_stats.py
+
+# Counts the database queries each request runs, so it's easy to see which
+# routes hit the database and how often. Totals are kept per route; the
+# count for a single request is also sent back in the X-DB-Queries header.
+
+# Import built-in modules
+import threading  # Lock protecting the totals
+
+# Import Flask's per-request storage
+from flask import g, has_request_context
+
+# Import SQLAlchemy's event hooks
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Count every statement sent to the database during a request
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.db_queries = g.get("db_queries", 0) + 1
+
+# Number of queries the current request has run so far
+def request_query_count() -> int:
+    return g.get("db_queries", 0)
+
+
+class QueryStats:
+    """
+    Requests and database queries per route (endpoint name).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}  # endpoint -> [requests, queries]
+
+    # Add one finished request's query count to its route's totals
+    def record(self, endpoint: str, queries: int):
+        with self._lock:
+            totals = self._routes.setdefault(endpoint or "unknown", [0, 0])
+            totals[0] += 1
+            totals[1] += queries
+
+    # Requests, queries and average queries per request for every route
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {name: list(totals) for name, totals in self._routes.items()}
+        return {
+            name: {
+                "requests": requests,
+                "queries": queries,
+                "queries_per_request": queries / requests,
+            }
+            for name, (requests, queries) in routes.items()
+        }
+
+
+# Totals for this worker process
+query_stats = QueryStats()
@@ -0,0 +1,251 @@
+# services/question_pool.py
+
+# Ready-made interview questions per job title, filled in the background.
+#
+#   question_pool.take(job_title, skill, user_id, avoid)  # A question, or None
+#   question_pool.is_duplicate(question, earlier)         # Near-duplicate check
+#
+# Many candidates interview for the same (canonical) job title, so instead of
+# asking the AI for a first question on every upload, one AI call writes a
+# batch of questions for a title and they are handed out one by one. When a
+# title's pool runs low (QUESTION_POOL_LOW_WATER), a refill is started on the
+# shared AI thread pool; the request that noticed never waits for it. A title
+# seen for the first time misses (the caller asks the AI live, like before)
+# and its pool is filled for the next candidate.
+#
+# Near-duplicates are caught with MinHash: each question becomes a short
+# signature of its words, and two questions whose signatures agree in
+# more than QUESTION_POOL_DUPLICATE_THRESHOLD of the places say almost the
+# same thing. New batches are filtered against what is already pooled, and a
+# question is never handed to a user who recently got (or was just asked)
+# something too similar.
+#
+# The pool lives in the worker process, like the prefetcher.
+
+# Import built-in modules
+import re         # To split questions into words
+import threading  # Lock for the pools and counters
+import zlib       # Fast, stable hash of a word
+from collections import OrderedDict, deque
+
+# Import NumPy for the MinHash signatures
+import numpy as np
+
+# Import app settings and the shared AI thread pool
+import config
+from services.executor import llm_executor
+
+
+# ---------------------- Near-Duplicate Detection ----------------------
+
+# Hashes per signature (more = more exact similarity, slower)
+NUM_HASHES = 64
+
+# Words that every interview question uses: left out so "Tell me about a
+# time you ..." doesn't make two different questions look alike
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "at", "by", "from",
+    "is", "are", "was", "were", "be", "been", "do", "did", "does", "have", "has", "had",
+    "you", "your", "yours", "me", "us", "we", "our", "i", "my", "it", "its", "this", "that",
+    "these", "those", "can", "could", "would", "will", "should", "how", "what", "which", "when",
+    "why", "where", "who", "tell", "describe", "explain", "walk", "through", "give", "example",
+    "share", "time", "about", "some", "any", "if", "so", "as", "within", "into", "during",
+    "after", "before", "while", "they", "them", "their", "there", "then", "than", "all", "also",
+    "just", "more", "most", "other", "out", "up", "not", "one", "like",
+}
+
+# Random multipliers (odd) and offsets of the hash functions, fixed so
+# signatures stay comparable for the life of the process
+_rng = np.random.default_rng(20240611)
+_MULTIPLIERS = _rng.integers(1, 2 ** 63, NUM_HASHES, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2 ** 63, NUM_HASHES, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'+#]*")
+
+# Rough word stem, so "debugging" and "debug", "choosing" and "choose" match
+def _stem(word: str) -> str:
+    for suffix in ("ment", "ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            word = word[:-len(suffix)]
+            break
+    # "debugg" -> "debug"
+    if len(word) >= 4 and word[-1] == word[-2] and word[-1] not in "aeiouls":
+        word = word[:-1]
+    # "choose" -> "choos" (like "choosing"), "disagree" -> "disagr"
+    if len(word) >= 4:
+        word = word.rstrip("e")
+    return word
+
+# The shingles of a question: its stemmed words without stop words. (Single
+# words, not word pairs: questions are short, and "which database would you
+# choose" asks the same as "how do you choose a database".)
+def shingles(text: str) -> set:
+    return {_stem(w) for w in _WORD.findall(text.lower()) if w not in STOP_WORDS}
+
+# MinHash signature: for each hash function, the smallest hash of any shingle
+def signature(text: str) -> np.ndarray:
+    hashes = np.array([zlib.crc32(s.encode()) for s in shingles(text)] or [0], dtype=np.uint64)
+    # (multiplier * hash + offset) wraps around at 2**64; the top bits are the hash
+    mixed = (_MULTIPLIERS[:, None] * hashes[None, :] + _OFFSETS[:, None]) >> np.uint64(16)
+    return mixed.min(axis=1)
+
+# Estimated share of shared shingles between one signature and each row of `others`
+def similarity(sig: np.ndarray, others) -> np.ndarray:
+    if len(others) == 0:
+        return np.zeros(0)
+    return (np.asarray(others) == sig).mean(axis=1)
+
+
+# ---------------------- Pool ----------------------
+
+# Users whose recent questions are remembered (least recent forgotten first)
+MAX_USERS_REMEMBERED = 10000
+
+class QuestionPool:
+    """
+    Pools of ready-made questions keyed by (job title, skill or None).
+    `generate(job_title, skill, count)` writes a batch (one AI call).
+    """
+
+    def __init__(self, generate, executor, low_water: int, batch_size: int,
+                 max_size: int, max_titles: int, threshold: float):
+        self._generate = generate
+        self._executor = executor
+        self.low_water = low_water
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.max_titles = max_titles
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._pools = OrderedDict()   # key -> deque of (question, signature), least used first
+        self._refilling = set()       # keys with a refill in flight
+        self._served = OrderedDict()  # user_id -> recent signatures handed to that user
+        self._counts = {
+            "hits": 0,        # Questions handed out
+            "misses": 0,      # Nothing suitable pooled: the caller asked live
+            "refills": 0,     # Batches asked for
+            "generated": 0,   # Questions added to a pool
+            "duplicates": 0,  # Generated questions dropped as near-duplicates
+            "failed": 0,      # Refills that raised
+        }
+
+    # Is `question` a near-duplicate of any of `earlier`?
+    def is_duplicate(self, question: str, earlier) -> bool:
+        if not earlier:
+            return False
+        sigs = [signature(q) for q in earlier]
+        return bool((similarity(signature(question), sigs) > self.threshold).any())
+
+    # Hand out a pooled question for this title (the skill's pool first, then
+    # the title's own), not too similar to `avoid` or to what this user got
+    # recently. Returns None when there is none; a refill is started either way.
+    def take(self, job_title: str, skill: str = None, user_id=None, avoid=()):
+        avoid_sigs = [signature(q) for q in avoid]
+        keys = [(job_title, skill), (job_title, None)] if skill else [(job_title, None)]
+        question = None
+        with self._lock:
+            if user_id is not None and user_id in self._served:
+                avoid_sigs.extend(self._served[user_id])
+            for key in keys:
+                question = self._pop(key, avoid_sigs)
+                if question is not None:
+                    self._remember(user_id, question[1])
+                    break
+            self._counts["hits" if question is not None else "misses"] += 1
+        for key in keys:
+            self._refill_if_low(key)
+        return question[0] if question is not None else None
+
+    # Start filling these titles' pools now (e.g. at startup)
+    def warm(self, job_titles):
+        for title in job_titles:
+            self._refill_if_low((title, None))
+
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._counts)
+            totals["titles"] = len(self._pools)
+            totals["questions"] = sum(len(pool) for pool in self._pools.values())
+            totals["refilling"] = len(self._refilling)
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = totals["hits"] / lookups if lookups else 0.0
+        return totals
+
+    # Remove and return the first usable (question, signature) of a pool
+    # (caller holds the lock)
+    def _pop(self, key, avoid_sigs):
+        pool = self._pools.get(key)
+        if not pool:
+            return None
+        self._pools.move_to_end(key)
+        for i, (question, sig) in enumerate(pool):
+            if not avoid_sigs or (similarity(sig, avoid_sigs) <= self.threshold).all():
+                del pool[i]
+                return question, sig
+        return None
+
+    # Note what a user got, so they don't get it (or a twin) again soon
+    # (caller holds the lock)
+    def _remember(self, user_id, sig):
+        if user_id is None:
+            return
+        served = self._served.pop(user_id, None) or deque(maxlen=self.max_size)
+        served.append(sig)
+        self._served[user_id] = served
+        # Keep the memory bounded: forget the users seen longest ago
+        while len(self._served) > MAX_USERS_REMEMBERED:
+            self._served.popitem(last=False)
+
+    # Start a background refill if this pool is below the low-water mark
+    def _refill_if_low(self, key):
+        with self._lock:
+            pool = self._pools.get(key)
+            if key in self._refilling or (pool is not None and len(pool) >= self.low_water):
+                return
+            if pool is None:
+                self._pools[key] = deque()
+                # Too many titles: drop the one used longest ago
+                while len(self._pools) > self.max_titles:
+                    old_key, _ = self._pools.popitem(last=False)
+                    self._refilling.discard(old_key)
+            self._refilling.add(key)
+            self._counts["refills"] += 1
+        self._executor.submit(self._refill, key)
+
+    # Ask for one batch and add the questions that aren't near-duplicates
+    def _refill(self, key):
+        try:
+            batch = self._generate(key[0], key[1], self.batch_size)
+        except Exception:
+            with self._lock:
+                self._counts["failed"] += 1
+                self._refilling.discard(key)
+            return
+        new = [(q, signature(q)) for q in batch]
+        with self._lock:
+            self._refilling.discard(key)
+            pool = self._pools.get(key)
+            if pool is None:
+                return  # Dropped while the batch was being written
+            kept = [sig for _, sig in pool]
+            for question, sig in new:
+                if len(pool) >= self.max_size:
+                    break
+                if kept and (similarity(sig, kept) > self.threshold).any():
+                    self._counts["duplicates"] += 1
+                    continue
+                pool.append((question, sig))
+                kept.append(sig)
+                self._counts["generated"] += 1
+
+
+# Build a pool with the settings from config.py
+def create_question_pool(generate) -> QuestionPool:
+    return QuestionPool(
+        generate, llm_executor,
+        low_water=config.QUESTION_POOL_LOW_WATER,
+        batch_size=config.QUESTION_POOL_BATCH_SIZE,
+        max_size=config.QUESTION_POOL_MAX_SIZE,
+        max_titles=config.QUESTION_POOL_MAX_TITLES,
+        threshold=config.QUESTION_POOL_DUPLICATE_THRESHOLD,
+    )
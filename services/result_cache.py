@@ -0,0 +1,177 @@
+# services/result_cache.py
+
+# Content-addressed cache for AI results that only depend on their inputs
+# (for example the job title guessed from a resume).
+#
+# Keys are a hash of the normalized input text plus the prompt version, so
+# uploading the same resume again finds the earlier answer, and changing a
+# prompt (bumping its version) automatically stops old answers from matching.
+#
+# Two layers:
+#   - memory: per-worker LRU with a size limit (fastest)
+#   - SQLite: shared by all workers and kept across restarts
+
+# Import built-in modules
+import hashlib                       # To hash the input text into a short key
+import re                            # To normalize whitespace
+import threading                     # Lock for the in-memory LRU and counters
+import time                          # For TTL (time-to-live) bookkeeping
+from collections import OrderedDict  # Remembers insertion order (for LRU)
+
+# Import app settings
+import config
+
+# Per-thread SQLite connections
+from services.sqlite_helpers import ThreadLocalSQLite
+
+
+# ---------------------- Keys ----------------------
+
+# Build a cache key from the input text(s) and the prompt version.
+# Whitespace differences (extra blank lines from PDF extraction, trailing
+# spaces) don't change the key.
+def content_key(*parts: str, version: str) -> str:
+    digest = hashlib.sha256(version.encode("utf-8"))
+    for part in parts:
+        normalized = re.sub(r"\s+", " ", part or "").strip()
+        digest.update(b"\x00")
+        digest.update(normalized.encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ---------------------- Cache ----------------------
+
+class ResultCache:
+    """
+    Two-level (memory LRU + SQLite) cache for one kind of result.
+    """
+
+    def __init__(self, namespace: str, version: str, db_path: str,
+                 max_entries: int, ttl_seconds: int):
+        self.namespace = namespace
+        self.version = version
+        self.ttl = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "purged": 0}
+        self._db = ThreadLocalSQLite(db_path)
+        self._ready = False  # Table created? (on first use, not on import)
+
+    # This thread's connection; the first use in this process sets up the table
+    def _conn(self):
+        conn = self._db.conn()
+        if not self._ready:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    namespace  TEXT NOT NULL,
+                    key        TEXT NOT NULL,
+                    version    TEXT NOT NULL,
+                    value      TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            # For purge_expired(), which runs while the server is up
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_result_cache_expires ON result_cache (namespace, expires_at)"
+            )
+            self._ready = True
+            # Answers from an older prompt version can never be hit again
+            self.invalidate_stale_versions()
+        return conn
+
+    # Return the cached value for a key, or None
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._memory[key]
+
+        # Not in this worker's memory: try the shared SQLite file
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM result_cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or row[1] <= now:
+            with self._lock:
+                self._counts["misses"] += 1
+            return None
+        with self._lock:
+            self._counts["disk_hits"] += 1
+            self._remember(key, row[0], row[1])
+        return row[0]
+
+    # Save a value under a key in both layers
+    def put(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO result_cache "
+            "(namespace, key, version, value, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, self.version, value, expires_at),
+        )
+
+    # Forget every cached value of this namespace
+    def invalidate(self):
+        with self._lock:
+            self._memory.clear()
+        self._conn().execute(
+            "DELETE FROM result_cache WHERE namespace = ?", (self.namespace,)
+        )
+
+    # Delete stored answers made with another prompt version, and expired ones
+    def invalidate_stale_versions(self):
+        self._conn().execute(
+            "DELETE FROM result_cache WHERE namespace = ? AND (version != ? OR expires_at <= ?)",
+            (self.namespace, self.version, time.time()),
+        )
+
+    # Delete stored answers whose time is up. get() already ignores them, but
+    # put() keeps adding rows, so without this the file only grows. Run now
+    # and then by the janitor thread (see app.py).
+    def purge_expired(self):
+        cur = self._conn().execute(
+            "DELETE FROM result_cache WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time()),
+        )
+        with self._lock:
+            self._counts["purged"] += cur.rowcount
+
+    # Hit/miss counters for this worker
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._counts)
+            totals["size"] = len(self._memory)
+        lookups = totals["memory_hits"] + totals["disk_hits"] + totals["misses"]
+        totals["hit_rate"] = (
+            (totals["memory_hits"] + totals["disk_hits"]) / lookups if lookups else 0.0
+        )
+        return totals
+
+    # Add to the in-memory LRU (caller holds the lock)
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counts["evictions"] += 1
+
+
+# Create a cache for one kind of result using the settings in config.py
+def create_result_cache(namespace: str, version: str) -> ResultCache:
+    return ResultCache(
+        namespace,
+        version,
+        config.RESULT_CACHE_DB_PATH,
+        config.RESULT_CACHE_MAX_ENTRIES,
+        config.RESULT_CACHE_TTL_SECONDS
+    )
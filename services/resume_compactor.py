@@ -0,0 +1,196 @@
+# services/resume_compactor.py
+
+# Shrinks raw resume text before it is put into AI prompts.
+#
+# Text pulled out of PDFs is full of things the AI doesn't need: repeated page
+# headers/footers, "Page 2 of 3", runs of blank lines and spaces, contact
+# details, and the same line copied twice. This module cleans that up, ranks
+# the resume's sections by how useful they are for interview questions, and
+# keeps the best ones until a token budget is reached.
+#
+# The result is computed once per interview and reused by every prompt.
+
+# Import built-in modules
+import re            # Pattern matching for cleanup and section headings
+import unicodedata   # To normalize odd characters (ligatures, wide spaces)
+from collections import Counter  # To find lines repeated on every page
+
+# Import app settings (token budget, tokenizer)
+import config
+
+# Timing for the /metrics page
+from services.metrics import timed
+
+
+# ---------------------- Token Counting ----------------------
+
+# Use OpenAI's tokenizer when it can be loaded (it needs its vocabulary file,
+# which is downloaded once and then cached). Otherwise fall back to a close
+# estimate of about four characters per token.
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding(config.TOKENIZER_ENCODING)
+except Exception:
+    _encoding = None
+
+# Count how many tokens a piece of text uses in a prompt
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+# Cut text down to at most `tokens` tokens, at a word boundary when there is one
+def cut_to_tokens(text: str, tokens: int) -> str:
+    if tokens <= 0:
+        return ""
+    if count_tokens(text) <= tokens:
+        return text
+    if _encoding is not None:
+        cut = _encoding.decode(_encoding.encode(text)[:tokens])
+    else:
+        cut = text[:tokens * 4]
+    # Don't end halfway through a word (unless the whole cut is one word)
+    words = cut.rsplit(" ", 1)
+    if len(words) == 2 and words[0].strip():
+        cut = words[0]
+    # Decoding a token prefix can add a token at the join; trim until it fits
+    while cut and count_tokens(cut) > tokens:
+        cut = cut[:-1]
+    return cut.rstrip()
+
+
+# ---------------------- Cleanup ----------------------
+
+# Lines that are only page numbers, e.g. "Page 2", "2 / 3", "- 2 -"
+_PAGE_NUMBER = re.compile(r"^(page\s*)?[-–\s]*\d+\s*((/|of)\s*\d+)?[-–\s]*$", re.I)
+
+# Contact details that carry no interview-relevant information
+_CONTACT = re.compile(
+    r"([\w.+-]+@[\w-]+\.[\w.-]+)"                 # e-mail addresses
+    r"|(https?://\S+|www\.\S+)"                   # links
+    r"|((?<!\d)(\+\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}(?!\d))"  # phone numbers
+)
+
+# Bullet characters PDF extraction leaves behind
+_BULLETS = re.compile(r"^\s*[•●▪■◦○◆►✓✔·*-]+\s*")
+
+# Clean a single line (returns "" if nothing useful is left)
+def _clean_line(line: str) -> str:
+    line = _CONTACT.sub(" ", line)
+    line = _BULLETS.sub("- ", line)
+    line = re.sub(r"[ \t ]+", " ", line).strip()
+    # Nothing but separators left (e.g. "| |" after removing contact details)
+    if not re.search(r"\w", line) or _PAGE_NUMBER.match(line):
+        return ""
+    return line
+
+# Normalize characters, clean every line, drop repeated headers and duplicates
+def normalize_resume(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKC", text or "")
+    lines = [_clean_line(l) for l in text.splitlines()]
+    lines = [l for l in lines if l]
+
+    # A line that shows up on many pages is a header or footer, not content
+    counts = Counter(l.lower() for l in lines)
+    repeated = {l for l, n in counts.items() if n >= 3 and len(l) < 80}
+
+    # Keep the first copy of every line, drop later exact duplicates
+    seen = set()
+    result = []
+    for line in lines:
+        key = line.lower()
+        if key in repeated or key in seen:
+            continue
+        seen.add(key)
+        result.append(line)
+    return result
+
+
+# ---------------------- Sections ----------------------
+
+# Known section headings and how useful they are for interview prompts
+# (higher = kept first when the budget is tight)
+SECTION_PRIORITY = {
+    "summary": 90, "profile": 90, "objective": 70, "about": 70,
+    "experience": 100, "work experience": 100, "professional experience": 100,
+    "employment": 100, "work history": 100,
+    "skills": 95, "technical skills": 95, "core competencies": 95,
+    "projects": 85, "key projects": 85,
+    "education": 60, "certifications": 55, "licenses": 55,
+    "awards": 40, "achievements": 50, "publications": 40,
+    "volunteer": 30, "volunteering": 30, "leadership": 45,
+    "languages": 25, "interests": 10, "hobbies": 10, "references": 0,
+}
+
+# Priority of the text before the first heading (usually name and title)
+HEADER_PRIORITY = 80
+
+# Priority of headings we don't recognize
+UNKNOWN_PRIORITY = 50
+
+# Return the heading's section name if this line is a section heading
+def _heading(line: str):
+    name = line.strip(" :").lower()
+    if name in SECTION_PRIORITY:
+        return name
+    # Short ALL-CAPS lines are headings too, even if we don't know them
+    if len(line) <= 40 and line.isupper() and len(line.split()) <= 4:
+        return name
+    return None
+
+# Split cleaned lines into (priority, lines) sections, in document order
+def split_sections(lines: list[str]) -> list[tuple[int, list[str]]]:
+    sections = [(HEADER_PRIORITY, [])]
+    for line in lines:
+        name = _heading(line)
+        if name is not None:
+            sections.append((SECTION_PRIORITY.get(name, UNKNOWN_PRIORITY), [line]))
+        else:
+            sections[-1][1].append(line)
+    return [s for s in sections if s[1]]
+
+
+# ---------------------- Main Function ----------------------
+
+# Clean the resume and keep its most useful sections within the token budget.
+# Sections keep their original order in the result; the lowest-priority
+# sections are dropped (or cut short) first.
+@timed("resume_compact")
+def compact_resume(text: str, token_budget: int = None) -> str:
+    budget = config.RESUME_TOKEN_BUDGET if token_budget is None else token_budget
+    sections = split_sections(normalize_resume(text))
+
+    # Visit sections from most to least useful, spending the budget line by line
+    order = sorted(range(len(sections)), key=lambda i: -sections[i][0])
+    kept = {}
+    used = 0
+    for i in order:
+        priority, lines = sections[i]
+        if priority <= 0:
+            continue
+        chosen = []
+        for line in lines:
+            cost = count_tokens(line) + 1  # +1 for the newline
+            if used + cost > budget:
+                # Keep as much of the line as still fits (a resume can be one
+                # long paragraph) and stop: the budget is spent
+                line = cut_to_tokens(line, budget - used - 1)
+                if line:
+                    chosen.append(line)
+                    used += count_tokens(line) + 1
+                break
+            chosen.append(line)
+            used += cost
+        # A heading on its own isn't worth keeping (give its tokens back)
+        if len(chosen) > 1 or (chosen and _heading(chosen[0]) is None):
+            kept[i] = chosen
+        elif chosen:
+            used -= count_tokens(chosen[0]) + 1
+        if used >= budget:
+            break
+
+    if not kept:
+        # Nothing made it in (e.g. only headings fit): send the cleaned text
+        # cut to the budget rather than an empty resume
+        return cut_to_tokens("\n".join(l for _, lines in sections for l in lines), budget)
+    return "\n".join(line for i in sorted(kept) for line in kept[i])
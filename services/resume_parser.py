@@ -1,58 +1,184 @@
 # Import built-in modules for file handling
 import os  # This helps us work with file paths and file extensions
+import io  # Lets us treat bytes in memory like an open file
+import concurrent.futures  # Process pool for reading PDFs (in parallel for big ones)
+import multiprocessing     # To start the pool's processes cleanly
+import threading           # Lock around the shared pool
+import time                # For the parse deadline
+from concurrent.futures.process import BrokenProcessPool
 
 # Import external libraries that can read different types of resume documents
 import pdfplumber  # Used to extract text from PDF files
 import docx        # Used to extract text from Word (.docx) files
 
+# Import app settings (page limit, time limit, number of processes)
+import config
+
+# Timing for the /metrics page
+from services.metrics import timed
+
 
 # ---------------------- MAIN FUNCTION ----------------------
 
 # This is the main function that handles resume reading.
-# It accepts the file path of a resume and returns the text content.
-def load_resume(path="resume.pdf"):
-    # Split the file path into the name and extension (like ".pdf")
-    _, ext = os.path.splitext(path)
+# It accepts a file path, raw bytes, or an open file (like the upload stream
+# in a Flask request) and returns the text content. When passing bytes or a
+# file object, give the original file name so the type can be detected.
+@timed("resume_parse")
+def load_resume(source="resume.pdf", filename=None):
+    # A plain path: the file name is the path itself
+    if isinstance(source, (str, os.PathLike)):
+        filename = filename or os.fspath(source)
+
+    # Split the file name into the name and extension (like ".pdf")
+    _, ext = os.path.splitext(filename or "")
 
     # Convert the extension to lowercase (so ".PDF" and ".pdf" are treated the same)
     ext = ext.lower()
 
     # Choose the correct text-extraction function based on file type
     if ext == ".pdf":
-        return load_pdf(path)       # Call the PDF reader if it's a PDF
+        return load_pdf(source)       # Call the PDF reader if it's a PDF
     elif ext == ".docx":
-        return load_docx(path)      # Call the Word reader if it's a DOCX
+        return load_docx(source)      # Call the Word reader if it's a DOCX
     elif ext == ".txt":
-        return load_txt(path)       # Call the text reader if it's a plain text file
+        return load_txt(source)       # Call the text reader if it's a plain text file
     else:
         # If the file is not one of the supported types, show an error
         raise ValueError("Unsupported resume format. Use .pdf, .docx, or .txt")
 
 
-# ---------------------- PDF PARSER ----------------------
+# Read the whole document into memory as bytes (from a path, bytes or file object)
+def _read_bytes(source) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    return source.read()
 
-# This function handles reading a PDF file
-def load_pdf(path: str):
-    text = ""  # Start with an empty string to collect text
 
-    # Open the PDF file using pdfplumber
-    with pdfplumber.open(path) as pdf:
-        # Loop through each page in the PDF
-        for page in pdf.pages:
-            # Extract text from the current page
-            # If no text is found, add an empty string instead
-            text += page.extract_text() or ""
+# ---------------------- PDF PARSER ----------------------
 
-    # Remove any extra spaces from the beginning and end
-    return text.strip()
+# Process pool shared by all PDF reads (created the first time it's needed).
+# Its workers are started by a clean "forkserver" process, not forked from
+# this one: a fork would copy the AI threads, open HTTP connections and
+# database connections of the web worker into every PDF process.
+_pdf_pool = None
+_pdf_pool_size = config.RESUME_PARSE_WORKERS or os.cpu_count() or 1
+_pdf_pool_lock = threading.Lock()
+
+def _pool_context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Every worker imports the main script (e.g. app.py) before it can run
+    # anything. Import it (and this module) once in the fork server instead:
+    # workers forked from it already have both. app.py skips its startup work
+    # there (PARSER_PROCESS), and the services do no work on import.
+    context.set_forkserver_preload(["__main__", __name__])
+    return context
+
+def _get_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=_pdf_pool_size, mp_context=_pool_context()
+            )
+        return _pdf_pool
+
+# Throw away a pool whose workers are stuck on a PDF that ran out of time:
+# cancel what hasn't started, stop the busy workers, and let the next read
+# start a fresh pool (a cancelled future that is already running would keep
+# its worker busy for as long as the PDF takes)
+def _recycle_pdf_pool(pool):
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not pool:
+            return  # Another request recycled it already
+        _pdf_pool = None
+    workers = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in workers:
+        process.terminate()
+
+# Count the pages of a PDF, and read it straight away if it is small
+# (runs inside a worker process). Returns (page_count, texts or None).
+def _open_pdf(data: bytes, max_pages: int, parallel_min_pages: int):
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        page_count = min(len(pdf.pages), max_pages)
+        if page_count >= parallel_min_pages:
+            return page_count, None
+        # If no text is found on a page, use an empty string instead
+        return page_count, [(pdf.pages[i].extract_text() or "") for i in range(page_count)]
+
+# Extract the text of pages [start, end) of a PDF (runs inside a worker process)
+def _extract_pdf_pages(data: bytes, start: int, end: int) -> list[str]:
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        # If no text is found on a page, use an empty string instead
+        return [(pdf.pages[i].extract_text() or "") for i in range(start, end)]
+
+# Wait for futures until the deadline; on time out, free the pool's workers
+def _wait_for(pool, futures, deadline: float, timeout: float):
+    _, not_done = concurrent.futures.wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    if not_done:
+        _recycle_pdf_pool(pool)
+        raise TimeoutError(f"Reading the PDF took longer than {timeout:g} seconds")
+    return [future.result() for future in futures]
+
+# Read a PDF in the pool: open it (small PDFs are read there and then), then
+# read big ones as page ranges in several processes at once
+def _read_pdf_in_pool(data: bytes, max_pages: int, parallel: bool, deadline: float, timeout: float) -> list[str]:
+    pool = _get_pdf_pool()
+    parallel_min_pages = config.RESUME_PARALLEL_MIN_PAGES if parallel else max_pages + 1
+    [(page_count, texts)] = _wait_for(
+        pool, [pool.submit(_open_pdf, data, max_pages, parallel_min_pages)], deadline, timeout
+    )
+    if texts is not None:
+        return texts
+
+    # Give each process one contiguous range of pages
+    chunks = min(_pdf_pool_size, page_count)
+    size = -(-page_count // chunks)  # Round up
+    futures = [
+        pool.submit(_extract_pdf_pages, data, start, min(start + size, page_count))
+        for start in range(0, page_count, size)
+    ]
+    # Collect the ranges in page order
+    texts = []
+    for part in _wait_for(pool, futures, deadline, timeout):
+        texts.extend(part)
+    return texts
+
+# This function handles reading a PDF file (path, bytes or file object).
+# Only the first RESUME_MAX_PAGES pages are read. All the work (even counting
+# the pages) happens in the process pool, so a broken or hostile PDF can't
+# hang the request: the whole read must finish within RESUME_PARSE_TIMEOUT
+# seconds. Large documents are split into page ranges read at once.
+def load_pdf(source, max_pages: int = None, timeout: float = None, parallel: bool = True):
+    max_pages = config.RESUME_MAX_PAGES if max_pages is None else max_pages
+    timeout = config.RESUME_PARSE_TIMEOUT if timeout is None else timeout
+    data = _read_bytes(source)
+    deadline = time.monotonic() + timeout
+
+    try:
+        texts = _read_pdf_in_pool(data, max_pages, parallel, deadline, timeout)
+    except BrokenProcessPool:
+        # Another upload ran out of time and its pool was stopped while this
+        # one was using it: try once more on the new pool
+        texts = _read_pdf_in_pool(data, max_pages, parallel, deadline, timeout)
+
+    # Join once at the end (linear time) and remove extra spaces at the ends
+    return "\n".join(texts).strip()
 
 
 # ---------------------- DOCX PARSER ----------------------
 
-# This function handles reading Word (.docx) files
-def load_docx(path: str):
+# This function handles reading Word (.docx) files (path, bytes or file object)
+def load_docx(source):
     # Open the Word document using the python-docx library
-    doc = docx.Document(path)
+    doc = docx.Document(io.BytesIO(_read_bytes(source)))
 
     # Loop through every paragraph in the document
     # Extract text from each one and join them with a newline
@@ -61,9 +187,7 @@ def load_docx(path: str):
 
 # ---------------------- TXT PARSER ----------------------
 
-# This function handles reading plain text (.txt) files
-def load_txt(path: str):
-    # Open the file in read mode using UTF-8 encoding (for most characters)
-    with open(path, "r", encoding="utf-8") as file:
-        # Read the entire file into a string, then strip off extra whitespace
-        return file.read().strip()
+# This function handles reading plain text (.txt) files (path, bytes or file object)
+def load_txt(source):
+    # Decode using UTF-8 (for most characters), then strip off extra whitespace
+    return _read_bytes(source).decode("utf-8").strip()
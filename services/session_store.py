@@ -0,0 +1,236 @@
+# services/session_store.py
+
+# Keeps the state of every running mock interview, keyed by
+# (user id, interview id), so concurrent users and multiple worker
+# processes never overwrite each other's sessions.
+#
+# Two backends are available (pick one with SESSION_BACKEND in config.py):
+#   - MemorySessionStore: sharded in-process LRU with TTL eviction
+#   - SQLiteSessionStore: file-backed store shared by all workers
+
+# Import built-in modules
+import json                          # To save session dicts as text in SQLite
+import threading                     # Locks for the shards and counters
+import time                          # For TTL (time-to-live) bookkeeping
+import uuid                          # To create unique interview ids
+from collections import OrderedDict  # Remembers insertion order (for LRU)
+
+# Import app settings
+import config
+
+# Per-thread SQLite connections
+from services.sqlite_helpers import ThreadLocalSQLite
+
+
+# ---------------------- Helpers ----------------------
+
+# Create a new random interview id
+def new_interview_id() -> str:
+    return uuid.uuid4().hex
+
+
+# ---------------------- In-Memory Backend ----------------------
+
+# One independently locked slice of the in-memory store.
+# Each interview key always lands in the same shard, so requests for
+# different interviews almost never wait on the same lock.
+class _Shard:
+    def __init__(self, capacity: int):
+        self.lock = threading.Lock()
+        self.items = OrderedDict()  # key -> (expires_at, data), oldest first
+        self.capacity = capacity
+        # Counters are per shard so updating them never needs a global lock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+class MemorySessionStore:
+    """
+    In-process interview store: LRU eviction once full, TTL eviction when idle.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, shards: int = 64):
+        self.ttl = ttl_seconds
+        shards = max(1, shards)
+        per_shard = max(1, max_entries // shards)
+        self._shards = [_Shard(per_shard) for _ in range(shards)]
+
+    # Pick the shard responsible for a key
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    # Return the saved session dict, or None if missing or expired
+    def get(self, user_id, interview_id):
+        key = (user_id, interview_id)
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.items.get(key)
+            if entry is None:
+                shard.misses += 1
+                return None
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                # Too old: drop it and treat it as a miss
+                del shard.items[key]
+                shard.expirations += 1
+                shard.misses += 1
+                return None
+            # Mark as most recently used
+            shard.items.move_to_end(key)
+            shard.hits += 1
+            return data
+
+    # Save (or replace) a session and refresh its TTL
+    def put(self, user_id, interview_id, data: dict):
+        key = (user_id, interview_id)
+        shard = self._shard(key)
+        with shard.lock:
+            shard.items[key] = (time.monotonic() + self.ttl, data)
+            shard.items.move_to_end(key)
+            # Evict least recently used sessions while the shard is over capacity
+            while len(shard.items) > shard.capacity:
+                shard.items.popitem(last=False)
+                shard.evictions += 1
+
+    # Remove a session (e.g. when it is finished)
+    def delete(self, user_id, interview_id):
+        key = (user_id, interview_id)
+        shard = self._shard(key)
+        with shard.lock:
+            shard.items.pop(key, None)
+
+    # Hit/miss/eviction counters summed over all shards
+    def stats(self) -> dict:
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "size": 0}
+        for shard in self._shards:
+            with shard.lock:
+                totals["hits"] += shard.hits
+                totals["misses"] += shard.misses
+                totals["evictions"] += shard.evictions
+                totals["expirations"] += shard.expirations
+                totals["size"] += len(shard.items)
+        totals["backend"] = "memory"
+        return totals
+
+
+# ---------------------- SQLite Backend ----------------------
+
+class SQLiteSessionStore:
+    """
+    Interview store backed by a SQLite file, shared by every worker process.
+    """
+
+    # How many writes happen between sweeps of expired rows
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str, ttl_seconds: int):
+        self.path = path
+        self.ttl = ttl_seconds
+        self._db = ThreadLocalSQLite(path)  # One connection per thread
+        self._counter_lock = threading.Lock()
+        self._writes = 0
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._ready = False  # Table created? (on first use, not on import)
+
+    # This thread's connection; the first use in this process creates the table
+    def _conn(self):
+        conn = self._db.conn()
+        if not self._ready:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS interview_sessions (
+                    user_id      TEXT NOT NULL,
+                    interview_id TEXT NOT NULL,
+                    data         TEXT NOT NULL,
+                    expires_at   REAL NOT NULL,
+                    PRIMARY KEY (user_id, interview_id)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_interview_sessions_expires "
+                "ON interview_sessions (expires_at)"
+            )
+            self._ready = True
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._counter_lock:
+            self._counts[name] += amount
+
+    # Return the saved session dict, or None if missing or expired
+    def get(self, user_id, interview_id):
+        row = self._conn().execute(
+            "SELECT data, expires_at FROM interview_sessions "
+            "WHERE user_id = ? AND interview_id = ?",
+            (str(user_id), interview_id),
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        if row[1] <= time.time():
+            self.delete(user_id, interview_id)
+            self._count("expirations")
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row[0])
+
+    # Save (or replace) a session and refresh its TTL
+    def put(self, user_id, interview_id, data: dict):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO interview_sessions "
+            "(user_id, interview_id, data, expires_at) VALUES (?, ?, ?, ?)",
+            (str(user_id), interview_id, json.dumps(data), time.time() + self.ttl),
+        )
+        # Every so often, clear out sessions nobody came back to
+        with self._counter_lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_EVERY == 0
+        if purge:
+            self.purge_expired()
+
+    # Remove a session (e.g. when it is finished)
+    def delete(self, user_id, interview_id):
+        self._conn().execute(
+            "DELETE FROM interview_sessions WHERE user_id = ? AND interview_id = ?",
+            (str(user_id), interview_id),
+        )
+
+    # Delete every expired session and count them as evictions
+    def purge_expired(self):
+        cur = self._conn().execute(
+            "DELETE FROM interview_sessions WHERE expires_at <= ?", (time.time(),)
+        )
+        self._count("evictions", cur.rowcount)
+
+    # Hit/miss/eviction counters for this worker
+    def stats(self) -> dict:
+        with self._counter_lock:
+            totals = dict(self._counts)
+        totals["size"] = self._conn().execute(
+            "SELECT COUNT(*) FROM interview_sessions"
+        ).fetchone()[0]
+        totals["backend"] = "sqlite"
+        return totals
+
+
+# ---------------------- Store Factory ----------------------
+
+# Build the store selected in config.py
+def create_session_store():
+    if config.SESSION_BACKEND == "sqlite":
+        return SQLiteSessionStore(config.SESSION_DB_PATH, config.SESSION_TTL_SECONDS)
+    if config.SESSION_BACKEND == "memory":
+        return MemorySessionStore(
+            config.SESSION_MAX_ENTRIES,
+            config.SESSION_TTL_SECONDS,
+            config.SESSION_SHARDS,
+        )
+    raise ValueError(f"Unknown SESSION_BACKEND: {config.SESSION_BACKEND!r}")
+
+
+# The store used by the interview service (one per worker process)
+session_store = create_session_store()
@@ -0,0 +1,29 @@
+# services/sqlite_helpers.py
+
+# Small helpers shared by the SQLite-backed stores (sessions, caches).
+
+# Import built-in modules
+import sqlite3     # Lightweight file database
+import threading   # One connection per thread (sqlite3 connections aren't shared)
+
+
+class ThreadLocalSQLite:
+    """
+    Hands every thread its own autocommit connection to one SQLite file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    # Open (or reuse) this thread's connection
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None means every statement commits by itself
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            # WAL lets readers and a writer work at the same time
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
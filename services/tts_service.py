@@ -1,45 +1,417 @@
-# Import the OpenAI library so we can use their AI services like text-to-speech
-import openai
-
-# Import Python’s built-in modules for temporary files and file system tools
-import tempfile  # Lets us create temporary files
+# Import Python’s built-in modules for file system tools and hashing
 import os  # Used for working with file paths and environment variables
+import re  # To check that a requested cache key looks valid
+import hashlib  # To turn text + voice settings into a short file name
+import threading  # Lock protecting the cache index
+import time  # To measure time-to-first-audio
+import uuid  # Unique names for files that are still being written
+import asyncio  # To write files off the event loop in the async versions
+from collections import OrderedDict, deque  # LRU order / recent timings
 
 # Import the function to load environment variables from a .env file
 from dotenv import load_dotenv
 
 # Import a Flask tool that lets us send files (like audio) to the browser
-from flask import send_file
+from flask import send_file, abort
+
+# Import app settings (voice, cache folder and size budget)
+import config
+
+# Shared pool used to synthesize sentences side by side
+from services.executor import llm_executor
 
 # Load environment variables (like our secret API key) from a .env file
 load_dotenv()
 
-# Create a client to connect to OpenAI using the API key we loaded
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# The shared OpenAI clients and call rules (time limits, retries, breaker)
+from services.openai_client import client, async_client, upstream
+
+# Stage timings for the /metrics page
+from services.metrics import span, timed
+
+# Deletes unfinished speech files a crashed request left behind
+from services.janitor import janitor
+
+
+# ------------------ Audio Cache ---------------------
+
+# Cache keys are hex SHA-256 digests
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Build the cache key for a piece of text with the current voice settings
+def tts_key(text: str) -> str:
+    raw = f"{config.TTS_MODEL}\x00{config.TTS_VOICE}\x00{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Folder of generated MP3 files named by content hash, kept under a byte budget.
+    The least recently played files are deleted first. The folder may be shared
+    by several workers: rescan() (run by the janitor thread) picks up the files
+    the others wrote, so the budget covers every file in it, whoever wrote it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> file size, least recently used first
+        self._total = 0
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "rescans": 0}
+
+    # Create the folder and index the files already in it (app.py calls this
+    # at startup; importing this module touches no files)
+    def load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.rescan()
+
+    # Where the audio for a key is stored
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    # Return the file path if this key is cached (and mark it as recently used)
+    def lookup(self, key: str):
+        path = self.path_for(key)
+        with self._lock:
+            known = key in self._index
+        # Another worker may have created (or evicted) the file in the meantime
+        if not os.path.isfile(path):
+            if known:
+                self._forget(key)
+            with self._lock:
+                self._counts["misses"] += 1
+            return None
+        with self._lock:
+            if known:
+                self._index.move_to_end(key)
+            else:
+                size = os.path.getsize(path)
+                self._index[key] = size
+                self._total += size
+            self._counts["hits"] += 1
+        # Update the file time so the LRU order survives restarts
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    # Move a finished temporary file into the cache
+    def add(self, key: str, tmp_path: str) -> str:
+        path = self.path_for(key)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)  # Atomic: readers never see half a file
+        with self._lock:
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size  # The file just added is the newest
+        self._evict()
+        return path
+
+    # Re-read the folder, so files written (or played, or deleted) by other
+    # workers count towards the budget too, then evict down to it. Play order
+    # comes from the file times, which every worker updates on a hit. Run
+    # every TTS_CACHE_RESCAN_SECONDS by the janitor thread, never by requests.
+    def rescan(self):
+        entries = self._scan()
+        with self._lock:
+            index = OrderedDict((k, size) for _, k, size in entries)
+            # Files this worker added while the folder was being read
+            added = [(k, size) for k, size in self._index.items() if k not in index]
+        added = [(k, size) for k, size in added if os.path.isfile(self.path_for(k))]
+        with self._lock:
+            index.update(added)
+            self._index = index
+            self._total = sum(index.values())
+            self._counts["rescans"] += 1
+        self._evict()
+
+    # Delete the least recently used files until we're under budget
+    def _evict(self):
+        victims = []
+        with self._lock:
+            while self._total > self.max_bytes and len(self._index) > 1:
+                old_key, old_size = self._index.popitem(last=False)
+                self._total -= old_size
+                self._counts["evictions"] += 1
+                victims.append(old_key)
+        for old_key in victims:
+            try:
+                os.remove(self.path_for(old_key))
+            except OSError:
+                pass
+
+    # A fresh temporary path in the cache folder (same disk, so os.replace is atomic).
+    # The janitor deletes it later if the request dies before cleaning it up.
+    def temp_path(self) -> str:
+        os.makedirs(self.directory, exist_ok=True)  # In case load() wasn't called
+        path = os.path.join(self.directory, f".{uuid.uuid4().hex}.part")
+        janitor.track(path, config.TTS_TEMP_MAX_AGE_SECONDS)
+        return path
+
+    # Hit/miss/eviction counters and current size
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._counts)
+            totals["files"] = len(self._index)
+            totals["bytes"] = self._total
+        return totals
+
+    def _forget(self, key):
+        with self._lock:
+            self._total -= self._index.pop(key, 0)
+
+    # (time, key, size) of every cached file in the folder, oldest played first
+    def _scan(self) -> list:
+        entries = []
+        for entry in os.scandir(self.directory):
+            key, ext = os.path.splitext(entry.name)
+            if ext == ".mp3" and _KEY_PATTERN.match(key) and entry.is_file():
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue  # Deleted by another worker while scanning
+                entries.append((st.st_mtime, key, st.st_size))
+        return sorted(entries)
+
+
+# The audio cache used by /speak (one index per worker, files and budget
+# shared on disk). app.py loads it at startup and has the janitor rescan the
+# folder and clean up unfinished files.
+tts_cache = TTSCache(config.TTS_CACHE_DIR, config.TTS_CACHE_MAX_BYTES)
 
 
 # ------------------ Text-to-Speech Function ---------------------
 
-# This function takes some text and returns an audio file that says the text out loud
-def generate_tts_audio(text: str):
-    # Create a temporary .mp3 file where the AI-generated voice will be saved
-    # This file is stored temporarily and will be deleted later
-    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio:
-        # Ask OpenAI to turn the input text into speech using their text-to-speech model
-        # 'tts-1' is the model, 'nova' is the voice type, and 'text' is what the AI should say
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice="nova",
+# Make sure the audio for this text is in the cache and return its key
+def synthesize_to_cache(text: str) -> str:
+    key = tts_key(text)
+    # Already generated before? Nothing to do
+    if tts_cache.lookup(key) is not None:
+        return key
+
+    # Ask OpenAI to turn the input text into speech using their text-to-speech model
+    with span("tts_synthesis"):
+        response = upstream.call(
+            "speech", client.audio.speech.create,
+            model=config.TTS_MODEL,
+            voice=config.TTS_VOICE,
             input=text
         )
 
-        # Write the generated audio into our temporary .mp3 file
-        response.stream_to_file(temp_audio.name)
+    # Write the generated audio to a temporary file, then move it into the cache
+    tmp_path = tts_cache.temp_path()
+    try:
+        response.stream_to_file(tmp_path)
+        tts_cache.add(key, tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return key
+
+# Send cached audio with an ETag and Range support, so the browser can
+# revalidate (304 Not Modified) and seek without downloading the whole file
+def send_cached_audio(key: str):
+    if not _KEY_PATTERN.match(key):
+        abort(404)
+    path = tts_cache.lookup(key)
+    if path is None:
+        abort(404)
+    return _send_audio_file(path, key)
 
-    # Send the audio file back to the user's web browser using Flask
-    # This allows the user to hear the generated voice
+# Send one audio file from the cache folder
+def _send_audio_file(path: str, key: str):
     return send_file(
-        temp_audio.name,  # The path to the temporary audio file
+        path,
         mimetype="audio/mpeg",  # Tell the browser it’s an audio file
-        as_attachment=False  # This tells the browser to play it instead of downloading it
+        as_attachment=False,  # Play it instead of downloading it
+        conditional=True,  # Honour If-None-Match and Range headers
+        etag=key,  # The content hash is a perfect ETag
+        max_age=24 * 3600  # Content never changes for a key
     )
+
+# This function takes some text and returns an audio file that says the text out loud
+def generate_tts_audio(text: str):
+    key = synthesize_to_cache(text)
+    return _send_audio_file(tts_cache.path_for(key), key)
+
+
+# ------------------ Async Text-to-Speech ---------------------
+
+# Write bytes to a file (run in a thread by the async versions)
+def _write_file(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+# Download the MP3 for one speech request (async)
+async def _adownload_speech(**options) -> bytes:
+    async with async_client.audio.speech.with_streaming_response.create(**options) as response:
+        return await response.read()
+
+# Async version of synthesize_to_cache: waits for OpenAI without blocking a thread
+async def asynthesize_to_cache(text: str) -> str:
+    key = tts_key(text)
+    if tts_cache.lookup(key) is not None:
+        return key
+
+    with span("tts_synthesis"):
+        audio = await upstream.acall(
+            "speech", _adownload_speech,
+            model=config.TTS_MODEL,
+            voice=config.TTS_VOICE,
+            input=text
+        )
+
+    tmp_path = tts_cache.temp_path()
+    try:
+        await asyncio.to_thread(_write_file, tmp_path, audio)
+        tts_cache.add(key, tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return key
+
+# Async version of generate_tts_audio
+async def agenerate_tts_audio(text: str):
+    key = await asynthesize_to_cache(text)
+    return _send_audio_file(tts_cache.path_for(key), key)
+
+
+# ------------------ Streaming Text-to-Speech ---------------------
+
+# Sentence ends: ".", "!" or "?" (optionally followed by quotes/brackets) and whitespace
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+")
+
+# Split text into sentence-sized pieces for streaming synthesis.
+# Very short sentences are merged with the next one (fewer upstream calls),
+# and very long ones are cut at the last space before the size limit.
+def split_sentences(text: str, min_chars: int = None, max_chars: int = None) -> list[str]:
+    min_chars = config.TTS_STREAM_MIN_CHARS if min_chars is None else min_chars
+    max_chars = config.TTS_STREAM_MAX_CHARS if max_chars is None else max_chars
+    pieces = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        current = f"{current} {sentence}".strip()
+        # Cut pieces that are too long at a space
+        while len(current) > max_chars:
+            cut = current.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(current[:cut].strip())
+            current = current[cut:].strip()
+        if len(current) >= min_chars:
+            pieces.append(current)
+            current = ""
+    if current:
+        pieces.append(current)
+    return pieces
+
+# Synthesize one piece of text and return the MP3 bytes (no temp file)
+@timed("tts_synthesis")
+def _synthesize_bytes(text: str) -> bytes:
+    return upstream.call(
+        "speech", _download_speech,
+        model=config.TTS_MODEL,
+        voice=config.TTS_VOICE,
+        input=text
+    )
+
+# Download the MP3 for one speech request
+def _download_speech(**options) -> bytes:
+    with client.audio.speech.with_streaming_response.create(**options) as response:
+        return response.read()
+
+
+class _StreamStats:
+    """
+    Time-to-first-audio measurements for streamed speech (recent samples).
+    """
+
+    def __init__(self, keep: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=keep)
+        self._counts = {"streams": 0, "cached_streams": 0, "errors": 0}
+
+    def record_first_audio(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._counts)
+            samples = sorted(self._samples)
+        if samples:
+            totals["first_audio_p50"] = samples[len(samples) // 2]
+            totals["first_audio_p95"] = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            totals["first_audio_max"] = samples[-1]
+        return totals
+
+
+# Time-to-first-audio tracking for /speak/stream
+tts_stream_stats = _StreamStats()
+
+# Size of the pieces a cached file is streamed in
+_FILE_CHUNK_BYTES = 64 * 1024
+
+# Yield MP3 bytes for the text as soon as each sentence is ready.
+# Up to TTS_STREAM_CONCURRENCY sentences are synthesized at the same time,
+# but they are always sent in order. The full audio is added to the cache at
+# the end, so replaying the same text later costs no upstream call.
+def stream_tts_audio(text: str):
+    started = time.perf_counter()
+    key = tts_key(text)
+    tts_stream_stats.count("streams")
+
+    # Already cached: stream the file from disk
+    path = tts_cache.lookup(key)
+    if path is not None:
+        tts_stream_stats.count("cached_streams")
+        with open(path, "rb") as f:
+            first = True
+            while chunk := f.read(_FILE_CHUNK_BYTES):
+                if first:
+                    tts_stream_stats.record_first_audio(time.perf_counter() - started)
+                    first = False
+                yield chunk
+        return
+
+    sentences = split_sentences(text)
+    window = max(1, config.TTS_STREAM_CONCURRENCY)
+    pending = deque()
+    collected = []
+    next_index = 0
+    try:
+        while next_index < len(sentences) or pending:
+            # Keep up to `window` sentences in flight
+            while next_index < len(sentences) and len(pending) < window:
+                pending.append(llm_executor.submit(_synthesize_bytes, sentences[next_index]))
+                next_index += 1
+            audio = pending.popleft().result()
+            if not collected:
+                tts_stream_stats.record_first_audio(time.perf_counter() - started)
+            collected.append(audio)
+            yield audio
+    except Exception:
+        tts_stream_stats.count("errors")
+        raise
+    finally:
+        # The browser went away (or something failed): don't start unsent work
+        for future in pending:
+            future.cancel()
+
+    # Keep the whole recording for replays
+    tmp_path = tts_cache.temp_path()
+    try:
+        with open(tmp_path, "wb") as f:
+            for audio in collected:
+                f.write(audio)
+        tts_cache.add(key, tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,93 @@
+# services/user_cache.py
+
+# Keeps recently seen users in memory so Flask-Login doesn't have to load the
+# logged-in user from the database on every request (each /chat, /speak and
+# /tts call of an interview).
+#
+# Only plain column values are cached, and never the password hash (no
+# credentials kept in a long-lived cache). On a hit a User object is rebuilt
+# from them and attached to the request's database session with
+# merge(load=False), which doesn't run a SELECT; reading the password of such
+# a user would load it from the database. Entries expire after
+# USER_CACHE_TTL_SECONDS, and record_interview_result() drops the user's
+# entry whenever it changes their streak. The cache is per worker process.
+
+# Import built-in modules
+import threading                     # Lock protecting the cache
+import time                          # For expiry times
+from collections import OrderedDict  # Oldest entries first (for trimming)
+
+# Import SQLAlchemy helper to turn a rebuilt object into a "loaded" one
+from sqlalchemy.orm import make_transient_to_detached
+
+# Import app settings (lifetime, size)
+import config
+
+# Import the database object and User model
+from models.user import db, User
+
+# Columns left out of the cache
+UNCACHED_COLUMNS = {"password"}
+
+# The columns that are cached
+_CACHED_COLUMNS = [c.key for c in User.__mapper__.column_attrs if c.key not in UNCACHED_COLUMNS]
+
+
+class UserCache:
+    """
+    Column values of recently loaded users, keyed by user id, with a time limit.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (expires_at, column values)
+        self._counts = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    # Return the user for this id, attached to the current database session
+    # (None if there is no such user)
+    def load(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] <= now:
+                del self._entries[user_id]
+                entry = None
+            self._counts["hits" if entry is not None else "misses"] += 1
+
+        # Hit: rebuild the object and attach it without asking the database
+        if entry is not None:
+            user = User(**entry[1])
+            make_transient_to_detached(user)
+            return db.session.merge(user, load=False)
+
+        # Miss: load it and remember its columns for next time
+        user = db.session.get(User, user_id)
+        if user is not None and self.ttl > 0:
+            values = {key: getattr(user, key) for key in _CACHED_COLUMNS}
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, values)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return user
+
+    # Forget a user (call after changing their row)
+    def invalidate(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._counts["invalidations"] += 1
+
+    # Hit/miss counters, hit ratio and current size
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._counts)
+            totals["size"] = len(self._entries)
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = totals["hits"] / lookups if lookups else 0.0
+        return totals
+
+
+# The cache used by Flask-Login's user loader
+user_cache = UserCache(config.USER_CACHE_TTL_SECONDS, config.USER_CACHE_MAX_ENTRIES)
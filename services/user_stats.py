@@ -0,0 +1,97 @@
+# services/user_stats.py
+
+# Keeps each user's dashboard numbers (interview count, best score, score
+# runs) up to date one interview at a time, and turns them into badges.
+# Updating costs the same no matter how many interviews a user has done.
+
+# Import the database models
+from models.user import db, InterviewHistory, UserStats
+
+
+# "Run" badges: (minimum score, how many interviews in a row)
+RUN_THRESHOLDS = [(5, 5), (6, 10), (7, 20), (8, 50)]
+
+
+# ---------------------- Updating ----------------------
+
+# Return the user's stats row, creating an empty one if needed.
+# The new row is added to the current database session (not committed).
+def get_or_create_stats(user_id: int) -> UserStats:
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        stats = UserStats(user_id=user_id, total_interviews=0, highest_score=0)
+        for min_score, _ in RUN_THRESHOLDS:
+            setattr(stats, f"current_run_{min_score}", 0)
+            setattr(stats, f"best_run_{min_score}", 0)
+        db.session.add(stats)
+    return stats
+
+# Add one finished interview's score to the stats (caller commits)
+def apply_score(stats: UserStats, score: int):
+    stats.total_interviews += 1
+    stats.highest_score = max(stats.highest_score, score)
+    for min_score, _ in RUN_THRESHOLDS:
+        current = f"current_run_{min_score}"
+        best = f"best_run_{min_score}"
+        if score >= min_score:
+            setattr(stats, current, getattr(stats, current) + 1)
+            setattr(stats, best, max(getattr(stats, best), getattr(stats, current)))
+        else:
+            setattr(stats, current, 0)
+
+# Recalculate a user's stats from their full history (used for backfills and
+# for users whose stats row doesn't exist yet). Rows are read in batches.
+def rebuild_stats(user_id: int, batch_size: int = 1000) -> UserStats:
+    stats = get_or_create_stats(user_id)
+    stats.total_interviews = 0
+    stats.highest_score = 0
+    for min_score, _ in RUN_THRESHOLDS:
+        setattr(stats, f"current_run_{min_score}", 0)
+        setattr(stats, f"best_run_{min_score}", 0)
+    scores = (
+        db.session.query(InterviewHistory.score)
+        .filter(InterviewHistory.user_id == user_id)
+        .order_by(InterviewHistory.created_at, InterviewHistory.id)
+        .yield_per(batch_size)
+    )
+    for (score,) in scores:
+        apply_score(stats, score)
+    return stats
+
+
+# ---------------------- Badges ----------------------
+
+# Build the Career Home badge list from the stats and the current day streak
+def build_badges(stats: UserStats, current_streak: int) -> list[dict]:
+    total_interviews = stats.total_interviews
+    highest_score    = stats.highest_score
+    runs = {
+        (min_score, run_len): getattr(stats, f"best_run_{min_score}") >= run_len
+        for min_score, run_len in RUN_THRESHOLDS
+    }
+
+    # Define possible badges user can earn
+    badge_defs = [
+        (total_interviews >= 1,   "First Interview",   "🥇"),
+        (total_interviews >= 5,   "5 Interviews",      "🥈"),
+        (total_interviews >= 20,  "20 Interviews",     "🥉"),
+        (total_interviews >= 100, "100 Interviews",    "🏆"),
+        (current_streak >= 1,    "1‑Day Streak",   "🔥"),
+        (current_streak >= 5,    "5‑Day Streak",   "🔥🔥"),
+        (current_streak >= 20,   "20‑Day Streak",  "🔥🔥🔥"),
+        (current_streak >= 100,  "100‑Day Streak", "🔥🔥🔥🔥"),
+        (highest_score >= 5,  "First 5+ Score",  "⭐"),
+        (highest_score >= 7,  "First 7+ Score",  "🌟"),
+        (highest_score >= 9,  "First 9+ Score",  "✨"),
+        (highest_score >= 10, "Perfect Score",    "💯"),
+        (runs[(5,5)],   "Run of 5×≥5",   "🏁"),
+        (runs[(6,10)],  "Run of 10×≥6",  "🏅"),
+        (runs[(7,20)],  "Run of 20×≥7",  "🎖️"),
+        (runs[(8,50)],  "Run of 50×≥8",  "🏆"),
+    ]
+
+    # Prepare badge data for the template
+    return [
+        {"name": n, "icon": i, "earned": c}
+        for c,n,i in badge_defs
+    ]
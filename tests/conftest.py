@@ -0,0 +1,16 @@
+# tests/conftest.py
+
+# Shared setup for the unit tests: make the project importable and give the
+# settings harmless values (no real API key, throwaway cache files).
+
+# Import built-in modules
+import os        # For environment variables and paths
+import sys       # To make the project importable
+import tempfile  # For throwaway cache files
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("RESULT_CACHE_DB_PATH", os.path.join(tempfile.mkdtemp(), "result_cache.db"))
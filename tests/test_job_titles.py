@@ -0,0 +1,105 @@
+# tests/test_job_titles.py
+
+# The local job-title classifier (services/job_titles.py): when it is sure
+# enough to skip the AI, and when guess_job_title() falls back to the AI.
+
+# Import built-in modules
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import services.ai_interview as ai_interview
+from services.job_titles import classify, normalize_title
+
+
+# ---------------------- Classifier ----------------------
+
+def test_clear_headline_is_confident():
+    result = classify("Ravi Patel\nData Scientist\nRegression models, A/B testing, pandas, scikit-learn.")
+    assert result.title == "Data Scientist"
+    assert result.confident
+
+def test_abbreviated_title_and_seniority():
+    result = classify("Maria Gomez\nSr. Backend Dev\nPython, Flask, PostgreSQL, Redis, Kafka, REST APIs.")
+    assert result.title == "Senior Backend Engineer"
+    assert result.confident
+
+def test_short_alias_with_matching_skills_is_confident():
+    result = classify("Henry Adams\nRN\nPatient care, triage, vital signs.")
+    assert result.title == "Registered Nurse"
+    assert result.confident
+
+# A broad alias mentioned in passing, with none of that job's skills, must
+# not decide the title on its own
+@pytest.mark.parametrize("resume", [
+    "Jane Doe\nWorked alongside a nurse in a clinic reception. Answered phones.",
+    "Jane Doe\nVolunteer tutor. Python, Java, REST APIs, microservices, unit testing, code review, algorithms.",
+    "Jane Doe\nWorked with a recruiter to hire engineers. Python, Java, REST APIs, microservices.",
+])
+def test_broad_alias_without_skills_is_not_confident(resume):
+    assert not classify(resume).confident
+
+def test_headline_beats_older_job_further_down():
+    result = classify("Tara Singh\nData Analyst\nSQL, Tableau, Excel dashboards.\n"
+                      "Previously: Teacher (lesson planning, grading).")
+    assert result.title == "Data Analyst"
+    assert result.confident
+
+# The margin rule: a close runner-up means "not sure", however high the score
+def test_close_runner_up_is_not_confident(monkeypatch):
+    monkeypatch.setattr(config, "JOB_TITLE_MIN_SCORE", 0)
+    resume = "Spark, Airflow, dbt, pandas, scikit-learn, regression models, A/B testing."
+    result = classify(resume)
+    assert result.runner_up < result.score < config.JOB_TITLE_MIN_MARGIN * result.runner_up
+    assert not result.confident
+    # A smaller required margin accepts the same scores
+    monkeypatch.setattr(config, "JOB_TITLE_MIN_MARGIN", result.score / result.runner_up)
+    assert classify(resume).confident
+
+def test_nothing_recognised():
+    assert classify("I like cooking and hiking.") == (None, 0.0, 0.0, False)
+
+
+# ---------------------- Normalizer ----------------------
+
+@pytest.mark.parametrize("answer, expected", [
+    ("Sr. Software Eng", "Senior Software Engineer"),
+    ("Job title: Front-End Developer.", "Frontend Engineer"),
+    ('"RN"', "Registered Nurse"),
+])
+def test_normalize_title(answer, expected):
+    assert normalize_title(answer) == expected
+
+
+# ---------------------- Fallback To The AI ----------------------
+
+# A stand-in for the OpenAI client that always answers `answer`
+class FakeCompletions:
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    completions = FakeCompletions("sr. data eng")
+    monkeypatch.setattr(ai_interview, "client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(config, "JOB_TITLE_LOCAL_ENABLED", True)
+    ai_interview.job_title_cache.invalidate()
+    yield completions
+    ai_interview.job_title_cache.invalidate()
+
+def test_confident_guess_skips_the_ai(fake_ai):
+    title = ai_interview.guess_job_title("Kenji Sato\niOS Developer\nSwift, SwiftUI, Xcode; shipped a banking app.")
+    assert title == "Mobile Engineer"
+    assert fake_ai.calls == 0
+
+def test_unsure_guess_asks_the_ai_and_normalizes_its_answer(fake_ai):
+    title = ai_interview.guess_job_title("Jane Doe\nWorked alongside a nurse in a clinic reception.")
+    assert title == "Senior Data Engineer"
+    assert fake_ai.calls == 1
@@ -0,0 +1,119 @@
+# tests/test_leaderboard.py
+
+# The leaderboards (services/leaderboard.py): ranks and ties, the top list,
+# the Fenwick tree growing, and following interview_history exactly once.
+
+import random
+
+import pytest
+from flask import Flask
+
+from models.user import db, User, InterviewHistory
+from services.leaderboard import Leaderboard, Leaderboards
+
+
+# ---------------------- One Board ----------------------
+
+@pytest.fixture(params=[True, False], ids=["dense", "sparse"])
+def board(request):
+    return Leaderboard(top_k=3, dense=request.param)
+
+def test_equal_values_share_a_rank(board):
+    board.load([(1, 5), (2, 9), (3, 5), (4, 2)])
+    assert board.rank(2) == (1, 9, 4)
+    assert board.rank(1) == (2, 5, 4)
+    assert board.rank(3) == (2, 5, 4)
+    assert board.rank(4) == (4, 2, 4)  # Three users ahead, not two
+
+def test_users_without_a_value_are_not_ranked(board):
+    board.load([(1, 5), (2, 0)])
+    assert board.rank(2) == (None, 0, 1)
+    assert board.rank(99) == (None, 0, 1)
+
+def test_values_never_go_down(board):
+    board.update(1, 7)
+    board.update(1, 3)
+    assert board.value(1) == 7
+    board.increment(1)
+    assert board.rank(1) == (1, 8, 1)
+
+def test_top_ties_go_to_who_got_there_first(board):
+    board.update(1, 5)
+    board.update(2, 6)
+    board.update(3, 6)
+    board.update(4, 6)  # Pushes user 1 off the top 3
+    assert board.top(3) == [(1, 2, 6), (1, 3, 6), (1, 4, 6)]
+    board.update(5, 6)  # Same value as the last entry, but later: stays out
+    assert board.top(3) == [(1, 2, 6), (1, 3, 6), (1, 4, 6)]
+    assert board.rank(5) == (1, 6, 5)
+    board.update(1, 7)
+    assert board.top(3) == [(1, 1, 7), (2, 2, 6), (2, 3, 6)]  # User 1 comes back in
+
+def test_loaded_ties_go_by_user_id(board):
+    board.load([(5, 4), (3, 4), (9, 4), (1, 2)])
+    assert board.top(3) == [(1, 3, 4), (1, 5, 4), (1, 9, 4)]
+
+def test_tree_grows_past_its_first_size(board):
+    board.load([(1, 3), (2, 10)])
+    board.update(3, 1000)  # Far past the first 16 values: the tree is rebuilt
+    assert board.rank(3) == (1, 1000, 3)
+    assert board.rank(2) == (2, 10, 3)
+    assert board.rank(1) == (3, 3, 3)
+
+def test_matches_brute_force(board):
+    rng = random.Random(3)
+    truth = {}
+    board.load([(1, 3), (2, 3), (7, 9)])
+    truth.update({1: 3, 2: 3, 7: 9})
+    for _ in range(3000):
+        user = rng.randint(1, 60)
+        value = truth.get(user, 0) + rng.choice([0, 1, 1, 2, 40])
+        board.update(user, value)
+        if value > 0:
+            truth[user] = max(truth.get(user, 0), value)
+    for user, value in truth.items():
+        ahead = sum(other > value for other in truth.values())
+        assert board.rank(user) == (ahead + 1, value, len(truth))
+    assert [value for _, _, value in board.top(3)] == sorted(truth.values(), reverse=True)[:3]
+
+
+# ---------------------- Following The History ----------------------
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([User(id=i, username=f"user{i}", password="-") for i in (1, 2, 3)])
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+def add_interview(user_id, job_title, score, longest_streak=1):
+    db.session.add(InterviewHistory(user_id=user_id, job_title=job_title, score=score))
+    db.session.get(User, user_id).longest_streak = longest_streak
+    db.session.commit()
+
+def test_load_then_catch_up_counts_each_interview_once(app):
+    add_interview(1, "Data Analyst", 7)
+    add_interview(2, "Data Analyst", 9, longest_streak=3)
+    boards = Leaderboards(top_k=10, sync_seconds=60)
+
+    # Saves before the boards are loaded are left to the load
+    boards.catch_up()
+    assert not boards.ready
+    boards._load_in_background(app)
+    assert boards.ready
+    assert boards.rank(2, "highest_score", "Data Analyst") == (1, 9, 2)
+    assert boards.rank(2, "longest_streak") == (1, 3, 2)
+
+    add_interview(1, "Data Analyst", 10)
+    add_interview(3, "Teacher", 4)
+    boards.catch_up()
+    boards.catch_up()  # Nothing new: nothing applied twice
+    assert boards.rank(1, "highest_score") == (1, 10, 3)
+    assert boards.rank(1, "interviews") == (1, 2, 3)
+    assert boards.rank(3, "interviews", "Teacher") == (1, 1, 1)
+    assert boards.stats()["rows_applied"] == 2
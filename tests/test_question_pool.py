@@ -0,0 +1,120 @@
+# tests/test_question_pool.py
+
+# The question pool (services/question_pool.py): the word stemmer, MinHash
+# near-duplicate detection, and how pooled questions are handed out.
+
+import pytest
+
+from services.question_pool import QuestionPool, _stem, shingles, signature, similarity
+
+
+# ---------------------- Near-Duplicate Detection ----------------------
+
+@pytest.mark.parametrize("a, b", [
+    ("debugging", "debug"),
+    ("choosing", "choose"),
+    ("disagree", "disagreement"),
+    ("managed", "management"),
+    ("tests", "test"),
+])
+def test_stem_matches_word_forms(a, b):
+    assert _stem(a) == _stem(b)
+
+def test_stem_keeps_double_s_and_short_words():
+    assert _stem("class") == "class"
+    assert _stem("bus") == "bus"
+
+def test_shingles_leave_out_stop_words():
+    assert shingles("Tell me about a time you debugged an outage") == {"debug", "outag"}
+
+def test_signature_is_stable():
+    question = "How do you prioritize competing deadlines?"
+    assert (signature(question) == signature(question)).all()
+
+# Paraphrases count as duplicates; different questions in the same template don't
+@pytest.mark.parametrize("a, b, duplicate", [
+    ("Which database would you choose for a new service?",
+     "How do you choose a database for a new service?", True),
+    ("Tell me about a time you debugged a production outage.",
+     "Describe a time you had to debug an outage in production.", True),
+    ("Tell me about a time you disagreed with your manager.",
+     "Tell me about a time you mentored a junior colleague.", False),
+    ("How do you prioritize competing deadlines?",
+     "Which database would you choose for a new service?", False),
+])
+def test_is_duplicate(a, b, duplicate):
+    pool = make_pool(lambda *args: [])
+    assert pool.is_duplicate(a, [b]) is duplicate
+
+def test_similarity_of_nothing():
+    assert len(similarity(signature("anything"), [])) == 0
+
+
+# ---------------------- Pool ----------------------
+
+# Runs "background" work straight away, so the tests see its result
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+def make_pool(generate, **settings):
+    options = dict(low_water=1, batch_size=4, max_size=4, max_titles=2, threshold=0.5)
+    options.update(settings)
+    return QuestionPool(generate, InlineExecutor(), **options)
+
+QUESTIONS = [
+    "How do you prioritize competing deadlines?",
+    "Which database would you choose for a new service?",
+    "Tell me about a time you disagreed with your manager.",
+    "Describe how you would design a rate limiter.",
+]
+
+def test_first_take_misses_then_refills():
+    calls = []
+    pool = make_pool(lambda title, skill, count: calls.append((title, skill, count)) or QUESTIONS)
+    assert pool.take("Backend Engineer") is None
+    assert calls == [("Backend Engineer", None, 4)]
+    assert pool.take("Backend Engineer") == QUESTIONS[0]
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["generated"]) == (1, 1, 4)
+
+def test_near_duplicates_in_a_batch_are_dropped():
+    batch = [QUESTIONS[1], "How do you choose a database for a new service?", QUESTIONS[0]]
+    pool = make_pool(lambda *args: batch)
+    pool.warm(["Backend Engineer"])
+    assert pool.stats()["questions"] == 2
+    assert pool.stats()["duplicates"] == 1
+
+def test_take_skips_questions_like_the_ones_to_avoid():
+    pool = make_pool(lambda *args: QUESTIONS, low_water=0)
+    pool.warm(["Backend Engineer"])
+    question = pool.take("Backend Engineer", avoid=["How should I prioritize deadlines that compete?"])
+    assert question == QUESTIONS[1]
+
+def test_a_user_never_gets_the_same_question_twice():
+    # Every refill writes the same batch again
+    pool = make_pool(lambda *args: QUESTIONS)
+    pool.warm(["Backend Engineer"])
+    served = [pool.take("Backend Engineer", user_id=7) for _ in range(len(QUESTIONS))]
+    assert served == QUESTIONS
+    # The pool was refilled with the same questions: none are new to user 7
+    assert pool.stats()["questions"] == len(QUESTIONS)
+    assert pool.take("Backend Engineer", user_id=7) is None
+    # Someone else can still get them
+    assert pool.take("Backend Engineer", user_id=8) == QUESTIONS[0]
+
+def test_failed_refill_is_counted_and_tried_again():
+    def fail(*args):
+        raise RuntimeError("upstream down")
+    pool = make_pool(fail)
+    assert pool.take("Backend Engineer") is None
+    assert pool.take("Backend Engineer") is None
+    stats = pool.stats()
+    assert (stats["failed"], stats["refills"], stats["refilling"]) == (2, 2, 0)
+
+def test_least_used_title_is_dropped():
+    pool = make_pool(lambda *args: QUESTIONS[:2])
+    for title in ["A", "B", "C"]:
+        pool.warm([title])
+    assert pool.stats()["titles"] == 2
+    assert pool.take("A") is None  # Dropped: refilled now
@@ -0,0 +1,51 @@
+# tests/test_resume_compactor.py
+
+# The resume compactor (services/resume_compactor.py): cleanup, sections kept
+# by priority, and staying within the token budget.
+
+from services.resume_compactor import compact_resume, count_tokens, cut_to_tokens, normalize_resume
+
+
+# ---------------------- Cleanup ----------------------
+
+def test_normalize_drops_contacts_page_numbers_and_repeats():
+    text = "\n".join([
+        "jane@example.com | (555) 123-4567",
+        "Page 1 of 2",
+        "Jane Doe Resume", "Built data pipelines", "Jane Doe Resume", "Built data pipelines",
+        "Jane Doe Resume",
+    ])
+    assert normalize_resume(text) == ["Built data pipelines"]
+
+
+# ---------------------- Budget ----------------------
+
+def test_low_priority_sections_go_first():
+    text = "\n".join(["HOBBIES", "Chess and hiking", "EXPERIENCE", "Led a team of five engineers",
+                      "REFERENCES", "Available on request"])
+    result = compact_resume(text, token_budget=12)
+    assert result == "EXPERIENCE\nLed a team of five engineers"
+
+def test_one_long_paragraph_is_cut_not_dropped():
+    # A pasted resume (or a PDF without line breaks) is a single line
+    paragraph = "Senior data analyst with SQL, Python and Tableau experience. " * 150
+    assert count_tokens(paragraph) > 1000
+    result = compact_resume(paragraph, token_budget=200)
+    assert result.startswith("Senior data analyst with SQL")
+    assert 0 < count_tokens(result) <= 200
+
+def test_long_line_after_a_heading_is_cut_to_what_is_left():
+    text = "EXPERIENCE\n" + "Shipped features for a payments platform. " * 100
+    result = compact_resume(text, token_budget=50)
+    heading, body = result.split("\n")
+    assert heading == "EXPERIENCE"
+    assert body.startswith("Shipped features")
+    assert count_tokens(result) <= 50
+
+def test_cut_to_tokens_stops_at_a_word():
+    text = "alpha beta gamma delta " * 20
+    cut = cut_to_tokens(text, 5)
+    assert cut and count_tokens(cut) <= 5
+    assert text.startswith(cut) and text[len(cut)] == " "
+    assert cut_to_tokens(text, 0) == ""
+    assert cut_to_tokens("short", 10) == "short"